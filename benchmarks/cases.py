@@ -0,0 +1,322 @@
+"""Benchmark cases for the collectors, analyzers and renderers.
+
+Everything from ``modules`` is imported inside the setup functions so the
+fake backends can be installed first.
+"""
+import itertools
+import time
+import types
+from typing import List
+
+import numpy as np
+
+from .fakes import FAKE_NVIDIA_SMI, FakeResolver, FakeSystem, frame_stream, presentmon_csv
+from .harness import Case
+
+
+def _start_fake_gpu(metrics, timeout: float = 5.0):
+    from modules.nvidia_smi import NvidiaSmiReader
+    metrics.gpu_reader = NvidiaSmiReader(FAKE_NVIDIA_SMI, interval_ms=100)
+    metrics.gpu_reader.start()
+    deadline = time.monotonic() + timeout
+    while not metrics.gpu_reader.latest() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def _synthetic_frame_source(fps: float = 144.0, tick: float = 0.25):
+    from modules.frame_source import FrameSource
+
+    class SyntheticFrameSource(FrameSource):
+        """Hands out one tick's worth of a synthetic frame stream per read"""
+
+        def __init__(self):
+            self.frames = frame_stream(200000, fps=fps)
+            self.per_read = max(1, int(fps * tick))
+            self.position = 0
+
+        def read_frames(self, pid=None):
+            if self.position + self.per_read > self.frames.size:
+                self.position = 0
+            chunk = self.frames[self.position:self.position + self.per_read]
+            self.position += self.per_read
+            return chunk
+
+    return SyntheticFrameSource()
+
+
+def _backend():
+    # The fake system answers through psutil and pywin32, whatever the host OS
+    from modules.platform_backend import create_backend
+    return create_backend('windows')
+
+
+def _sampler(system: FakeSystem):
+    from modules.network_monitor import NetworkMonitor
+    from modules.sampler import MetricsSampler
+    sampler = MetricsSampler(interval=0.25, frame_source=_synthetic_frame_source(), backend=_backend())
+    sampler.set_target(system.game_pid, 'Game-Win64-Shipping.exe')
+    sampler._init_collectors()
+    sampler.network_monitor.resolver.shutdown()
+    sampler.network_monitor = NetworkMonitor(resolver=FakeResolver(), connection_table=sampler.connection_table)
+    _start_fake_gpu(sampler.performance_metrics)
+    # Let every deferred collector come online before measuring
+    for _ in range(len(sampler.scheduler.collectors) + 1):
+        sampler.sample()
+    return sampler
+
+
+def build_cases(system: FakeSystem, real_psutil: bool = False) -> List[Case]:
+    cases = []
+
+    def case(name, **kwargs):
+        def register(setup):
+            cases.append(Case(name, setup, **kwargs))
+            return setup
+        return register
+
+    @case('process_monitor.tree', iterations=1000)
+    def process_tree():
+        from modules.process_monitor import ProcessMonitor
+        monitor = ProcessMonitor(_backend())
+        return lambda: monitor.get_many_process_metrics([system.game_pid])
+
+    @case('process_monitor.watched', iterations=1000)
+    def process_watched():
+        from modules.process_monitor import ProcessMonitor
+        monitor = ProcessMonitor(_backend())
+        background = [pid for pid in system.processes if pid not in system.tree][:4]
+        return lambda: monitor.get_many_process_metrics([system.game_pid] + background)
+
+    @case('process_table.churn', iterations=1000)
+    def process_table_churn():
+        from modules.process_monitor import ProcessMonitor
+        table = ProcessMonitor(_backend()).process_table
+        table.refresh()
+
+        def call():
+            system.churn(3)
+            table.refresh()
+        return call
+
+    @case('game_classifier.classify', iterations=2000, ops_per_call=100, unit="lookups")
+    def game_classifier():
+        from modules.game_library import GameClassifier, GameInfo
+        library = types.SimpleNamespace(games=[
+            GameInfo(f"Game {index}", str(index), 'steam', f"C:\\SteamLibrary\\steamapps\\common\\Game {index}")
+            for index in range(500)
+        ])
+        classifier = GameClassifier({'GTA5.exe'}, {'explorer.exe'}, ['games'], library=library)
+        paths = itertools.cycle([
+            (f"game{index}.exe", f"C:\\SteamLibrary\\steamapps\\common\\Game {index * 7 % 1000}\\bin\\game.exe")
+            for index in range(1000)
+        ])
+        batch = [next(paths) for _ in range(100)]
+        return lambda: [classifier.classify(name, exe) for name, exe in batch]
+
+    @case('performance_metrics.system', iterations=1000)
+    def system_metrics():
+        from modules.performance_metrics import PerformanceMetrics
+        metrics = PerformanceMetrics(_backend())
+        _start_fake_gpu(metrics)
+        metrics.refresh_gpu_info()
+        return metrics.get_system_metrics, metrics.close
+
+    @case('storage_monitor.read', iterations=2000)
+    def storage_read():
+        from modules.storage_monitor import StorageMonitor
+        monitor = StorageMonitor(_backend())
+        return monitor.read
+
+    @case('network_monitor.process', iterations=1000)
+    def network_process():
+        from modules.connection_table import ConnectionTable
+        from modules.network_monitor import NetworkMonitor
+        monitor = NetworkMonitor(resolver=FakeResolver(), connection_table=ConnectionTable(_backend()))
+        return lambda: monitor.get_process_network_metrics(system.game_pid)
+
+    @case('network_monitor.targets', iterations=1000)
+    def network_targets():
+        from modules.connection_table import ConnectionTable
+        from modules.network_monitor import NetworkMonitor
+        monitor = NetworkMonitor(resolver=FakeResolver(), connection_table=ConnectionTable(_backend()))
+        pids = system.tree[:8]
+        return lambda: monitor.get_network_metrics(pids)
+
+    @case('sampler.tick', iterations=1000)
+    def sampler_tick():
+        sampler = _sampler(system)
+        return sampler.sample, sampler.stop
+
+    @case('sampler.tick_all_due', iterations=300)
+    def sampler_tick_all_due():
+        sampler = _sampler(system)
+        names = list(sampler.scheduler.collectors)
+
+        def call():
+            sampler.scheduler.invalidate(*names)
+            return sampler.sample()
+        return call, sampler.stop
+
+    @case('frame_analyzer.scalar', iterations=20000, unit="frames")
+    def frame_analyzer_scalar():
+        from modules.frame_analyzer import FrameAnalyzer
+        analyzer = FrameAnalyzer()
+        frames = itertools.cycle(frame_stream(100000).tolist())
+        return lambda: analyzer.analyze_frame_times(next(frames))
+
+    @case('frame_analyzer.batch', iterations=5000, ops_per_call=144, unit="frames")
+    def frame_analyzer_batch():
+        from modules.frame_analyzer import FrameAnalyzer
+        analyzer = FrameAnalyzer()
+        frames = frame_stream(144 * 1000)
+        chunks = itertools.cycle(np.split(frames, 1000))
+        return lambda: analyzer.analyze_many(next(chunks))
+
+    @case('bottleneck_analyzer.analyze', iterations=20000)
+    def bottleneck():
+        from modules.bottleneck_analyzer import BottleneckAnalyzer
+        analyzer = BottleneckAnalyzer()
+        process = {'cpu_percent': 42.0, 'memory_percent': 35.0, 'fps': 144}
+        system_metrics = {'gpu': {'utilization': 97.0}, 'cpu': {'utilization': 40.0}}
+        return lambda: analyzer.analyze(process, system_metrics)
+
+    @case('bottleneck_analyzer.session', iterations=100, ops_per_call=16384, unit="samples")
+    def bottleneck_session():
+        from modules.bottleneck_analyzer import analyze_session
+        rows = 16384
+        rng = np.random.default_rng(0)
+        frame_times = frame_stream(rows)
+        ticks = {
+            'timestamp': np.arange(rows) * 0.25,
+            'fps': (1000.0 / frame_times).astype(np.float32),
+            'cpu_percent': rng.uniform(5, 15, rows).astype(np.float32),
+            'busiest_thread_percent': rng.uniform(40, 95, rows).astype(np.float32),
+            'system_cpu': (40 + frame_times).astype(np.float32),
+            'gpu_utilization': rng.uniform(85, 100, rows).astype(np.float32),
+            'memory_percent': np.full(rows, 20, np.float32),
+            'memory_used_percent': np.full(rows, 55, np.float32)
+        }
+        return lambda: analyze_session(ticks)
+
+    @case('input_latency.update', iterations=2000, ops_per_call=36, unit="presents")
+    def input_latency_update():
+        from modules.input_monitor import InputLatencyPipeline, LatencyEventSource
+        rng = np.random.default_rng(0)
+        presents = np.cumsum(frame_stream(144 * 2000)) / 1000.0
+        inputs = np.sort(rng.uniform(0, presents[-1], 20 * 2000))
+        tick = 0.25
+
+        class Synthetic(LatencyEventSource):
+            """A quarter second of 144 fps presents and 20 Hz input per read"""
+            def __init__(self):
+                self.now = 0.0
+
+            def _between(self, times):
+                start, stop = np.searchsorted(times, (self.now - tick, self.now))
+                chunk = times[start:stop]
+                return np.column_stack((chunk, np.full(chunk.size, 100.0)))
+
+            def read_inputs(self):
+                self.now = self.now % presents[-1] + tick
+                return self._between(inputs)
+
+            def read_presents(self):
+                return self._between(presents)
+
+        source = Synthetic()
+        pipeline = InputLatencyPipeline(source, source)
+        return lambda: pipeline.update([100, 200])
+
+    @case('instrumentation.timed_call', iterations=20000)
+    def instrumentation_timed():
+        from modules.instrumentation import Instrumentation
+        instrumentation = Instrumentation()
+        return instrumentation.timed('benchmark', lambda: None)
+
+    @case('history.push_render', iterations=5000)
+    def history_short():
+        from modules.history import MinMaxHistory
+        history = MinMaxHistory(4, 240, resolution=800)
+
+        def call():
+            history.push((40.0, 35.0, 97.0, 65.0))
+            return history.render()
+        return call
+
+    @case('history.push_render_decimated', iterations=5000)
+    def history_long():
+        from modules.history import MinMaxHistory
+        history = MinMaxHistory(4, 4 * 3600, resolution=800)
+        for _ in range(4 * 3600):
+            history.push((40.0, 35.0, 97.0, 65.0))
+
+        def call():
+            history.push((40.0, 35.0, 97.0, 65.0))
+            return history.render()
+        return call
+
+    @case('frame_source.parse', iterations=500, ops_per_call=1000, unit="rows")
+    def frame_source_parse():
+        from modules.frame_source import parse_columns
+        block = presentmon_csv(frame_stream(1000))
+        return lambda: parse_columns(block, [8, 1])
+
+    @case('exporter.render', iterations=2000)
+    def exporter_render():
+        from modules.exporter import render_snapshot
+        sampler = _sampler(system)
+        snapshot = sampler.sample()
+        sampler.stop()
+        return lambda: render_snapshot(snapshot)
+
+    @case('recorder.tick_row', iterations=5000)
+    def recorder_tick_row():
+        from modules.recorder import tick_row
+        sampler = _sampler(system)
+        snapshot = sampler.sample()
+        sampler.stop()
+        return lambda: tick_row(snapshot)
+
+    from modules.platform_backend import detect_backend
+    if real_psutil and detect_backend() == 'linux':
+        # The same real processes through both backends
+        def platform_case(name):
+            def setup():
+                import os
+                from modules.platform_backend import create_backend
+                backend = create_backend(name)
+                pids = sorted(int(entry) for entry in os.listdir('/proc') if entry.isdigit())[:64]
+
+                def call():
+                    backend.read_processes(pids)
+                    backend.cpu_percent()
+                    return backend.memory()
+                return call, backend.close
+            return setup
+
+        for name in ('linux', 'psutil'):
+            cases.append(Case(f'platform.{name}.tick', platform_case(name), iterations=1000,
+                              ops_per_call=64, unit="processes"))
+
+    try:
+        import PyQt6  # noqa: F401
+        import pyqtgraph  # noqa: F401
+    except ImportError:
+        pass
+    else:
+        @case('graphs.update', iterations=500)
+        def graphs_update():
+            from PyQt6.QtWidgets import QApplication
+            from modules.graphs import PerformanceGraphs
+            app = QApplication.instance() or QApplication(['benchmark'])
+            graphs = PerformanceGraphs(history_seconds=60, sample_interval=0.25)
+            graphs.resize(1400, 600)
+            process = {'cpu_percent': 42.0, 'memory_percent': 35.0}
+            system_metrics = {'gpu': {'utilization': 97.0}, 'cpu': {'temperature': 65.0}}
+
+            def call():
+                graphs.update_graphs(process, system_metrics)
+                app.processEvents()
+            return call
+
+    return cases
@@ -0,0 +1,38 @@
+"""Stand-in for ``nvidia-smi --query-gpu=... --format=csv,noheader,nounits -lms N``"""
+import argparse
+import random
+import sys
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--query-gpu', default='')
+    parser.add_argument('--format', default='')
+    parser.add_argument('-lms', type=int, default=0)
+    parser.add_argument('--gpus', type=int, default=1)
+    args, _ = parser.parse_known_args()
+
+    fields = [field for field in args.query_gpu.split(',') if field]
+    rng = random.Random(0)
+    while True:
+        for index in range(args.gpus):
+            values = {
+                'index': str(index),
+                'utilization.gpu': str(rng.randint(60, 99)),
+                'temperature.gpu': str(rng.randint(55, 80)),
+                'memory.used': str(rng.randint(4000, 7000)),
+                'memory.total': "8192",
+                'name': f"Fake GPU {index}"
+            }
+            print(", ".join(values.get(field, "[N/A]") for field in fields), flush=True)
+        if not args.lms:
+            return
+        time.sleep(args.lms / 1000.0)
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except (BrokenPipeError, KeyboardInterrupt):
+        sys.exit(0)
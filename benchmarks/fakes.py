@@ -0,0 +1,376 @@
+"""Fake platform backends so the collectors run on any machine.
+
+``install()`` must run before anything from ``modules`` is imported. It puts
+a synthetic ``psutil`` (a process tree whose CPU times advance with the
+clock), ``wmi``/``pythoncom`` and the pywin32 window functions into
+``sys.modules``. ``FAKE_NVIDIA_SMI`` is a command that behaves like
+``nvidia-smi --query-gpu ... -lms N``.
+"""
+import contextlib
+import logging
+import os
+import random
+import sys
+import time
+import types
+from collections import namedtuple
+from typing import Dict, List, Optional
+
+FAKE_NVIDIA_SMI = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                "fake_nvidia_smi.py")]
+FAKE_THREADS = 32
+
+pcputimes = namedtuple('pcputimes', 'user system children_user children_system')
+pmem = namedtuple('pmem', 'rss vms')
+pthread = namedtuple('pthread', 'id user_time system_time')
+pio = namedtuple('pio', 'read_count write_count read_bytes write_bytes')
+svmem = namedtuple('svmem', 'total available percent used free')
+sdiskpart = namedtuple('sdiskpart', 'device mountpoint fstype opts')
+sdiskusage = namedtuple('sdiskusage', 'total used free percent')
+sdiskio = namedtuple('sdiskio', 'read_count write_count read_bytes write_bytes read_time write_time')
+shwtemp = namedtuple('shwtemp', 'label current high critical')
+addr = namedtuple('addr', 'ip port')
+pconn = namedtuple('pconn', 'fd family type laddr raddr status')
+sconn = namedtuple('sconn', 'fd family type laddr raddr status pid')
+
+
+class Error(Exception):
+    pass
+
+
+class NoSuchProcess(Error):
+    def __init__(self, pid=None, name=None, msg=None):
+        super().__init__(msg or f"process no longer exists (pid={pid})")
+        self.pid = pid
+
+
+class ZombieProcess(NoSuchProcess):
+    pass
+
+
+class AccessDenied(Error):
+    pass
+
+
+class TimeoutExpired(Error):
+    pass
+
+
+class FakeProcessInfo:
+    def __init__(self, pid, ppid, name, exe, create_time, cpu_rate, rss, connections=0):
+        self.pid = pid
+        self.ppid = ppid
+        self.name = name
+        self.exe = exe
+        self.create_time = create_time
+        # Seconds of CPU per wall second, so cpu_times() keeps growing
+        self.cpu_rate = cpu_rate
+        self.rss = rss
+        self.connections = connections
+
+
+class FakeSystem:
+    """A synthetic machine: background processes plus one game process tree.
+
+    The game runs from a Steam library folder with ``children`` helper
+    processes under it (a launcher, a browser overlay and its renderers).
+    """
+
+    def __init__(self, processes: int = 300, children: int = 40, cpu_count: int = 8,
+                 gpus: int = 1, seed: int = 0):
+        self.random = random.Random(seed)
+        self.cpu_count = cpu_count
+        self.gpus = gpus
+        self.boot_time = time.time() - 3600
+        self.processes: Dict[int, FakeProcessInfo] = {}
+        self._next_pid = 1000
+        for _ in range(processes):
+            self._spawn_background()
+
+        self.game_pid = self._add(ppid=4, name='Game-Win64-Shipping.exe',
+                                  exe='C:\\SteamLibrary\\steamapps\\common\\Game\\Binaries\\Game-Win64-Shipping.exe',
+                                  cpu_rate=3.2, rss=6 << 30, connections=12)
+        parents = [self.game_pid]
+        for index in range(children):
+            parent = self.random.choice(parents)
+            pid = self._add(ppid=parent, name=f'CefSharp.BrowserSubprocess{index}.exe',
+                            exe='C:\\SteamLibrary\\steamapps\\common\\Game\\Launcher\\CefSharp.BrowserSubprocess.exe',
+                            cpu_rate=0.05, rss=120 << 20)
+            parents.append(pid)
+        self.tree = parents
+
+    def _add(self, ppid, name, exe, cpu_rate, rss, connections=0) -> int:
+        pid = self._next_pid
+        self._next_pid += 4
+        self.processes[pid] = FakeProcessInfo(pid, ppid, name, exe, time.time() - self.random.uniform(1, 600),
+                                              cpu_rate, rss, connections)
+        return pid
+
+    def _spawn_background(self) -> int:
+        index = self._next_pid
+        return self._add(ppid=4, name=f'service{index}.exe', exe=f'C:\\Windows\\System32\\service{index}.exe',
+                         cpu_rate=self.random.uniform(0, 0.02), rss=self.random.randint(4, 200) << 20)
+
+    def churn(self, count: int):
+        """Replace ``count`` background processes with new ones"""
+        background = [pid for pid in self.processes if pid not in self.tree]
+        for pid in self.random.sample(background, min(count, len(background))):
+            del self.processes[pid]
+        for _ in range(count):
+            self._spawn_background()
+
+    def info(self, pid) -> FakeProcessInfo:
+        try:
+            return self.processes[pid]
+        except KeyError:
+            raise NoSuchProcess(pid)
+
+
+class FakeProcess:
+    def __init__(self, system: FakeSystem, pid: int):
+        self._system = system
+        self.pid = pid
+        self._create_time = system.info(pid).create_time
+        self.info = {}
+
+    def _info(self) -> FakeProcessInfo:
+        info = self._system.info(self.pid)
+        if info.create_time != self._create_time:
+            raise NoSuchProcess(self.pid)
+        return info
+
+    def oneshot(self):
+        return contextlib.nullcontext()
+
+    def is_running(self):
+        info = self._system.processes.get(self.pid)
+        return info is not None and info.create_time == self._create_time
+
+    def name(self):
+        return self._info().name
+
+    def exe(self):
+        return self._info().exe
+
+    def ppid(self):
+        return self._info().ppid
+
+    def create_time(self):
+        return self._create_time
+
+    def cpu_times(self):
+        info = self._info()
+        busy = (time.time() - info.create_time) * info.cpu_rate
+        return pcputimes(busy * 0.8, busy * 0.2, 0.0, 0.0)
+
+    def cpu_percent(self, interval=None):
+        return self._info().cpu_rate * 100
+
+    def num_threads(self):
+        self._info()
+        return FAKE_THREADS
+
+    def threads(self):
+        # The first thread does half the work, the rest share the remainder
+        busy = sum(self.cpu_times()[:2])
+        shares = [0.5] + [0.5 / (FAKE_THREADS - 1)] * (FAKE_THREADS - 1)
+        return [pthread(self.pid + index, busy * share * 0.8, busy * share * 0.2)
+                for index, share in enumerate(shares)]
+
+    def memory_info(self):
+        info = self._info()
+        return pmem(info.rss, info.rss * 2)
+
+    def io_counters(self):
+        elapsed = time.time() - self._info().create_time
+        return pio(int(elapsed * 50), int(elapsed * 40), int(elapsed * 200000), int(elapsed * 50000))
+
+    def connections(self, kind='inet'):
+        return [pconn(*conn[:6]) for conn in _connections(self._system) if conn.pid == self.pid]
+
+    net_connections = connections
+
+    def children(self, recursive=False):
+        found, stack = [], [self.pid]
+        while stack:
+            parent = stack.pop()
+            for info in list(self._system.processes.values()):
+                if info.ppid == parent and info.pid != parent:
+                    found.append(FakeProcess(self._system, info.pid))
+                    if recursive:
+                        stack.append(info.pid)
+        return found
+
+
+def _connections(system: FakeSystem) -> List:
+    connections = []
+    for info in system.processes.values():
+        for index in range(info.connections):
+            connections.append(sconn(-1, 2, 1, addr('192.168.1.10', 50000 + index),
+                                     addr(f'192.0.2.{index % 250 + 1}', 443 + index), 'ESTABLISHED', info.pid))
+    return connections
+
+
+def make_psutil(system: FakeSystem) -> types.ModuleType:
+    module = types.ModuleType('psutil')
+    module.__dict__.update(
+        Error=Error, NoSuchProcess=NoSuchProcess, ZombieProcess=ZombieProcess,
+        AccessDenied=AccessDenied, TimeoutExpired=TimeoutExpired,
+        Process=lambda pid=None: FakeProcess(system, os.getpid() if pid is None else pid),
+        pids=lambda: list(system.processes),
+        pid_exists=lambda pid: pid in system.processes,
+        cpu_count=lambda logical=True: system.cpu_count,
+        boot_time=lambda: system.boot_time,
+    )
+
+    def process_iter(attrs=None, ad_value=None):
+        for pid in list(system.processes):
+            try:
+                process = FakeProcess(system, pid)
+            except NoSuchProcess:
+                continue
+            if attrs:
+                process.info = {attr: getattr(process, attr)() if attr != 'pid' else pid for attr in attrs}
+            yield process
+
+    def cpu_percent(interval=None, percpu=False):
+        load = sum(info.cpu_rate for info in system.processes.values()) / system.cpu_count * 100
+        return [min(100.0, load)] * system.cpu_count if percpu else min(100.0, load)
+
+    def virtual_memory():
+        total = 32 << 30
+        used = min(total, sum(info.rss for info in system.processes.values()))
+        return svmem(total, total - used, used / total * 100, used, total - used)
+
+    def disk_partitions(all=False):
+        return [sdiskpart('C:\\', 'C:\\', 'NTFS', 'rw,fixed'), sdiskpart('D:\\', 'D:\\', 'NTFS', 'rw,fixed')]
+
+    def disk_usage(path):
+        return sdiskusage(1 << 40, 600 << 30, (1 << 40) - (600 << 30), 58.6)
+
+    def disk_io_counters(perdisk=False, nowrap=True):
+        elapsed = time.time() - system.boot_time
+        counters = {
+            name: sdiskio(int(elapsed * 120), int(elapsed * 80), int(elapsed * 9e6), int(elapsed * 3e6),
+                          int(elapsed * 400), int(elapsed * 300))
+            for name in ('PhysicalDrive0', 'PhysicalDrive1')
+        }
+        if perdisk:
+            return counters
+        return sdiskio(*(sum(values) for values in zip(*counters.values())))
+
+    def sensors_temperatures(fahrenheit=False):
+        return {'coretemp': [shwtemp('Package id 0', 61.0 + system.random.random(), 100.0, 100.0)]}
+
+    def net_connections(kind='inet'):
+        return _connections(system)
+
+    module.__dict__.update(
+        process_iter=process_iter, cpu_percent=cpu_percent, virtual_memory=virtual_memory,
+        disk_partitions=disk_partitions, disk_usage=disk_usage, disk_io_counters=disk_io_counters,
+        sensors_temperatures=sensors_temperatures, net_connections=net_connections
+    )
+    return module
+
+
+class FakeWMIConnection:
+    """Answers the WMI classes the collectors query; anything else is empty"""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+
+    def _query(self, rows):
+        if self.latency:
+            time.sleep(self.latency)
+        return rows
+
+    def Win32_VideoController(self, *args, **kwargs):
+        return self._query([types.SimpleNamespace(Name="Fake GPU", AdapterRAM=8 << 30, DriverVersion="1.0")])
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self._query([])
+
+
+def make_win32(system: FakeSystem) -> Dict[str, types.ModuleType]:
+    # One visible window per process in the game tree
+    windows = {0x1000 + index: pid for index, pid in enumerate(system.tree)}
+
+    win32gui = types.ModuleType('win32gui')
+
+    def enum_windows(callback, extra):
+        for hwnd in windows:
+            if not callback(hwnd, extra):
+                break
+
+    win32gui.__dict__.update(
+        EnumWindows=enum_windows,
+        IsWindowVisible=lambda hwnd: True,
+        GetWindowLong=lambda hwnd, index: 0x10000000,
+        GetClientRect=lambda hwnd: (0, 0, 1920, 1080),
+        GetMessageTime=lambda: int(time.monotonic() * 1000),
+    )
+    win32process = types.ModuleType('win32process')
+    win32process.GetWindowThreadProcessId = lambda hwnd: (hwnd, windows.get(hwnd, 0))
+    win32con = types.ModuleType('win32con')
+    win32con.GWL_STYLE = -16
+    win32con.WS_VISIBLE = 0x10000000
+    win32api = types.ModuleType('win32api')
+    win32api.GetLogicalDrives = lambda: 0b1100  # C: and D:
+    return {'win32gui': win32gui, 'win32process': win32process, 'win32con': win32con,
+            'win32api': win32api}
+
+
+class FakeResolver:
+    """ReverseDNSCache stand-in that never touches the network"""
+
+    def display_name(self, ip: str) -> str:
+        return ip
+
+    def lookup(self, ip: str) -> Optional[str]:
+        return None
+
+    def shutdown(self):
+        pass
+
+
+def install(system: Optional[FakeSystem] = None, wmi_latency: float = 0.0) -> FakeSystem:
+    """Replace the platform modules; returns the synthetic system they report"""
+    system = system or FakeSystem()
+    sys.modules['psutil'] = make_psutil(system)
+    sys.modules.update(make_win32(system))
+
+    wmi = types.ModuleType('wmi')
+    wmi.WMI = lambda *args, **kwargs: FakeWMIConnection(wmi_latency)
+    sys.modules['wmi'] = wmi
+    pythoncom = types.ModuleType('pythoncom')
+    pythoncom.CoInitialize = lambda: None
+    pythoncom.CoUninitialize = lambda: None
+    sys.modules['pythoncom'] = pythoncom
+
+    try:
+        import logger  # noqa: F401
+    except ImportError:
+        # The GUI logging package is not needed to measure the collectors
+        sys.modules['logger'] = logging.getLogger('logger')
+    return system
+
+
+def frame_stream(count: int, fps: float = 144.0, jitter: float = 0.08,
+                 stutter_every: int = 400, seed: int = 0):
+    """Synthetic frame times (ms) with jitter and periodic hitches"""
+    # Imported here so the startup benchmark still pays for numpy itself
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    frames = 1000.0 / fps * (1.0 + rng.normal(0.0, jitter, count))
+    if stutter_every:
+        frames[stutter_every - 1::stutter_every] *= rng.uniform(2.0, 6.0, len(frames[stutter_every - 1::stutter_every]))
+    return np.clip(frames, 0.5, None)
+
+
+def presentmon_csv(frames, pid: int = 1234) -> bytes:
+    """PresentMon-style CSV rows (no header) for ``frames``"""
+    rows = [
+        f"Game-Win64-Shipping.exe,{pid},0x0000021A,DXGI,1,0,0,{index * 0.007:.6f},{frame:.4f},0.2,0.1,Hardware: Independent Flip"
+        for index, frame in enumerate(frames)
+    ]
+    return ("\n".join(rows) + "\n").encode()
@@ -0,0 +1,161 @@
+"""Timing, allocation and comparison helpers for the benchmark suite"""
+import gc
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+Setup = Callable[[], Union[Callable[[], object], Tuple[Callable[[], object], Callable[[], None]]]]
+
+
+@dataclass
+class Case:
+    """One benchmark: ``setup`` returns the call to time, optionally with a cleanup"""
+    name: str
+    setup: Setup
+    iterations: int = 2000
+    # Units of work per call (frames, rows, ...) for the throughput figure
+    ops_per_call: int = 1
+    unit: str = "calls"
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    index = min(len(ordered) - 1, max(0, int(round(fraction * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def measure(case: Case, scale: float = 1.0, warmup: int = 50, alloc_calls: int = 200) -> Dict:
+    """Latency distribution, throughput and allocations of one case.
+
+    Timing runs with the garbage collector paused so a collection triggered
+    by an earlier case does not land on this one; allocations are measured
+    in a separate tracemalloc pass because tracing slows every allocation.
+    """
+    prepared = case.setup()
+    call, cleanup = prepared if isinstance(prepared, tuple) else (prepared, None)
+    iterations = max(1, int(case.iterations * scale))
+    try:
+        for _ in range(warmup):
+            call()
+
+        timings = []
+        clock = time.perf_counter_ns
+        gc.collect()
+        gc.disable()
+        try:
+            started = clock()
+            for _ in range(iterations):
+                before = clock()
+                call()
+                timings.append(clock() - before)
+            elapsed = clock() - started
+        finally:
+            gc.enable()
+
+        tracemalloc.start()
+        try:
+            peaks = []
+            baseline, _ = tracemalloc.get_traced_memory()
+            for _ in range(min(alloc_calls, iterations)):
+                tracemalloc.reset_peak()
+                current, _ = tracemalloc.get_traced_memory()
+                call()
+                _, peak = tracemalloc.get_traced_memory()
+                peaks.append(peak - current)
+            retained, _ = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    finally:
+        if cleanup:
+            cleanup()
+
+    micros = sorted(t / 1000.0 for t in timings)
+    return {
+        'iterations': iterations,
+        'mean_us': statistics.fmean(micros),
+        'stdev_us': statistics.pstdev(micros),
+        'p50_us': _percentile(micros, 0.50),
+        'p90_us': _percentile(micros, 0.90),
+        'p99_us': _percentile(micros, 0.99),
+        'max_us': micros[-1],
+        'throughput': case.ops_per_call * iterations / (elapsed / 1e9),
+        'unit': case.unit,
+        'alloc_peak_bytes': statistics.median(peaks),
+        'alloc_retained_bytes_per_call': max(0, retained - baseline) / max(1, len(peaks))
+    }
+
+
+def environment() -> Dict:
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'timestamp': time.time(),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'commit': commit
+    }
+
+
+def save(path: str, results: Dict, meta: Dict):
+    with open(path, 'w') as f:
+        json.dump({'meta': meta, 'results': results}, f, indent=2, sort_keys=True)
+
+
+def load(path: str) -> Dict:
+    with open(path, 'r') as f:
+        return json.load(f)['results']
+
+
+def compare(results: Dict, baseline: Dict, threshold: float = 0.10) -> List[Dict]:
+    """Per-case ratios against ``baseline``; a case regresses when its median
+    latency or peak allocation grows by more than ``threshold``"""
+    rows = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            rows.append({'name': name, 'status': 'new'})
+            continue
+        latency = current['p50_us'] / previous['p50_us'] if previous['p50_us'] else None
+        alloc = (current['alloc_peak_bytes'] / previous['alloc_peak_bytes']
+                 if previous['alloc_peak_bytes'] else None)
+        regressed = ((latency is not None and latency > 1 + threshold) or
+                     (alloc is not None and alloc > 1 + threshold and
+                      current['alloc_peak_bytes'] - previous['alloc_peak_bytes'] > 1024))
+        improved = latency is not None and latency < 1 - threshold
+        rows.append({
+            'name': name,
+            'p50_ratio': latency,
+            'p99_ratio': current['p99_us'] / previous['p99_us'] if previous['p99_us'] else None,
+            'alloc_ratio': alloc,
+            'status': 'regressed' if regressed else 'improved' if improved else 'ok'
+        })
+    return rows
+
+
+def format_results(results: Dict) -> str:
+    lines = [f"{'case':<34}{'p50 us':>10}{'p99 us':>10}{'max us':>10}{'throughput':>22}{'peak KiB':>10}"]
+    for name, r in results.items():
+        throughput = f"{r['throughput']:,.0f} {r['unit']}/s"
+        lines.append(f"{name:<34}{r['p50_us']:>10.1f}{r['p99_us']:>10.1f}{r['max_us']:>10.1f}"
+                     f"{throughput:>22}{r['alloc_peak_bytes'] / 1024:>10.1f}")
+    return "\n".join(lines)
+
+
+def format_comparison(rows: List[Dict]) -> str:
+    def ratio(value: Optional[float]) -> str:
+        return f"{value:.2f}x" if value is not None else "-"
+
+    lines = [f"{'case':<34}{'p50':>8}{'p99':>8}{'alloc':>8}  status"]
+    for row in rows:
+        lines.append(f"{row['name']:<34}{ratio(row.get('p50_ratio')):>8}{ratio(row.get('p99_ratio')):>8}"
+                     f"{ratio(row.get('alloc_ratio')):>8}  {row['status']}")
+    return "\n".join(lines)
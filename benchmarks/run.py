@@ -0,0 +1,85 @@
+"""Collector and analyzer micro-benchmarks.
+
+Runs on any OS: psutil, WMI, pywin32 and nvidia-smi are replaced by the
+fakes in ``benchmarks/fakes.py`` unless ``--real-psutil`` is given, which
+also compares the Linux /proc backend with psutil on the host's processes.
+
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --baseline baseline.json --threshold 0.15
+    python -m benchmarks.run --filter frame_analyzer --scale 0.2
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks import fakes, harness  # noqa: E402
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Collector and analyzer micro-benchmarks")
+    parser.add_argument('--filter', action='append', default=[],
+                        help="only run cases whose name contains this (repeatable)")
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help="multiply every case's iteration count (default: 1)")
+    parser.add_argument('--processes', type=int, default=300,
+                        help="background processes on the synthetic system (default: 300)")
+    parser.add_argument('--children', type=int, default=40,
+                        help="helper processes under the game (default: 40)")
+    parser.add_argument('--wmi-latency-ms', type=float, default=0.0,
+                        help="delay added to every fake WMI query (default: 0)")
+    parser.add_argument('--real-psutil', action='store_true',
+                        help="keep the installed psutil; only WMI/pywin32 are faked")
+    parser.add_argument('--output', metavar='FILE', help="save results as JSON")
+    parser.add_argument('--baseline', metavar='FILE', help="compare against a saved run")
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="relative slowdown that counts as a regression (default: 0.10)")
+    parser.add_argument('--list', action='store_true', help="list the cases and exit")
+    args = parser.parse_args(argv)
+
+    real_psutil = None
+    if args.real_psutil:
+        import psutil as real_psutil
+    system = fakes.install(fakes.FakeSystem(processes=args.processes, children=args.children),
+                           wmi_latency=args.wmi_latency_ms / 1000.0)
+    if real_psutil is not None:
+        sys.modules['psutil'] = real_psutil
+
+    from benchmarks.cases import build_cases
+    cases = [case for case in build_cases(system, real_psutil=args.real_psutil)
+             if not args.filter or any(f in case.name for f in args.filter)]
+    if args.list:
+        print("\n".join(case.name for case in cases))
+        return 0
+
+    meta = {**harness.environment(), 'fake_psutil': not args.real_psutil,
+            'processes': args.processes, 'children': args.children, 'scale': args.scale}
+    output = os.path.abspath(args.output) if args.output else None
+    baseline_path = os.path.abspath(args.baseline) if args.baseline else None
+    # Collectors write settings and cache files to the working directory
+    os.chdir(tempfile.mkdtemp(prefix="pcmon-bench-"))
+
+    results = {}
+    for case in cases:
+        print(f"running {case.name}...", file=sys.stderr)
+        results[case.name] = harness.measure(case, scale=args.scale)
+
+    print(harness.format_results(results))
+    if output:
+        harness.save(output, results, meta)
+
+    if baseline_path:
+        rows = harness.compare(results, harness.load(baseline_path), args.threshold)
+        print()
+        print(harness.format_comparison(rows))
+        if any(row['status'] == 'regressed' for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
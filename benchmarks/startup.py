@@ -0,0 +1,147 @@
+"""Startup latency: time to first paint and time to first sample.
+
+Every run is a fresh interpreter so imports are measured cold (as far as the
+OS file cache allows). The GUI run needs PyQt6 and a display; ``--headless``
+measures the sampler alone, and ``--fake`` swaps in the fake platform
+backends from ``benchmarks/fakes.py`` so it also runs off Windows.
+
+    python benchmarks/startup.py --repeat 5
+    python benchmarks/startup.py --headless --fake --json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def measure_gui(pid: int, timeout: float) -> dict:
+    started = time.perf_counter()
+    from PyQt6.QtCore import QTimer
+    from PyQt6.QtWidgets import QApplication
+    app = QApplication(sys.argv[:1])
+    from modules.gui import MainWindow
+    imported = time.perf_counter()
+
+    first_sample = []
+    window = MainWindow(listeners=[lambda snapshot: first_sample or first_sample.append(time.perf_counter())])
+    constructed = time.perf_counter()
+    window.show()
+
+    def poll():
+        if window.sampler is not None and not first_sample:
+            window.sampler.set_target(pid, "benchmark")
+        if first_sample or time.perf_counter() - started > timeout:
+            app.quit()
+
+    timer = QTimer()
+    timer.timeout.connect(poll)
+    timer.start(5)
+    app.exec()
+    window.close()
+
+    return {
+        'import_ms': (imported - started) * 1000,
+        'construct_ms': (constructed - imported) * 1000,
+        'first_paint_ms': (window.first_paint_at - started) * 1000 if window.first_paint_at else None,
+        'first_sample_ms': (first_sample[0] - started) * 1000 if first_sample else None
+    }
+
+
+def measure_headless(pid: int, timeout: float, backend: str = None) -> dict:
+    started = time.perf_counter()
+    from modules.platform_backend import create_backend
+    from modules.sampler import MetricsSampler
+    imported = time.perf_counter()
+
+    sampler = MetricsSampler(backend=create_backend(backend))
+    constructed = time.perf_counter()
+    sampled = threading.Event()
+    first_sample = []
+
+    def on_snapshot(snapshot):
+        if not first_sample:
+            first_sample.append(time.perf_counter())
+            sampled.set()
+
+    sampler.add_listener(on_snapshot)
+    sampler.set_target(pid, "benchmark")
+    sampler.start()
+    sampled.wait(timeout)
+    sampler.stop()
+
+    return {
+        'import_ms': (imported - started) * 1000,
+        'construct_ms': (constructed - imported) * 1000,
+        'first_paint_ms': None,
+        'first_sample_ms': (first_sample[0] - started) * 1000 if first_sample else None
+    }
+
+
+def run_fresh(args) -> dict:
+    command = [sys.executable, os.path.abspath(__file__), '--once', '--json',
+               '--pid', str(args.pid), '--timeout', str(args.timeout)]
+    if args.headless:
+        command.append('--headless')
+    if args.fake:
+        command.append('--fake')
+    output = subprocess.run(command, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def summarize(runs: list) -> dict:
+    summary = {}
+    for key in runs[0]:
+        values = [run[key] for run in runs if run[key] is not None]
+        if values:
+            summary[key] = {'median': statistics.median(values), 'min': min(values), 'max': max(values)}
+        else:
+            summary[key] = None
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure startup latency")
+    parser.add_argument('--headless', action='store_true', help="measure the sampler without Qt")
+    parser.add_argument('--repeat', type=int, default=3, help="fresh processes to run (default: 3)")
+    parser.add_argument('--pid', type=int, default=os.getpid(),
+                        help="process to sample (default: the benchmark itself)")
+    parser.add_argument('--timeout', type=float, default=30.0, help="give up after this many seconds")
+    parser.add_argument('--fake', action='store_true', help="use the fake platform backends")
+    parser.add_argument('--json', action='store_true', help="print JSON instead of a table")
+    parser.add_argument('--once', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.once:
+        if args.fake:
+            from benchmarks import fakes
+            # Real pids do not exist on the synthetic system; sample its game
+            args.pid = fakes.install().game_pid
+        if args.headless:
+            # The fake system is only reachable through the psutil-based backend
+            result = measure_headless(args.pid, args.timeout, 'windows' if args.fake else None)
+        else:
+            result = measure_gui(args.pid, args.timeout)
+        print(json.dumps(result))
+        return
+
+    summary = summarize([run_fresh(args) for _ in range(args.repeat)])
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+    print(f"{'metric':<18}{'median':>10}{'min':>10}{'max':>10}  (ms, {args.repeat} runs)")
+    for key, stats in summary.items():
+        if stats is None:
+            print(f"{key:<18}{'-':>10}")
+        else:
+            print(f"{key:<18}{stats['median']:>10.1f}{stats['min']:>10.1f}{stats['max']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,7 @@
 import sys
 import json
 import os
-from PyQt6.QtWidgets import QApplication
-from modules.gui import MainWindow
+import argparse
 
 CONFIG_FILE = "last_session.json"
 
@@ -23,23 +22,79 @@ def load_last_process():
         print(f"Warning: Could not load last process: {e}")
     return None
 
-def main():
-    app = QApplication(sys.argv)
-    window = MainWindow()
-    
-    last_pid = load_last_process()
-    if last_pid:
-        for i in range(window.process_selector.count()):
-            if window.process_selector.itemData(i) == last_pid:
-                window.process_selector.setCurrentIndex(i)
-                break
-    
-    window.process_selector.currentIndexChanged.connect(
-        lambda: save_last_process(window.process_selector.currentData())
-    )
-    
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="PC Performance Monitor")
+    parser.add_argument('--record', metavar='FILE',
+                        help="record every sample of the session to FILE")
+    parser.add_argument('--replay', metavar='FILE',
+                        help="play back a recorded session instead of monitoring live")
+    parser.add_argument('--speed', type=float, default=1.0,
+                        help="replay speed multiplier, 0 for as fast as possible (default: 1)")
+    headless = parser.add_argument_group("headless mode")
+    headless.add_argument('--headless', metavar='PROCESS',
+                          help="collect for PROCESS (PID or executable name) without a GUI")
+    headless.add_argument('--interval', type=float, default=None,
+                          help="sampler tick in seconds (default: refresh_rate from settings.json)")
+    headless.add_argument('--output', metavar='FILE',
+                          help="write records to FILE instead of stdout")
+    headless.add_argument('--format', choices=('jsonl', 'binary'), default='jsonl',
+                          help="JSON lines or the --record session format (default: jsonl)")
+    headless.add_argument('--watch', metavar='PROCESS', action='append',
+                          help="also sample PROCESS every tick (repeatable)")
+    headless.add_argument('--exporter-port', type=int, metavar='PORT',
+                          help="serve OpenMetrics at http://127.0.0.1:PORT/metrics")
+    analysis = parser.add_argument_group("offline analysis")
+    analysis.add_argument('--analyze', metavar='PATH', nargs='+',
+                          help="summarize recorded sessions and PresentMon CSVs in PATH (files or directories)")
+    analysis.add_argument('--jobs', type=int, default=None,
+                          help="worker processes for --analyze (default: one per core)")
+    analysis.add_argument('--summary', metavar='FILE',
+                          help="also write the --analyze summary table to FILE as CSV")
+    return parser.parse_args(argv)
+
+def run_gui(args):
+    # Qt is only imported for the GUI so headless runs stay light
+    from PyQt6.QtWidgets import QApplication
+    from modules.gui import MainWindow
+
+    app = QApplication(sys.argv[:1])
+
+    sampler = None
+    if args.replay:
+        from modules.recorder import SessionPlayer
+        sampler = SessionPlayer(args.replay, speed=args.speed)
+
+    listeners = []
+    if args.record:
+        from modules.recorder import SessionRecorder
+        recorder = SessionRecorder(args.record)
+        listeners.append(recorder.record)
+        app.aboutToQuit.connect(recorder.close)
+
+    # The process list is filled in the background after the window shows;
+    # the last process is selected once it appears
+    window = MainWindow(sampler=sampler, listeners=listeners,
+                        preferred_pid=None if args.replay else load_last_process())
+
+    if not args.replay:
+        window.process_selector.currentIndexChanged.connect(
+            lambda: save_last_process(window.process_selector.currentData())
+        )
+
     window.show()
-    sys.exit(app.exec())
+    return app.exec()
+
+def main():
+    args = parse_args(sys.argv[1:])
+    if args.analyze:
+        from modules.session_analysis import run_analysis
+        sys.exit(run_analysis(args.analyze, jobs=args.jobs, output=args.summary))
+    if args.headless:
+        from modules.headless import run_headless
+        sys.exit(run_headless(args.headless, interval=args.interval,
+                              output=args.output, output_format=args.format,
+                              exporter_port=args.exporter_port, watch=args.watch))
+    sys.exit(run_gui(args))
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
\ No newline at end of file
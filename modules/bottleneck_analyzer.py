@@ -1,45 +1,303 @@
 import numpy as np
-from dataclasses import dataclass
-from typing import Dict, Optional
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
 import logger
 
+COMPONENTS = ('CPU', 'GPU', 'RAM')
+# Windowed mean utilization (%) where a resource starts to count as saturated,
+# and where it fully is. The CPU signal is the busier of the whole machine
+# and the game's busiest thread, so one pegged render thread counts.
+SATURATION = {'CPU': (60.0, 90.0), 'GPU': (75.0, 97.0), 'RAM': (80.0, 95.0)}
+# Seconds of history a verdict is based on
+WINDOW_SECONDS = 10.0
+
+
 @dataclass
 class BottleneckResult:
     exists: bool
     component: Optional[str]
     severity: float  # 0-1 scale
     description: str
+    scores: Dict[str, float] = field(default_factory=dict)
+
+
+def cpu_signal(system_cpu, busiest_thread, process_cpu):
+    """CPU utilization as scored: the highest of the machine, the game's busiest
+    thread and the game's share; scalars or arrays alike"""
+    return np.maximum(np.maximum(system_cpu, busiest_thread), process_cpu)
+
+
+def _prefix_sums(values: np.ndarray) -> np.ndarray:
+    """Cumulative sums along the first axis with a leading zero row"""
+    sums = np.zeros((len(values) + 1,) + values.shape[1:])
+    np.cumsum(values, axis=0, out=sums[1:])
+    return sums
+
+
+def _correlation(sum_x, sum_xx, sum_xy, sum_y, sum_yy, counts):
+    """Pearson correlation from window sums; 0 where either side is flat"""
+    covariance = sum_xy - sum_x * sum_y / counts
+    var_x = sum_xx - sum_x * sum_x / counts
+    var_y = sum_yy - sum_y * sum_y / counts
+    # Running sums carry rounding error; a spread below it is a flat window
+    valid = (var_x > 1e-9 * sum_xx + 1e-12) & (var_y > 1e-9 * sum_yy + 1e-12)
+    return np.where(valid, covariance / np.sqrt(np.where(valid, var_x * var_y, 1.0)), 0.0)
+
+
+def _score(means: np.ndarray, correlations: np.ndarray) -> np.ndarray:
+    low = np.array([SATURATION[component][0] for component in COMPONENTS])
+    high = np.array([SATURATION[component][1] for component in COMPONENTS])
+    saturation = np.clip((means - low) / (high - low), 0.0, 1.0)
+    return saturation * (0.75 + 0.25 * correlations)
+
+
+def _window_sums(prefix: np.ndarray, offset: int, rows: int, window: int) -> np.ndarray:
+    """Sums over the last ``window`` entries (fewer at the start) of the
+    ``rows`` entries whose prefix sums begin at ``prefix[offset]``"""
+    sums = prefix[offset + 1:offset + rows + 1].copy()
+    if rows > window:
+        sums[window:] -= prefix[offset + 1:offset + rows + 1 - window]
+    sums[:window] -= prefix[offset]
+    return sums
+
+
+def _block_scores(x: np.ndarray, y: np.ndarray, window: int,
+                  max_lag: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    rows = len(y)
+    counts = np.minimum(np.arange(1, rows + 1), window).astype(np.float64)[:, None]
+    sum_y = _window_sums(_prefix_sums(y), 0, rows, window)[:, None]
+    sum_yy = _window_sums(_prefix_sums(y * y), 0, rows, window)[:, None]
+
+    # Every delayed copy is a slice of one series padded with its first row:
+    # a delay of ``lag`` starts at offset max_lag - lag
+    padded = np.concatenate((np.repeat(x[:1], max_lag, axis=0), x))
+    x_sums = _prefix_sums(padded)
+    xx_sums = _prefix_sums(padded * padded)
+    y_column = y[:, None]
+
+    correlations = np.full((rows, len(COMPONENTS)), -1.0)
+    for lag in range(max_lag + 1):
+        offset = max_lag - lag
+        xy_sums = _prefix_sums(padded[offset:offset + rows] * y_column)
+        np.maximum(correlations, _correlation(
+            _window_sums(x_sums, offset, rows, window), _window_sums(xx_sums, offset, rows, window),
+            _window_sums(xy_sums, 0, rows, window), sum_y, sum_yy, counts
+        ), out=correlations)
+    np.clip(correlations, -1.0, 1.0, out=correlations)
+
+    means = _window_sums(x_sums, max_lag, rows, window) / counts
+    return _score(means, correlations), means, correlations
+
+
+def bottleneck_scores(signals: np.ndarray, frame_time: np.ndarray, window: int, max_lag: int,
+                      block: int = 16384) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Per-sample scores for every row of ``signals`` (N x COMPONENTS, percent).
+
+    Each row looks back over ``window`` samples (fewer at the start). A
+    resource's score is its windowed mean utilization mapped onto its
+    SATURATION range, weighted by the strongest Pearson correlation between
+    the resource and frame time with the resource leading by 0 to
+    ``max_lag`` samples: a saturated resource that frame-time spikes follow
+    scores up to 1, one the frame time ignores 0.75, one that moves against
+    it 0.5. Window sums are differences of prefix sums, so the cost is
+    linear in N whatever the window. Long inputs are scored ``block`` rows
+    at a time, each with the history its first row needs, which keeps the
+    temporaries in cache and the prefix sums short enough to stay exact.
+
+    Returns (scores, windowed means, correlations), each N x COMPONENTS.
+    """
+    x = np.asarray(signals, dtype=np.float64)
+    y = np.asarray(frame_time, dtype=np.float64)
+    rows = len(y)
+    if rows <= block:
+        return _block_scores(x, y, window, max_lag)
+
+    outputs = tuple(np.empty((rows, len(COMPONENTS))) for _ in range(3))
+    history = window - 1 + max_lag
+    for first in range(0, rows, block):
+        begin = max(0, first - history)
+        last = min(rows, first + block)
+        for output, values in zip(outputs, _block_scores(x[begin:last], y[begin:last], window, max_lag)):
+            output[first:last] = values[first - begin:]
+    return outputs
+
+
+def latest_scores(history: np.ndarray, window: int,
+                  max_lag: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """``bottleneck_scores`` of the last row only, for a full history.
+
+    ``history`` holds the last ``window + max_lag`` rows of the signals with
+    frame time as the final column; the windows are strided views, so a
+    live tick costs a handful of small array operations.
+    """
+    x = history[:, :len(COMPONENTS)]
+    y = history[-window:, len(COMPONENTS)]
+    # windows[j] covers rows j .. j + window - 1, i.e. a delay of max_lag - j
+    windows = np.lib.stride_tricks.sliding_window_view(x, window, axis=0)
+    sum_x = windows.sum(axis=-1)
+    correlations = _correlation(sum_x, (windows * windows).sum(axis=-1), windows @ y,
+                                y.sum(), y @ y, float(window)).max(axis=0)
+    np.clip(correlations, -1.0, 1.0, out=correlations)
+    means = sum_x[-1] / window
+    return _score(means, correlations), means, correlations
+
+
+def apply_hysteresis(scores: np.ndarray, enter: float, exit: float, hold: int) -> np.ndarray:
+    """Verdict per row: 0 for none, else 1 + the COMPONENTS index.
+
+    A row proposes the top component when its score reaches ``enter``,
+    "none" when every score is below ``exit``, and nothing in between. A
+    proposal only becomes the verdict after ``hold`` identical rows in a
+    row; until then the previous verdict stands.
+    """
+    rows = len(scores)
+    index = np.arange(rows)
+    top = scores.max(axis=1)
+    candidate = np.where(top >= enter, scores.argmax(axis=1) + 1, np.where(top < exit, 0, -1))
+    run_starts = np.ones(rows, dtype=bool)
+    run_starts[1:] = candidate[1:] != candidate[:-1]
+    run_start = np.maximum.accumulate(np.where(run_starts, index, 0))
+    accepted = (index - run_start + 1 >= hold) & (candidate >= 0)
+    last = np.maximum.accumulate(np.where(accepted, index, -1))
+    return np.where(last >= 0, candidate[np.maximum(last, 0)], 0)
+
+
+def frame_time_signal(frame_time: np.ndarray, fps: np.ndarray) -> np.ndarray:
+    """Per-tick frame time (ms), from the measured value or FPS, gaps forward-filled"""
+    frame_time = np.asarray(frame_time, dtype=np.float64)
+    fps = np.asarray(fps, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        values = np.where(frame_time > 0, frame_time, np.where(fps > 0, 1000.0 / fps, np.nan))
+    known = ~np.isnan(values)
+    if not known.any():
+        return np.zeros(len(values))
+    index = np.maximum.accumulate(np.where(known, np.arange(len(values)), 0))
+    filled = values[index]
+    filled[:np.argmax(known)] = 0.0
+    return filled
+
+
+def window_for_interval(interval: float, seconds: float = WINDOW_SECONDS) -> int:
+    """Ticks covering ``seconds`` at the given sampling interval"""
+    return max(8, int(round(seconds / interval))) if interval > 0 else 40
+
 
 class BottleneckAnalyzer:
-    def __init__(self):
-        self.HIGH_USAGE_THRESHOLD = 90.0
-        self.LOW_USAGE_THRESHOLD = 30.0
-        
+    """Bottleneck verdicts from a rolling window instead of single samples.
+
+    ``analyze`` is fed one tick at a time and scores the last ``window``
+    ticks with the same vectorized code ``analyze_session`` runs over a whole
+    recording, so a live verdict and a replayed one agree. The verdict only
+    changes after ``hold`` consecutive ticks propose the same thing (see
+    ``apply_hysteresis``).
+    """
+
+    def __init__(self, window: int = 40, max_lag: int = 4, enter: float = 0.6,
+                 exit: float = 0.4, hold: int = 3):
+        self.window = window
+        self.max_lag = max_lag
+        self.enter = enter
+        self.exit = exit
+        self.hold = hold
+        self.reset()
+
+    def reset(self):
+        # Rows: the window plus the lag history its oldest sample needs
+        self._history = np.zeros((self.window + self.max_lag, len(COMPONENTS) + 1))
+        self._count = 0
+        self._candidate = None
+        self._run = 0
+        self._verdict = 0
+
+    @staticmethod
+    def _sample(process_metrics, system_metrics) -> Tuple[float, float, float, Optional[float]]:
+        cpu = float(cpu_signal(system_metrics.get('cpu', {}).get('utilization', 0) or 0,
+                               process_metrics.get('busiest_thread_percent', 0) or 0,
+                               process_metrics.get('cpu_percent', 0) or 0))
+        gpu = system_metrics.get('gpu', {}).get('utilization', 0) or 0
+        memory = max(process_metrics.get('memory_percent', 0) or 0,
+                     system_metrics.get('memory', {}).get('percent', 0) or 0)
+        frame_time = process_metrics.get('frame_time')
+        if not frame_time and process_metrics.get('fps'):
+            frame_time = 1000.0 / process_metrics['fps']
+        return cpu, gpu, memory, frame_time
+
     def analyze(self, process_metrics, system_metrics):
-        """Analyze metrics to detect bottlenecks"""
+        """Add one tick and return the current verdict"""
         try:
-            cpu_usage = process_metrics['cpu_percent']
-            gpu_info = system_metrics.get('gpu', {})
-            gpu_usage = gpu_info.get('utilization', 0)
-            memory_percent = process_metrics['memory_percent']
-            
-            # CPU Bottleneck
-            if cpu_usage > self.HIGH_USAGE_THRESHOLD and gpu_usage < self.LOW_USAGE_THRESHOLD:
-                severity = min((cpu_usage - self.HIGH_USAGE_THRESHOLD) / 10.0, 1.0)
-                return BottleneckResult(True, "CPU", severity, "CPU bottleneck detected")
-                
-            # GPU Bottleneck
-            if gpu_usage > self.HIGH_USAGE_THRESHOLD and cpu_usage < self.LOW_USAGE_THRESHOLD:
-                severity = min((gpu_usage - self.HIGH_USAGE_THRESHOLD) / 10.0, 1.0)
-                return BottleneckResult(True, "GPU", severity, "GPU bottleneck detected")
-                
-            # Memory Bottleneck
-            if memory_percent > self.HIGH_USAGE_THRESHOLD:
-                severity = min((memory_percent - self.HIGH_USAGE_THRESHOLD) / 10.0, 1.0)
-                return BottleneckResult(True, "RAM", severity, "Memory bottleneck detected")
-                
-            return BottleneckResult(False, None, 0.0, "No bottleneck detected")
-            
+            cpu, gpu, memory, frame_time = self._sample(process_metrics, system_metrics)
+            if not frame_time:
+                # Hold the last frame time so a missing reading is not a spike
+                frame_time = self._history[-1, -1] if self._count else 0.0
+
+            history = self._history
+            history[:-1] = history[1:]
+            history[-1] = (cpu, gpu, memory, frame_time)
+            self._count += 1
+            rows = history[-min(self._count, len(history)):]
+
+            if len(rows) == len(history):
+                scores, means, correlations = latest_scores(history, self.window, self.max_lag)
+            else:
+                # Still filling: score the short history exactly as a session start is scored
+                scores, means, correlations = (
+                    values[-1] for values in bottleneck_scores(rows[:, :-1], rows[:, -1], self.window, self.max_lag)
+                )
+
+            top = scores.max()
+            if top >= self.enter:
+                candidate = int(scores.argmax()) + 1
+            elif top < self.exit:
+                candidate = 0
+            else:
+                candidate = -1
+            if candidate == self._candidate:
+                self._run += 1
+            else:
+                self._candidate, self._run = candidate, 1
+            if self._run >= self.hold and candidate >= 0:
+                self._verdict = candidate
+
+            named = {component: float(score) for component, score in zip(COMPONENTS, scores)}
+            if not self._verdict:
+                return BottleneckResult(False, None, 0.0, "No bottleneck detected", named)
+            column = self._verdict - 1
+            component = COMPONENTS[column]
+            return BottleneckResult(
+                True, component, float(scores[column]),
+                f"{component} bottleneck detected ({means[column]:.0f}% over the window, "
+                f"frame-time correlation {correlations[column]:+.2f})",
+                named
+            )
+
         except Exception as e:
             logger.error(f"Error in bottleneck analysis: {e}")
-            return BottleneckResult(False, None, 0.0, "Analysis error") 
\ No newline at end of file
+            return BottleneckResult(False, None, 0.0, "Analysis error")
+
+
+def analyze_session(ticks: Dict[str, np.ndarray], frames: Optional[Dict[str, np.ndarray]] = None,
+                    window: int = 40, max_lag: int = 4, enter: float = 0.6, exit: float = 0.4,
+                    hold: int = 3) -> Dict[str, np.ndarray]:
+    """Bottleneck timeline of a whole recording (``SessionReader`` tables).
+
+    Returns per-tick ``verdict`` codes (0 none, then COMPONENTS in order,
+    matching the recorder's bottleneck codes), ``severity`` and the raw
+    ``scores``.
+    """
+    rows = len(ticks['timestamp'])
+    frame_time = np.zeros(rows)
+    if frames is not None and len(frames['tick']):
+        counts = np.bincount(frames['tick'], minlength=rows)[:rows]
+        sums = np.bincount(frames['tick'], weights=frames['frame_time'], minlength=rows)[:rows]
+        frame_time = np.divide(sums, counts, out=np.zeros(rows), where=counts > 0)
+    frame_time = frame_time_signal(frame_time, ticks['fps'])
+
+    signals = np.column_stack((
+        cpu_signal(ticks['system_cpu'], ticks.get('busiest_thread_percent', 0), ticks['cpu_percent']),
+        ticks['gpu_utilization'],
+        np.maximum(ticks['memory_percent'], ticks['memory_used_percent'])
+    ))
+    scores, _, _ = bottleneck_scores(signals, frame_time, window, max_lag)
+    verdict = apply_hysteresis(scores, enter, exit, hold)
+    severity = np.where(verdict > 0, scores[np.arange(rows), np.maximum(verdict - 1, 0)], 0.0)
+    return {'verdict': verdict.astype(np.uint8), 'severity': severity, 'scores': scores}
@@ -1,10 +1,31 @@
 import json
 import os
 
+from .scheduler import DEFAULT_COLLECTOR_INTERVALS
+
 DEFAULT_CONFIG = {
-    "refresh_rate": 500,
-    "history_size": 60,
+    "refresh_rate": 250,  # sampler tick (ms); no collector runs more often than this
+    "collector_intervals": dict(DEFAULT_COLLECTOR_INTERVALS),  # ms between runs of each collector
+    "max_render_rate": 4,  # GUI redraws per second, independent of sampling
+    "platform_backend": "auto",  # "windows", "linux" (/proc and sysfs) or "psutil"
+    "history_size": 60,  # seconds of graph history
     "dark_mode": True,
+    "frame_source": {
+        "type": "none",  # "presentmon" or "mangohud"
+        "path": ""  # CSV log file, or a directory to follow the newest log in
+    },
+    "input_latency": {
+        "type": "none",  # "live" (foreground input + presents of the PresentMon frame_source) or "replay"
+        "path": ""  # replay: file of time,pid,kind lines
+    },
+    "instrumentation": {
+        "enabled": True  # collector/render timing histograms and the Diagnostics tab
+    },
+    "exporter": {
+        "enabled": False,
+        "host": "127.0.0.1",
+        "port": 9464
+    },
     "thresholds": {
         "cpu_warning": 90,
         "gpu_warning": 90,
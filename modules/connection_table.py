@@ -0,0 +1,81 @@
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .platform_backend import Connection, PlatformBackend, create_backend
+
+logger = logging.getLogger(__name__)
+
+# (pid, type, local address, remote address): one server connection
+ConnectionKey = Tuple[Optional[int], str, Tuple[str, int], Tuple[str, int]]
+
+
+@dataclass(frozen=True)
+class ConnectionSnapshot:
+    """The system-wide connection table as read in one tick.
+
+    ``opened`` and ``closed`` are the connections to a remote endpoint that
+    appeared or went away since the previous snapshot; on the first one
+    every existing connection counts as opened.
+    """
+    timestamp: float
+    connections: List[Connection] = field(default_factory=list)
+    by_pid: Dict[Optional[int], List[Connection]] = field(default_factory=dict)
+    by_remote: Dict[Tuple[str, int], List[Connection]] = field(default_factory=dict)
+    opened: List[Connection] = field(default_factory=list)
+    closed: List[Connection] = field(default_factory=list)
+
+    def for_pid(self, pid: int) -> List[Connection]:
+        return self.by_pid.get(pid, [])
+
+    def for_remote(self, ip: str, port: int) -> List[Connection]:
+        return self.by_remote.get((ip, port), [])
+
+
+def _key(connection: Connection) -> ConnectionKey:
+    return connection.pid, connection.type, connection.laddr, connection.raddr
+
+
+class ConnectionTable:
+    """Reads the OS connection table once per tick for every consumer.
+
+    Asking each process for its own connections makes the OS walk the
+    whole table once per process; ``refresh`` walks it once and indexes the
+    result by pid and by remote endpoint, and collectors read
+    ``latest`` instead of querying again.
+    """
+
+    def __init__(self, backend: Optional[PlatformBackend] = None):
+        self.backend = backend or create_backend()
+        self.latest: Optional[ConnectionSnapshot] = None
+        self._remote: Dict[ConnectionKey, Connection] = {}
+
+    def refresh(self, pids: Optional[Iterable[int]] = None) -> ConnectionSnapshot:
+        """Read the table; sockets of ``pids`` are guaranteed to carry their pid"""
+        try:
+            connections = self.backend.net_connections(pids)
+        except Exception as e:
+            logger.error(f"Error reading connection table: {e}")
+            connections = []
+
+        by_pid: Dict[Optional[int], List[Connection]] = {}
+        by_remote: Dict[Tuple[str, int], List[Connection]] = {}
+        remote: Dict[ConnectionKey, Connection] = {}
+        for connection in connections:
+            by_pid.setdefault(connection.pid, []).append(connection)
+            if connection.raddr:
+                by_remote.setdefault(connection.raddr, []).append(connection)
+                remote[_key(connection)] = connection
+
+        previous = self._remote
+        self._remote = remote
+        self.latest = ConnectionSnapshot(
+            timestamp=time.time(),
+            connections=connections,
+            by_pid=by_pid,
+            by_remote=by_remote,
+            opened=[remote[key] for key in remote.keys() - previous.keys()],
+            closed=[previous[key] for key in previous.keys() - remote.keys()]
+        )
+        return self.latest
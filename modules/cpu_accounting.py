@@ -0,0 +1,89 @@
+import logging
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+import psutil
+
+from .platform_backend import ProcessStat
+
+logger = logging.getLogger(__name__)
+
+
+class TreeCpuTracker:
+    """CPU usage of a process tree from cpu_times() deltas.
+
+    Each call takes the accumulated user+system time of every member (as
+    read by the platform backend) and divides the growth since the previous
+    call by the monotonic time that actually passed, so nothing sleeps and
+    any number of children costs one stat read each. Members are keyed by
+    (pid, create_time); a child that started during the interval counts from
+    zero, while one seen for the first time but older than the interval only
+    sets its baseline.
+    """
+
+    def __init__(self, cpu_count: Optional[int] = None):
+        self.cpu_count = cpu_count or psutil.cpu_count() or 1
+        # root pid -> (monotonic time, wall time, {(pid, create_time): cpu seconds})
+        self._last: Dict[int, Tuple[float, float, Dict[Tuple[int, float], float]]] = {}
+
+    def update(self, root_pid: int, stats: Iterable[ProcessStat]) -> Tuple[float, float]:
+        """Return (normalized, per_core) percent for the tree whose ``stats`` were just read.
+
+        ``normalized`` is a share of the whole machine (0-100); ``per_core``
+        counts 100 per fully busy core. The first call for a root returns 0.
+        """
+        now = time.monotonic()
+        wall = time.time()
+        totals = {(stat.pid, stat.create_time): stat.cpu_time for stat in stats}
+
+        previous = self._last.get(root_pid)
+        self._last[root_pid] = (now, wall, totals)
+        if previous is None:
+            return 0.0, 0.0
+        last_time, last_wall, last_totals = previous
+        elapsed = now - last_time
+        if elapsed <= 0:
+            return 0.0, 0.0
+
+        busy = 0.0
+        for key, total in totals.items():
+            before = last_totals.get(key)
+            if before is None:
+                # Started inside the interval: all of its time is new
+                before = 0.0 if key[1] >= last_wall else total
+            busy += max(0.0, total - before)
+
+        per_core = busy / elapsed * 100
+        return min(100.0, per_core / self.cpu_count), min(per_core, 100.0 * self.cpu_count)
+
+    def forget(self, pid: int):
+        self._last.pop(pid, None)
+
+
+class ThreadCpuTracker:
+    """Busiest-thread CPU of a process from per-thread time deltas.
+
+    A game whose main or render thread sits at a full core is CPU bound even
+    when the process total looks modest on a many-core machine.
+    """
+
+    def __init__(self):
+        # pid -> (monotonic time, {tid: cpu seconds})
+        self._last: Dict[int, Tuple[float, Dict[int, float]]] = {}
+
+    def update(self, pid: int, times: Dict[int, float]) -> float:
+        """Percent of one core used by the busiest thread since the previous call"""
+        now = time.monotonic()
+        previous = self._last.get(pid)
+        self._last[pid] = (now, times)
+        if previous is None or not times:
+            return 0.0
+        elapsed = now - previous[0]
+        if elapsed <= 0:
+            return 0.0
+        last_times = previous[1]
+        busiest = max(total - last_times.get(tid, total) for tid, total in times.items())
+        return max(0.0, min(100.0, busiest / elapsed * 100))
+
+    def forget(self, pid: int):
+        self._last.pop(pid, None)
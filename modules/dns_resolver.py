@@ -0,0 +1,96 @@
+import logging
+import queue
+import socket
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ReverseDNSCache:
+    """Non-blocking reverse DNS lookups backed by a TTL-bounded LRU cache.
+
+    ``lookup`` never waits on the network: it returns the cached hostname (or
+    ``None`` while a lookup is pending or after it failed) and queues a
+    background resolution when the entry is missing or expired. Lookups run
+    on daemon threads, so a slow resolver never holds up interpreter exit.
+    """
+
+    def __init__(self, max_entries: int = 1024, positive_ttl: float = 3600.0,
+                 negative_ttl: float = 300.0, max_workers: int = 4):
+        self.max_entries = max_entries
+        self.positive_ttl = positive_ttl
+        self.negative_ttl = negative_ttl
+        self._cache = OrderedDict()  # ip -> (hostname or None, expires_at)
+        self._pending = set()
+        self._lock = threading.Lock()
+        self.max_workers = max_workers
+        self._queue: 'queue.Queue[Optional[str]]' = queue.Queue()
+        self._workers: List[threading.Thread] = []
+        self._closed = False
+
+    def lookup(self, ip: str) -> Optional[str]:
+        """Return the resolved hostname for ``ip`` or None if not known yet"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._cache.get(ip)
+            if entry is not None:
+                hostname, expires_at = entry
+                self._cache.move_to_end(ip)
+                if expires_at > now:
+                    return hostname
+            if ip not in self._pending and not self._closed:
+                self._pending.add(ip)
+                self._queue.put(ip)
+                if len(self._workers) < min(self.max_workers, len(self._pending)):
+                    worker = threading.Thread(target=self._work, daemon=True,
+                                              name=f"rdns-{len(self._workers)}")
+                    self._workers.append(worker)
+                    worker.start()
+            # Serve a stale name while it is being refreshed
+            return entry[0] if entry is not None else None
+
+    def display_name(self, ip: str) -> str:
+        """Hostname if resolved, otherwise the raw IP"""
+        return self.lookup(ip) or ip
+
+    def _work(self):
+        while True:
+            ip = self._queue.get()
+            if ip is None:
+                return
+            self._resolve(ip)
+
+    def _resolve(self, ip: str):
+        try:
+            hostname = socket.gethostbyaddr(ip)[0]
+            ttl = self.positive_ttl
+        except (socket.herror, socket.gaierror, OSError):
+            hostname = None
+            ttl = self.negative_ttl
+        except Exception as e:
+            logger.debug(f"Reverse lookup for {ip} failed: {e}")
+            hostname = None
+            ttl = self.negative_ttl
+
+        with self._lock:
+            self._pending.discard(ip)
+            self._cache[ip] = (hostname, time.monotonic() + ttl)
+            self._cache.move_to_end(ip)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+    def shutdown(self):
+        """Drop queued lookups and let the workers exit; never waits on one in flight"""
+        with self._lock:
+            self._closed = True
+            self._pending.clear()
+            while True:
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            for _ in self._workers:
+                self._queue.put(None)
@@ -0,0 +1,219 @@
+import logging
+import math
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+PREFIX = "pcmon"
+BOTTLENECK_COMPONENTS = ("CPU", "GPU", "RAM")
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_value(value: float) -> str:
+    """OpenMetrics spelling of a sample value; Python's repr says nan and inf"""
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(value)
+
+
+def _labels(labels: Dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+class _MetricFamilies:
+    """Collects samples grouped by metric family, in first-seen order"""
+
+    def __init__(self):
+        self.families: Dict[str, Dict] = {}
+
+    def add(self, name: str, help_text: str, value, labels: Optional[Dict] = None,
+            unit: Optional[str] = None):
+        if value is None:
+            return
+        family = self.families.setdefault(name, {'help': help_text, 'unit': unit, 'samples': []})
+        family['samples'].append((labels or {}, float(value)))
+
+    def render(self) -> bytes:
+        lines: List[str] = []
+        for name, family in self.families.items():
+            full_name = f"{PREFIX}_{name}"
+            lines.append(f"# TYPE {full_name} gauge")
+            if family['unit']:
+                lines.append(f"# UNIT {full_name} {family['unit']}")
+            lines.append(f"# HELP {full_name} {family['help']}")
+            for labels, value in family['samples']:
+                lines.append(f"{full_name}{_labels(labels)} {_format_value(value)}")
+        lines.append("# EOF")
+        return ("\n".join(lines) + "\n").encode('utf-8')
+
+
+def render_snapshot(snapshot) -> bytes:
+    """Render a MetricsSnapshot as an OpenMetrics text exposition"""
+    metrics = _MetricFamilies()
+    target = {'pid': snapshot.pid, 'process': snapshot.process_name}
+
+    processes = {snapshot.pid: {'name': snapshot.process_name, **(snapshot.process or {})}}
+    processes.update(snapshot.targets or {})
+    for pid, process in processes.items():
+        labels = {'pid': pid, 'process': process.get('name', '')}
+        metrics.add("process_cpu_percent", "CPU usage of the monitored process tree as a share of all cores",
+                    process.get('cpu_percent'), labels)
+        metrics.add("process_cpu_cores_percent", "CPU usage of the process tree, 100 per busy core",
+                    process.get('cpu_percent_cores'), labels)
+        metrics.add("process_busiest_thread_percent", "CPU usage of the process's busiest thread, 100 per core",
+                    process.get('busiest_thread_percent'), labels)
+        metrics.add("process_memory_percent", "Memory usage of the monitored process",
+                    process.get('memory_percent'), labels)
+        metrics.add("process_fps", "Frames per second of the monitored process",
+                    process.get('fps'), labels)
+
+    for pid, latency in (snapshot.input_latency or {}).items():
+        labels = {'pid': pid, 'process': processes.get(pid, {}).get('name', '')}
+        for quantile, key in (("0.5", 'p50_ms'), ("0.95", 'p95_ms'), ("0.99", 'p99_ms')):
+            metrics.add("input_latency_milliseconds", "Input-to-present latency over the recent inputs",
+                        latency.get(key), {**labels, 'quantile': quantile}, unit="milliseconds")
+
+    frame = snapshot.frame or {}
+    if frame:
+        metrics.add("frame_time_milliseconds", "Average frame time over the analysis window",
+                    frame.get('avg_frame_time'), target, unit="milliseconds")
+        metrics.add("frame_time_low_milliseconds", "Frame time of the slowest frames in the window",
+                    frame.get('1%_low'), {**target, 'low': "1%"}, unit="milliseconds")
+        metrics.add("frame_time_low_milliseconds", "Frame time of the slowest frames in the window",
+                    frame.get('0.1%_low'), {**target, 'low': "0.1%"}, unit="milliseconds")
+        metrics.add("frame_time_variance", "Frame time variance over the window (ms^2)",
+                    frame.get('frame_time_variance'), target)
+        metrics.add("frame_stutters", "Stutters in the analysis window",
+                    frame.get('stutters_detected'), target)
+
+    system = snapshot.system or {}
+    cpu = system.get('cpu', {})
+    memory = system.get('memory', {})
+    metrics.add("system_cpu_percent", "System-wide CPU usage", cpu.get('utilization'))
+    metrics.add("cpu_temperature_celsius", "CPU temperature", cpu.get('temperature'), unit="celsius")
+    metrics.add("system_memory_percent", "System-wide memory usage", memory.get('percent'))
+
+    storage = system.get('storage', {})
+    for disk, io in storage.get('disks', {}).items():
+        labels = {'disk': disk}
+        metrics.add("disk_read_bytes_per_second", "Bytes read from the disk per second",
+                    io.get('read_bytes_per_sec'), labels, unit="bytes_per_second")
+        metrics.add("disk_write_bytes_per_second", "Bytes written to the disk per second",
+                    io.get('write_bytes_per_sec'), labels, unit="bytes_per_second")
+        metrics.add("disk_read_iops", "Read requests completed per second", io.get('read_iops'), labels)
+        metrics.add("disk_write_iops", "Write requests completed per second", io.get('write_iops'), labels)
+        metrics.add("disk_read_latency_milliseconds", "Mean service time of completed reads",
+                    io.get('read_latency_ms'), labels, unit="milliseconds")
+        metrics.add("disk_write_latency_milliseconds", "Mean service time of completed writes",
+                    io.get('write_latency_ms'), labels, unit="milliseconds")
+        metrics.add("disk_busy_percent", "Share of time the disk had requests in flight",
+                    io.get('busy_percent'), labels)
+    for device, usage in storage.get('partitions', {}).items():
+        metrics.add("filesystem_used_percent", "Capacity in use on the mount",
+                    usage.get('percent'), {'device': device, 'mountpoint': usage.get('mountpoint', '')})
+
+    gpu = system.get('gpu', {})
+    for gpu_info in gpu.get('gpus', [gpu]):
+        labels = {'gpu': gpu_info.get('index', 0), 'name': gpu_info.get('name', '')}
+        metrics.add("gpu_utilization_percent", "GPU utilization", gpu_info.get('utilization'), labels)
+        metrics.add("gpu_temperature_celsius", "GPU temperature", gpu_info.get('temperature'),
+                    labels, unit="celsius")
+        metrics.add("gpu_memory_percent", "GPU memory in use", gpu_info.get('memory_percent'), labels)
+
+    network = snapshot.network or {}
+    # Rates rather than per-tick deltas: a scrape may see the same sample
+    # twice, or a tick on which the network collector did not run
+    metrics.add("network_sent_bytes_per_second", "Bytes sent by the process per second",
+                network.get('bytes_sent_per_sec'), target, unit="bytes_per_second")
+    metrics.add("network_received_bytes_per_second", "Bytes received by the process per second",
+                network.get('bytes_recv_per_sec'), target, unit="bytes_per_second")
+    metrics.add("network_connections", "Open connections of the process",
+                network.get('active_connections'), target)
+
+    bottleneck = snapshot.bottleneck
+    if bottleneck is not None:
+        for component in BOTTLENECK_COMPONENTS:
+            active = bottleneck.exists and bottleneck.component == component
+            metrics.add("bottleneck", "1 when the component is the detected bottleneck",
+                        1 if active else 0, {**target, 'component': component})
+        metrics.add("bottleneck_severity", "Severity of the detected bottleneck (0-1)",
+                    bottleneck.severity if bottleneck.exists else 0, target)
+
+    metrics.add("snapshot_timestamp_seconds", "Time the snapshot was taken",
+                snapshot.timestamp, unit="seconds")
+    return metrics.render()
+
+
+class OpenMetricsExporter:
+    """Serves the latest snapshot at ``/metrics``.
+
+    The exposition is rendered once per tick in ``update`` (a sampler
+    listener); scrapes only return the cached bytes and never reach the
+    collectors.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 9464):
+        self.host = host
+        self.port = port
+        self._body = b"# EOF\n"
+        self._server = None
+        self._thread = None
+
+    def update(self, snapshot):
+        self._body = render_snapshot(snapshot)
+
+    def start(self):
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?', 1)[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = exporter._body
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        name="OpenMetricsExporter", daemon=True)
+        self._thread.start()
+        logger.info(f"OpenMetrics exporter listening on http://{self.host}:{self.port}/metrics")
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+def attach_exporter(sampler, settings: Optional[Dict]) -> Optional[OpenMetricsExporter]:
+    """Start an exporter for ``sampler`` if the ``exporter`` config entry enables it"""
+    if not settings or not settings.get('enabled'):
+        return None
+    exporter = OpenMetricsExporter(settings.get('host', "127.0.0.1"), settings.get('port', 9464))
+    try:
+        exporter.start()
+    except OSError as e:
+        logger.error(f"Could not start OpenMetrics exporter: {e}")
+        return None
+    sampler.add_listener(exporter.update)
+    return exporter
@@ -1,34 +1,187 @@
+import math
 import numpy as np
-from typing import List, Dict
+from typing import Dict, Iterable, Union
+
+# Log-spaced histogram used for the tail quantiles: 1% wide buckets from
+# 0.05 ms to 5 s keep the quantile error below half a percent.
+HIST_MIN_MS = 0.05
+HIST_RATIO = 1.01
+HIST_BUCKETS = int(math.ceil(math.log(5000.0 / HIST_MIN_MS) / math.log(HIST_RATIO))) + 1
+_LOG_RATIO = math.log(HIST_RATIO)
+BUCKET_VALUES = HIST_MIN_MS * HIST_RATIO ** (np.arange(HIST_BUCKETS) + 0.5)
+
+# Upper frame-time variance (ms^2) of each pacing grade; anything above is "Poor"
+PACING_GRADES = ((0.1, "Excellent"), (0.3, "Good"), (0.5, "Fair"))
+
+
+def pacing_grade(variance: float) -> str:
+    for limit, grade in PACING_GRADES:
+        if variance < limit:
+            return grade
+    return "Poor"
+
+
+def _bucket(frame_time: float) -> int:
+    if frame_time <= HIST_MIN_MS:
+        return 0
+    return min(int(math.log(frame_time / HIST_MIN_MS) / _LOG_RATIO), HIST_BUCKETS - 1)
+
+
+def histogram_buckets(frame_times: np.ndarray) -> np.ndarray:
+    """Histogram bucket of each duration (ms); ``BUCKET_VALUES`` holds their midpoints"""
+    ratios = np.maximum(frame_times, HIST_MIN_MS) / HIST_MIN_MS
+    return np.minimum((np.log(ratios) / _LOG_RATIO).astype(np.int64), HIST_BUCKETS - 1)
+
 
 class FrameAnalyzer:
-    def __init__(self):
-        self.frame_times = []
-        self.stutter_threshold = 1.5
-        
+    """Sliding-window frame-time statistics with constant cost per frame.
+
+    Frame times (ms) live in a fixed ring buffer. Mean and variance are kept as
+    running sums, the 1%/0.1% lows come from a log-bucketed histogram of the
+    window read from the slow end, and every frame is flagged as a stutter when
+    it arrives, against the mean of the frames before it.
+    """
+
+    def __init__(self, window_size: int = 300, stutter_threshold: float = 1.5):
+        self.window_size = window_size
+        self.stutter_threshold = stutter_threshold
+        self.reset()
+
+    def reset(self):
+        self._ring = np.zeros(self.window_size)
+        self._stutter_flags = np.zeros(self.window_size, dtype=bool)
+        self._histogram = np.zeros(HIST_BUCKETS, dtype=np.int64)
+        self._head = 0
+        self._count = 0
+        self._sum = 0.0
+        self._sum_sq = 0.0
+        self._stutters = 0
+        self._since_resync = 0
+
+    @property
+    def frame_count(self) -> int:
+        return self._count
+
+    @property
+    def frame_times(self) -> np.ndarray:
+        """Frame times currently in the window, oldest first"""
+        start = (self._head - self._count) % self.window_size
+        return np.roll(self._ring, -start)[:self._count]
+
     def analyze_frame_times(self, new_frame_time: float) -> Dict:
-        self.frame_times.append(new_frame_time)
-        if len(self.frame_times) > 300:
-            self.frame_times.pop(0)
-            
-        frame_times = np.array(self.frame_times)
-        
+        self._push(float(new_frame_time))
+        return self.stats()
+
+    def analyze_many(self, frame_times: Union[np.ndarray, Iterable[float]]) -> Dict:
+        """Feed a batch of frame times and return the statistics after the last one"""
+        frame_times = np.asarray(frame_times, dtype=np.float64).ravel()
+        if frame_times.size == 1:
+            self._push(float(frame_times[0]))
+        elif frame_times.size:
+            self._push_many(frame_times)
+        return self.stats()
+
+    def _push(self, frame_time: float):
+        size = self.window_size
+        stutter = self._count > 0 and frame_time > (self._sum / self._count) * self.stutter_threshold
+
+        if self._count == size:
+            old = float(self._ring[self._head])
+            self._sum -= old
+            self._sum_sq -= old * old
+            self._histogram[_bucket(old)] -= 1
+            self._stutters -= int(self._stutter_flags[self._head])
+        else:
+            self._count += 1
+
+        self._ring[self._head] = frame_time
+        self._stutter_flags[self._head] = stutter
+        self._head = (self._head + 1) % size
+        self._sum += frame_time
+        self._sum_sq += frame_time * frame_time
+        self._histogram[_bucket(frame_time)] += 1
+        self._stutters += int(stutter)
+        self._maybe_resync(1)
+
+    def _push_many(self, frame_times: np.ndarray):
+        size = self.window_size
+        count = self._count
+        n = frame_times.size
+
+        # Oldest entries that leave the window during this batch
+        evicted_total = max(0, count + n - size)
+        evicted_old = min(evicted_total, count)
+        oldest_index = (self._head - count) % size
+        old_positions = (oldest_index + np.arange(evicted_old)) % size
+        old_values = self._ring[old_positions]
+
+        # Window sum seen by each new frame before it is inserted
+        prefix = np.concatenate(([0.0], np.cumsum(np.concatenate((old_values, frame_times)))))
+        new_prefix = prefix[evicted_old:evicted_old + n] - prefix[evicted_old]
+        evicted_before = np.maximum(0, count + np.arange(n) - size)
+        window_sums = self._sum + new_prefix - prefix[evicted_before]
+        window_counts = np.minimum(size, count + np.arange(n))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = np.where(window_counts > 0, window_sums / np.maximum(window_counts, 1), np.inf)
+        stutters = frame_times > means * self.stutter_threshold
+
+        kept = frame_times[evicted_total - evicted_old:]
+        kept_stutters = stutters[evicted_total - evicted_old:]
+
+        self._sum += float(frame_times.sum() - prefix[evicted_total])
+        self._sum_sq += float(np.dot(kept, kept) - np.dot(old_values, old_values))
+        self._stutters += int(kept_stutters.sum()) - int(self._stutter_flags[old_positions].sum())
+        np.subtract.at(self._histogram, histogram_buckets(old_values), 1)
+        np.add.at(self._histogram, histogram_buckets(kept), 1)
+
+        positions = (self._head + (n - kept.size) + np.arange(kept.size)) % size
+        self._ring[positions] = kept
+        self._stutter_flags[positions] = kept_stutters
+        self._head = (self._head + n) % size
+        self._count = min(size, count + n)
+        self._maybe_resync(n)
+
+    def _window_positions(self) -> np.ndarray:
+        return (self._head - self._count + np.arange(self._count)) % self.window_size
+
+    def _maybe_resync(self, added: int):
+        # Running sums drift with floating-point error; recompute them from the
+        # ring every few hundred windows.
+        self._since_resync += added
+        if self._since_resync >= self.window_size * 256:
+            window = self._ring[self._window_positions()]
+            self._sum = float(window.sum())
+            self._sum_sq = float(np.dot(window, window))
+            self._since_resync = 0
+
+    def _slow_tail(self, fraction: float) -> float:
+        """Frame time that the slowest ``fraction`` of the window is at or above"""
+        rank = max(1, int(math.ceil(self._count * fraction)))
+        from_slowest = np.cumsum(self._histogram[::-1])
+        index = HIST_BUCKETS - 1 - int(np.searchsorted(from_slowest, rank))
+        return float(BUCKET_VALUES[index])
+
+    def stats(self) -> Dict:
+        if self._count == 0:
+            return {
+                'avg_frame_time': 0.0,
+                '1%_low': 0.0,
+                '0.1%_low': 0.0,
+                'frame_time_variance': 0.0,
+                'stutters_detected': 0,
+                'frame_pacing': "Unknown"
+            }
+
+        mean = self._sum / self._count
+        variance = max(0.0, self._sum_sq / self._count - mean * mean)
         return {
-            'avg_frame_time': np.mean(frame_times),
-            '1%_low': np.percentile(frame_times, 1),
-            '0.1%_low': np.percentile(frame_times, 0.1),
-            'frame_time_variance': np.var(frame_times),
-            'stutters_detected': np.sum(frame_times > (np.mean(frame_times) * self.stutter_threshold)),
-            'frame_pacing': self._analyze_frame_pacing(frame_times)
+            'avg_frame_time': mean,
+            '1%_low': self._slow_tail(0.01),
+            '0.1%_low': self._slow_tail(0.001),
+            'frame_time_variance': variance,
+            'stutters_detected': self._stutters,
+            'frame_pacing': self._analyze_frame_pacing(variance)
         }
-        
-    def _analyze_frame_pacing(self, frame_times: np.ndarray) -> str:
-        variance = np.var(frame_times)
-        if variance < 0.1:
-            return "Excellent"
-        elif variance < 0.3:
-            return "Good"
-        elif variance < 0.5:
-            return "Fair"
-        else:
-            return "Poor" 
\ No newline at end of file
+
+    def _analyze_frame_pacing(self, variance: float) -> str:
+        return pacing_grade(variance)
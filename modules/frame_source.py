@@ -0,0 +1,263 @@
+import glob
+import io
+import logging
+import os
+import time
+import numpy as np
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class FrameSource:
+    """Supplies real per-frame present intervals for the monitored process.
+
+    ``read_frames`` returns the intervals (ms) of every frame presented since
+    the previous call, oldest first, and must never block.
+    """
+    name = "none"
+
+    def read_frames(self, pid: Optional[int] = None) -> np.ndarray:
+        return np.zeros(0)
+
+    def close(self):
+        pass
+
+
+class CsvLogTail:
+    """Follows a CSV log as it grows and hands back only the new complete lines.
+
+    ``path`` may be a file or a directory; for a directory the newest file
+    matching ``pattern`` is followed and the tail switches over when a newer
+    capture appears, after handing back what was left of the old one.
+
+    The log found when tailing starts is followed from its end: its backlog
+    belongs to an earlier part of the session. Only its first
+    ``header_lines`` lines are handed back, ahead of the first new lines, so
+    subclasses always see the header first. Captures that appear later, and
+    a log truncated in place, are read from the start.
+    """
+    # Lines at the top of a log that come before the data (the column header)
+    header_lines = 1
+    # Longest header block looked for when attaching to the end of a log
+    max_header_size = 64 * 1024
+
+    def __init__(self, path: str, pattern: str = "*.csv", rescan_interval: float = 2.0):
+        self.path = path
+        self.pattern = pattern
+        self.rescan_interval = rescan_interval
+        self.current_file = None
+        self.header: Optional[List[str]] = None
+        self._handle = None
+        self._offset = 0
+        self._partial = b""
+        self._preamble = b""
+        self._last_scan = 0.0
+
+    def _newest_file(self) -> Optional[str]:
+        if not os.path.isdir(self.path):
+            return self.path if os.path.exists(self.path) else None
+        candidates = glob.glob(os.path.join(self.path, self.pattern))
+        return max(candidates, key=os.path.getmtime) if candidates else None
+
+    def _open(self, filename: str, from_end: bool = False):
+        self.close()
+        self._handle = open(filename, 'rb')
+        self.current_file = filename
+        self.header = None
+        self._offset = 0
+        self._partial = b""
+        self._preamble = b""
+        if from_end:
+            self._skip_backlog()
+        self.on_open()
+
+    def _skip_backlog(self):
+        """Move to the end of the last complete line, keeping the header lines"""
+        head = self._handle.read(self.max_header_size)
+        end = 0
+        for _ in range(self.header_lines):
+            newline = head.find(b"\n", end)
+            if newline < 0:
+                # Header not complete yet: read the file from the start
+                return
+            end = newline + 1
+        size = os.fstat(self._handle.fileno()).st_size
+        start = max(end, size - self.max_header_size)
+        self._handle.seek(start)
+        last = self._handle.read(size - start).rfind(b"\n")
+        # Any partial last line is read once it is complete
+        self._offset = start + last + 1 if last >= 0 else end
+        self._preamble = head[:end]
+
+    def on_open(self):
+        """Hook for subclasses that keep per-file state"""
+
+    def read_lines(self) -> bytes:
+        """Complete lines appended since the last call, as one bytes block"""
+        now = time.monotonic()
+        if self._handle is None or now - self._last_scan >= self.rescan_interval:
+            self._last_scan = now
+            newest = self._newest_file()
+            if newest and newest != self.current_file:
+                remaining = self._read_appended() if self._handle is not None else b""
+                if remaining:
+                    # The rest of the old capture goes out first; switch on the next call
+                    self._last_scan = 0.0
+                    return remaining
+                self._open(newest, from_end=self.current_file is None)
+        if self._handle is None:
+            return b""
+        return self._read_appended()
+
+    def _read_appended(self) -> bytes:
+        try:
+            size = os.fstat(self._handle.fileno()).st_size
+        except OSError:
+            self.close()
+            return b""
+        if size < self._offset:
+            # Truncated or replaced in place: start over
+            self._open(self.current_file)
+
+        preamble, self._preamble = self._preamble, b""
+        if size == self._offset:
+            return preamble
+
+        self._handle.seek(self._offset)
+        chunk = self._handle.read(size - self._offset)
+        self._offset += len(chunk)
+
+        data = self._partial + chunk
+        end = data.rfind(b"\n") + 1
+        self._partial = data[end:]
+        return preamble + data[:end]
+
+    def close(self):
+        if self._handle:
+            self._handle.close()
+            self._handle = None
+
+
+def parse_columns(block: bytes, columns: List[int]) -> np.ndarray:
+    """Parse the given numeric columns of a block of CSV lines in one pass.
+
+    Returns a float array of shape (rows, len(columns)). Malformed rows, such as
+    a header repeated mid-file or "NA" values, are skipped.
+    """
+    if not block:
+        return np.zeros((0, len(columns)))
+    try:
+        return np.loadtxt(io.BytesIO(block), delimiter=',', usecols=columns,
+                          ndmin=2, dtype=np.float64, encoding='utf-8')
+    except ValueError:
+        rows = []
+        for line in block.split(b"\n"):
+            fields = line.split(b",")
+            try:
+                rows.append([float(fields[c]) for c in columns])
+            except (ValueError, IndexError):
+                continue
+        return np.array(rows, dtype=np.float64).reshape(-1, len(columns))
+
+
+class PresentMonSource(FrameSource, CsvLogTail):
+    """Tails a PresentMon CSV capture (1.x or 2.x column names)"""
+    name = "presentmon"
+    INTERVAL_COLUMNS = ('MsBetweenPresents', 'FrameTime', 'msBetweenPresents')
+    PID_COLUMNS = ('ProcessID', 'ProcessId')
+
+    def __init__(self, path: str, **kwargs):
+        CsvLogTail.__init__(self, path, **kwargs)
+        self._columns = None
+
+    def on_open(self):
+        self._columns = None
+
+    def _resolve_header(self, block: bytes) -> bytes:
+        newline = block.find(b"\n")
+        self.header = [h.strip() for h in block[:newline].decode('utf-8', 'replace').split(',')]
+        interval = next((self.header.index(c) for c in self.INTERVAL_COLUMNS if c in self.header), None)
+        pid = next((self.header.index(c) for c in self.PID_COLUMNS if c in self.header), None)
+        if interval is None:
+            logger.warning(f"No frame interval column in {self.current_file}")
+        else:
+            self._columns = [interval] if pid is None else [interval, pid]
+        return block[newline + 1:]
+
+    def read_frames(self, pid: Optional[int] = None) -> np.ndarray:
+        block = self.read_lines()
+        if block and self.header is None:
+            block = self._resolve_header(block)
+        if not block or self._columns is None:
+            return np.zeros(0)
+
+        values = parse_columns(block, self._columns)
+        if pid is not None and values.shape[1] == 2:
+            values = values[values[:, 1] == pid]
+        return values[:, 0]
+
+    def close(self):
+        CsvLogTail.close(self)
+
+
+class MangoHudSource(FrameSource, CsvLogTail):
+    """Tails a MangoHud CSV log.
+
+    MangoHud writes a two-line system-info preamble before the column header.
+    Logs are per process, so the pid filter does not apply.
+    """
+    name = "mangohud"
+    header_lines = 3
+
+    def __init__(self, path: str, **kwargs):
+        CsvLogTail.__init__(self, path, **kwargs)
+        self._columns = None
+
+    def on_open(self):
+        self._columns = None
+
+    def read_frames(self, pid: Optional[int] = None) -> np.ndarray:
+        block = self.read_lines()
+        if block and self._columns is None:
+            block = self._skip_preamble(block)
+        if not block or self._columns is None:
+            return np.zeros(0)
+        return parse_columns(block, self._columns)[:, 0]
+
+    def _skip_preamble(self, block: bytes) -> bytes:
+        start = 0
+        while True:
+            newline = block.find(b"\n", start)
+            if newline < 0:
+                # Header not written yet; the lines seen so far are discarded
+                return b""
+            fields = [f.strip() for f in block[start:newline].decode('utf-8', 'replace').split(',')]
+            start = newline + 1
+            if 'frametime' in fields:
+                self.header = fields
+                self._columns = [fields.index('frametime')]
+                return block[start:]
+
+    def close(self):
+        CsvLogTail.close(self)
+
+
+FRAME_SOURCES = {
+    'presentmon': PresentMonSource,
+    'mangohud': MangoHudSource
+}
+
+
+def create_frame_source(settings: Optional[Dict]) -> Optional[FrameSource]:
+    """Build the frame source described by the ``frame_source`` config entry"""
+    if not settings or settings.get('type', 'none') == 'none':
+        return None
+    source_class = FRAME_SOURCES.get(settings['type'])
+    if source_class is None:
+        logger.warning(f"Unknown frame source type: {settings['type']}")
+        return None
+    if not settings.get('path'):
+        logger.warning(f"Frame source '{settings['type']}' needs a log path")
+        return None
+    return source_class(settings['path'])
@@ -0,0 +1,273 @@
+import glob
+import json
+import logging
+import os
+import re
+import sys
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+CACHE_FILE = "game_library_cache.json"
+EPIC_MANIFEST_DIR = os.path.join(os.environ.get('ProgramData', 'C:\\ProgramData'),
+                                 'Epic', 'EpicGamesLauncher', 'Data', 'Manifests')
+
+
+@dataclass(frozen=True)
+class GameInfo:
+    title: str
+    app_id: Optional[str] = None
+    store: Optional[str] = None
+    install_dir: Optional[str] = None
+
+
+def normalize_path(path: str) -> List[str]:
+    """Case-folded path components, with either separator"""
+    return [part for part in path.replace('\\', '/').lower().split('/') if part]
+
+
+_VDF_TOKEN = re.compile(r'"((?:[^"\\]|\\.)*)"|([{}])')
+
+
+def parse_vdf(text: str) -> Dict:
+    """Parse Valve KeyValues text (libraryfolders.vdf, appmanifest_*.acf)"""
+    root: Dict = {}
+    stack = [root]
+    key = None
+    for match in _VDF_TOKEN.finditer(text):
+        string, brace = match.groups()
+        if brace == '{':
+            child: Dict = {}
+            stack[-1][key] = child
+            stack.append(child)
+            key = None
+        elif brace == '}':
+            if len(stack) > 1:
+                stack.pop()
+            key = None
+        elif key is None:
+            key = string.replace('\\\\', '\\')
+        else:
+            stack[-1][key] = string.replace('\\\\', '\\')
+            key = None
+    return root
+
+
+class PathTrie:
+    """Prefix trie over normalized path components, for longest-root lookups"""
+
+    def __init__(self):
+        self._root: Dict = {}
+
+    def insert(self, path: str, value):
+        node = self._root
+        for part in normalize_path(path):
+            node = node.setdefault(part, {})
+        node[None] = value
+
+    def longest_prefix(self, path: str):
+        node = self._root
+        found = node.get(None)
+        for part in normalize_path(path):
+            node = node.get(part)
+            if node is None:
+                break
+            found = node.get(None, found)
+        return found
+
+
+def steam_roots() -> List[str]:
+    roots = []
+    try:
+        import winreg
+        with winreg.OpenKey(winreg.HKEY_CURRENT_USER, r"Software\Valve\Steam") as key:
+            roots.append(winreg.QueryValueEx(key, "SteamPath")[0])
+    except (ImportError, OSError):
+        pass
+    roots.extend([
+        'C:\\Program Files (x86)\\Steam',
+        'C:\\Program Files\\Steam',
+        os.path.expanduser('~/.steam/steam'),
+        os.path.expanduser('~/.local/share/Steam')
+    ])
+    seen, unique = set(), []
+    for root in roots:
+        real = os.path.realpath(root)
+        if real not in seen and os.path.isdir(real):
+            seen.add(real)
+            unique.append(real)
+    return unique
+
+
+def steam_library_folders(steam_root: str) -> List[str]:
+    folders = [steam_root]
+    vdf_path = os.path.join(steam_root, 'steamapps', 'libraryfolders.vdf')
+    try:
+        with open(vdf_path, encoding='utf-8', errors='replace') as f:
+            data = parse_vdf(f.read())
+    except OSError:
+        return folders
+    libraries = data.get('libraryfolders') or data.get('LibraryFolders') or {}
+    for key, value in libraries.items():
+        if isinstance(value, dict):
+            path = value.get('path')
+        elif key.isdigit():
+            # Pre-2021 format: "1" "D:\\SteamLibrary"
+            path = value
+        else:
+            path = None
+        if path and path not in folders:
+            folders.append(path)
+    return folders
+
+
+class GameLibraryIndex:
+    """Games installed through Steam and Epic, cached on disk.
+
+    The cache records the mtime of every manifest and manifest folder it was
+    built from and is rebuilt as soon as any of them changes, a folder gains
+    or loses a manifest, or a library is added.
+    """
+
+    def __init__(self, cache_file: str = CACHE_FILE, steam_dirs: Optional[Iterable[str]] = None,
+                 epic_manifest_dir: str = EPIC_MANIFEST_DIR):
+        self.cache_file = cache_file
+        self.steam_dirs = list(steam_dirs) if steam_dirs is not None else None
+        self.epic_manifest_dir = epic_manifest_dir
+        self.games: List[GameInfo] = []
+
+    def _sources(self) -> List[str]:
+        sources = []
+        for steam_root in self.steam_dirs if self.steam_dirs is not None else steam_roots():
+            sources.append(os.path.join(steam_root, 'steamapps', 'libraryfolders.vdf'))
+            for library in steam_library_folders(steam_root):
+                steamapps = os.path.join(library, 'steamapps')
+                sources.append(steamapps)
+                sources.extend(glob.glob(os.path.join(steamapps, 'appmanifest_*.acf')))
+        sources.append(self.epic_manifest_dir)
+        sources.extend(glob.glob(os.path.join(self.epic_manifest_dir, '*.item')))
+        return sources
+
+    @staticmethod
+    def _mtimes(sources: List[str]) -> Dict[str, float]:
+        mtimes = {}
+        for source in sources:
+            try:
+                mtimes[source] = os.stat(source).st_mtime
+            except OSError:
+                mtimes[source] = None
+        return mtimes
+
+    def load(self) -> List[GameInfo]:
+        mtimes = self._mtimes(self._sources())
+        try:
+            with open(self.cache_file, 'r') as f:
+                cached = json.load(f)
+            if cached.get('sources') == mtimes:
+                self.games = [GameInfo(**game) for game in cached['games']]
+                return self.games
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+        self.games = self._scan(mtimes)
+        try:
+            with open(self.cache_file, 'w') as f:
+                json.dump({'sources': mtimes, 'games': [asdict(g) for g in self.games]}, f)
+        except OSError as e:
+            logger.warning(f"Could not write game library cache: {e}")
+        return self.games
+
+    def _scan(self, mtimes: Dict[str, Optional[float]]) -> List[GameInfo]:
+        games = []
+        for source in mtimes:
+            if source.endswith('.acf'):
+                game = self._parse_steam_manifest(source)
+            elif source.endswith('.item'):
+                game = self._parse_epic_manifest(source)
+            else:
+                continue
+            if game:
+                games.append(game)
+        logger.info(f"Indexed {len(games)} installed games")
+        return games
+
+    @staticmethod
+    def _parse_steam_manifest(path: str) -> Optional[GameInfo]:
+        try:
+            with open(path, encoding='utf-8', errors='replace') as f:
+                state = parse_vdf(f.read()).get('AppState', {})
+        except OSError:
+            return None
+        install_dir = state.get('installdir')
+        if not install_dir:
+            return None
+        steamapps = os.path.dirname(path)
+        return GameInfo(
+            title=state.get('name', install_dir),
+            app_id=state.get('appid'),
+            store='steam',
+            install_dir=os.path.join(steamapps, 'common', install_dir)
+        )
+
+    @staticmethod
+    def _parse_epic_manifest(path: str) -> Optional[GameInfo]:
+        try:
+            with open(path, encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        location = manifest.get('InstallLocation')
+        if not location:
+            return None
+        return GameInfo(
+            title=manifest.get('DisplayName') or manifest.get('AppName', location),
+            app_id=manifest.get('AppName'),
+            store='epic',
+            install_dir=location
+        )
+
+
+class GameClassifier:
+    """Decides whether a process is a game and which one.
+
+    Only processes with a readable executable are considered, and with
+    ``require_exe`` (the default on Windows) only ``.exe`` ones; Linux-native
+    and Proton executables carry no extension. Names are then matched
+    case-insensitively against the excluded and known sets, in that order;
+    executables under an indexed install folder resolve through a path trie
+    to that game's title and app id. ``game_paths`` substrings are only a
+    fallback for games no store manifest knows about.
+    """
+
+    def __init__(self, game_processes: Iterable[str], excluded_processes: Iterable[str],
+                 game_paths: Iterable[str] = (), library: Optional[GameLibraryIndex] = None,
+                 require_exe: bool = sys.platform == 'win32'):
+        self.require_exe = require_exe
+        self.game_names = {name.lower() for name in game_processes}
+        self.excluded_names = {name.lower() for name in excluded_processes}
+        self.game_paths = tuple(path.lower() for path in game_paths)
+        self.trie = PathTrie()
+        self.library = library
+        if library is not None:
+            for game in library.games or library.load():
+                self.trie.insert(game.install_dir, game)
+
+    def classify(self, name: str, exe: Optional[str]) -> Optional[GameInfo]:
+        if not exe or (self.require_exe and not exe.lower().endswith('.exe')):
+            return None
+        lowered = (name or '').lower()
+        # Checked first: crash handlers, anti-cheat services and installers
+        # live in the game's own folder
+        if lowered in self.excluded_names:
+            return None
+        if lowered in self.game_names:
+            return GameInfo(title=name)
+
+        game = self.trie.longest_prefix(exe)
+        if game is not None:
+            return game
+        path = exe.lower()
+        if any(game_path in path for game_path in self.game_paths):
+            return GameInfo(title=name)
+        return None
@@ -27,7 +27,9 @@ class GameOptimizer:
         tips = []
         game_settings = self.optimization_db.get(process_name, {})
         
-        if metrics['cpu_percent'] > 80:
+        # cpu_percent is a share of the whole machine; a game limited by one
+        # thread shows up in its busiest thread long before that gets high
+        if metrics.get('busiest_thread_percent', 0) > 80 or metrics['cpu_percent'] > 80:
             tips.append("High CPU usage detected:")
             tips.extend([
                 "- Close background applications",
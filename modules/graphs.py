@@ -1,38 +1,35 @@
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QGridLayout
 import pyqtgraph as pg
-import numpy as np
+from .history import MinMaxHistory
 
 class PerformanceGraphs(QWidget):
-    def __init__(self):
+    def __init__(self, history_seconds=60, sample_interval=0.5):
         super().__init__()
+        self.sample_interval = sample_interval
+        self.history = MinMaxHistory(4, history_seconds / sample_interval)
+        self._drawn_total = 0
         self.setup_graphs()
-        
+
     def setup_graphs(self):
         layout = QGridLayout(self)
         layout.setSpacing(10)
-        
+
         self.cpu_plot = self.create_plot("CPU Usage (%)")
         self.memory_plot = self.create_plot("Memory Usage (%)")
         self.gpu_plot = self.create_plot("GPU Usage (%)")
         self.temperature_plot = self.create_plot("Temperature (°C)")
-        
-        self.data_length = 100
-        self.times = np.linspace(0, self.data_length, self.data_length)
-        self.cpu_data = np.zeros(self.data_length)
-        self.memory_data = np.zeros(self.data_length)
-        self.gpu_data = np.zeros(self.data_length)
-        self.temp_data = np.zeros(self.data_length)
-        
-        self.cpu_curve = self.cpu_plot.plot(self.times, self.cpu_data, pen='g')
-        self.memory_curve = self.memory_plot.plot(self.times, self.memory_data, pen='r')
-        self.gpu_curve = self.gpu_plot.plot(self.times, self.gpu_data, pen='b')
-        self.temp_curve = self.temperature_plot.plot(self.times, self.temp_data, pen='m')
-        
+
+        self.cpu_curve = self.cpu_plot.plot(pen='g')
+        self.memory_curve = self.memory_plot.plot(pen='r')
+        self.gpu_curve = self.gpu_plot.plot(pen='b')
+        self.temp_curve = self.temperature_plot.plot(pen='m')
+        self.curves = [self.cpu_curve, self.memory_curve, self.gpu_curve, self.temp_curve]
+
         layout.addWidget(self.cpu_plot, 0, 0)
         layout.addWidget(self.memory_plot, 0, 1)
         layout.addWidget(self.gpu_plot, 1, 0)
         layout.addWidget(self.temperature_plot, 1, 1)
-        
+
     def create_plot(self, title):
         plot = pg.PlotWidget()
         plot.setBackground('#2d2d2d')
@@ -40,30 +37,46 @@ class PerformanceGraphs(QWidget):
         plot.showGrid(x=True, y=True, alpha=0.3)
         plot.setLabel('left', 'Value', color='#ffffff')
         plot.setLabel('bottom', 'Time (s)', color='#ffffff')
-        
+
         plot.getAxis('left').setPen('w')
         plot.getAxis('bottom').setPen('w')
-        
+
         plot.setYRange(0, 100)
-        
+
         return plot
-        
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        # One min/max pair per horizontal pixel of the widest plot
+        width = max(plot.width() for plot in (self.cpu_plot, self.memory_plot,
+                                             self.gpu_plot, self.temperature_plot))
+        if width > 0:
+            self.history.set_resolution(width)
+            self.redraw(force=True)
+
     def update_graphs(self, process_metrics, system_metrics):
-        self.cpu_data[:-1] = self.cpu_data[1:]
-        self.memory_data[:-1] = self.memory_data[1:]
-        self.gpu_data[:-1] = self.gpu_data[1:]
-        self.temp_data[:-1] = self.temp_data[1:]
-        
-        self.cpu_data[-1] = process_metrics['cpu_percent']
-        self.memory_data[-1] = process_metrics['memory_percent']
-        
+        self.record(process_metrics, system_metrics)
+        self.redraw()
+
+    def record(self, process_metrics, system_metrics):
+        """Add a sample to the history without drawing it"""
         gpu_info = system_metrics.get('gpu', {})
-        self.gpu_data[-1] = gpu_info.get('utilization', 0)
-        
         cpu_info = system_metrics.get('cpu', {})
-        self.temp_data[-1] = cpu_info.get('temperature', 0)
-        
-        self.cpu_curve.setData(self.times, self.cpu_data)
-        self.memory_curve.setData(self.times, self.memory_data)
-        self.gpu_curve.setData(self.times, self.gpu_data)
-        self.temp_curve.setData(self.times, self.temp_data) 
\ No newline at end of file
+        self.history.push((
+            process_metrics['cpu_percent'],
+            process_metrics['memory_percent'],
+            gpu_info.get('utilization', 0),
+            cpu_info.get('temperature', 0)
+        ))
+
+    def redraw(self, force=False):
+        if not force and self.history.total == self._drawn_total:
+            return
+        self._drawn_total = self.history.total
+        indices, values = self.history.render()
+        if indices.size == 0:
+            return
+        # Seconds relative to the newest sample
+        times = (indices - (self.history.total - 1)) * self.sample_interval
+        for curve, channel in zip(self.curves, values):
+            curve.setData(times, channel, skipFiniteCheck=True)
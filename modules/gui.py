@@ -1,38 +1,146 @@
 from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QTabWidget,
-                            QComboBox, QPushButton, QLabel, QGridLayout, QScrollArea)
-from PyQt6.QtCore import QTimer, Qt
-import pyqtgraph as pg
-from .process_monitor import ProcessMonitor
-from .performance_metrics import PerformanceMetrics
-from .graphs import PerformanceGraphs
-from .bottleneck_analyzer import BottleneckAnalyzer
-from .game_optimizer import GameOptimizer
-from .network_monitor import NetworkMonitor
-from .input_monitor import InputMonitor
-from .frame_analyzer import FrameAnalyzer
+                            QComboBox, QPushButton, QLabel, QGridLayout, QScrollArea,
+                            QTableWidget, QTableWidgetItem, QHeaderView)
+from PyQt6.QtCore import QEvent, QObject, QTimer, Qt, pyqtSignal
+import threading
+import time
+from .input_monitor import create_latency_pipeline
+from .config import Config
+from .instrumentation import create_instrumentation
 import logger
 
+# pyqtgraph, numpy, WMI and the collectors are imported after the window has
+# painted: graphs on the GUI thread, everything else on a startup thread
+
+# Stylesheets are applied only when a label's state changes; re-setting them
+# every tick forces Qt to re-polish the widget
+VALUE_STYLES = {
+    state: f"QLabel {{ color: {color}; font-size: 16px; font-weight: bold; }}"
+    for state, color in (('good', "#44ff44"), ('warning', "#ffff44"),
+                         ('bad', "#ff4444"), ('neutral', "#ffffff"))
+}
+BOTTLENECK_STYLES = {
+    True: "QLabel { color: #ff4444; font-size: 14px; font-weight: bold; }",
+    False: "QLabel { color: #44ff44; font-size: 14px; }"
+}
+
+class SnapshotBridge(QObject):
+    """Hands sampler snapshots to the GUI thread through a queued Qt signal"""
+    snapshot_ready = pyqtSignal(object)
+    games_ready = pyqtSignal(object)
+    sampler_ready = pyqtSignal()
+
 class MainWindow(QMainWindow):
-    def __init__(self):
+    def __init__(self, sampler=None, listeners=(), preferred_pid=None):
         super().__init__()
+        self.started_at = time.perf_counter()
+        self.first_paint_at = None
+        self.first_sample_at = None
         self.setWindowTitle("PC Performance Monitor")
         self.setGeometry(100, 100, 1400, 900)
         
-        # Initialize all monitors and analyzers
-        self.process_monitor = ProcessMonitor()
-        self.performance_metrics = PerformanceMetrics()
-        self.bottleneck_analyzer = BottleneckAnalyzer()
-        self.game_optimizer = GameOptimizer()
-        self.network_monitor = NetworkMonitor()
-        self.input_monitor = InputMonitor()
-        self.frame_analyzer = FrameAnalyzer()
+        self.config = Config()
+        # Timing hooks for the collectors and every redraw; disabled, they are not installed at all
+        self.instrumentation = create_instrumentation(self.config.settings.get('instrumentation'))
+        
+        # Collectors and analyzers live in the background sampler; a
+        # SessionPlayer can stand in for it to replay a recording. A live
+        # sampler is only built once the window is up, see finish_startup.
+        self.sampler = sampler
+        self.sampler_listeners = list(listeners)
+        self.preferred_pid = preferred_pid
+        self.exporter = None
+        self.graphs = None
+        self.startup_thread = None
+        # Set by closeEvent; a startup still in progress then cleans up after itself
+        self.closing = threading.Event()
+        self.startup_lock = threading.Lock()
+        self.games_thread = None
+        self.last_received_sequence = 0
+        self.pending_snapshot = None
+        self.rendered_sequences = {}
+        self.label_styles = {}
         
         self.setup_ui()
         
-        # Update timer
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.update_all_metrics)
-        self.timer.start(500)
+        # Drawing is decoupled from sampling: snapshots are only stored as they
+        # arrive and the visible tab is redrawn at most max_render_rate times a second
+        render_rate = max(1, self.config.settings.get('max_render_rate', 4))
+        self.render_timer = QTimer(self)
+        self.render_timer.setInterval(int(1000 / render_rate))
+        self.render_timer.timeout.connect(self.render_pending)
+        self.render_timer.start()
+        
+        self.snapshot_bridge = SnapshotBridge()
+        self.snapshot_bridge.snapshot_ready.connect(
+            self.instrumentation.timed('gui.snapshot', self.update_all_metrics))
+        self.snapshot_bridge.games_ready.connect(self.populate_process_list)
+        self.snapshot_bridge.sampler_ready.connect(self.on_sampler_ready)
+        
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if self.first_paint_at is None:
+            self.first_paint_at = time.perf_counter()
+            QTimer.singleShot(0, self.finish_startup)
+        
+    def finish_startup(self):
+        """Everything that is not needed for the first frame of the window"""
+        self.setup_graphs()
+        self.startup_thread = threading.Thread(target=self.run_startup, name="Startup", daemon=True)
+        self.startup_thread.start()
+        
+    def run_startup(self):
+        try:
+            self.start_sampler()
+        except Exception as e:
+            logger.error(f"Failed to start sampler: {e}")
+        
+    def start_sampler(self):
+        # Runs on the startup thread: imports the collectors (numpy, pywin32,
+        # the game library index) and starts sampling
+        sampler = self.sampler
+        if sampler is None:
+            from .sampler import MetricsSampler
+            from .frame_source import create_frame_source
+            from .platform_backend import create_backend
+            sampler = MetricsSampler(
+                interval=self.config.settings.get('refresh_rate', 250) / 1000.0,
+                frame_source=create_frame_source(self.config.settings.get('frame_source')),
+                collector_intervals=self.config.settings.get('collector_intervals'),
+                backend=create_backend(self.config.settings.get('platform_backend')),
+                instrumentation=self.instrumentation,
+                latency_pipeline=create_latency_pipeline(self.config.settings.get('input_latency'),
+                                                         self.config.settings.get('frame_source'))
+            )
+        from .exporter import attach_exporter
+        with self.startup_lock:
+            if self.closing.is_set():
+                # The window closed while the collectors were being built
+                sampler.stop()
+                return
+            self.sampler = sampler
+            sampler.add_listener(self.snapshot_bridge.snapshot_ready.emit)
+            for listener in self.sampler_listeners:
+                sampler.add_listener(listener)
+            self.exporter = attach_exporter(sampler, self.config.settings.get('exporter'))
+            sampler.start()
+        self.snapshot_bridge.sampler_ready.emit()
+        games = sampler.get_running_games()
+        if not self.closing.is_set():
+            self.snapshot_bridge.games_ready.emit(games)
+        
+    def on_sampler_ready(self):
+        self.on_process_changed(self.process_selector.currentIndex())
+        
+    def setup_graphs(self):
+        from .graphs import PerformanceGraphs
+        self.graphs = PerformanceGraphs(
+            history_seconds=self.config.settings.get('history_size', 60),
+            sample_interval=(self.sampler.interval if self.sampler is not None
+                             else self.config.settings.get('refresh_rate', 250) / 1000.0)
+        )
+        self.graphs_placeholder.parentWidget().layout().replaceWidget(self.graphs_placeholder, self.graphs)
+        self.graphs_placeholder.deleteLater()
         
     def setup_ui(self):
         central_widget = QWidget()
@@ -45,6 +153,7 @@ class MainWindow(QMainWindow):
         
         # Create tab widget for different metric views
         tabs = QTabWidget()
+        self.tabs = tabs
         
         # Overview tab
         overview_tab = self.setup_overview_tab()
@@ -54,6 +163,10 @@ class MainWindow(QMainWindow):
         performance_tab = self.setup_performance_tab()
         tabs.addTab(performance_tab, "Detailed Performance")
         
+        # Watched processes tab
+        watched_tab = self.setup_watched_tab()
+        tabs.addTab(watched_tab, "Watched Processes")
+        
         # Network tab
         network_tab = self.setup_network_tab()
         tabs.addTab(network_tab, "Network")
@@ -62,12 +175,33 @@ class MainWindow(QMainWindow):
         optimization_tab = self.setup_optimization_tab()
         tabs.addTab(optimization_tab, "Optimization")
         
+        # Diagnostics tab, only while instrumentation is on
+        diagnostics_tab = None
+        if self.instrumentation.enabled:
+            diagnostics_tab = self.setup_diagnostics_tab()
+            tabs.addTab(diagnostics_tab, "Diagnostics")
+        
         # About tab
         about_tab = self.setup_about_tab()
         tabs.addTab(about_tab, "About")
         
         main_layout.addWidget(tabs)
         
+        renderers = {
+            'overview': (overview_tab, self.render_overview),
+            'performance': (performance_tab, self.render_performance),
+            'watched': (watched_tab, lambda snapshot: self.update_watched_processes(snapshot.targets)),
+            'network': (network_tab, self.render_network),
+            'optimization': (optimization_tab, lambda snapshot: self.update_optimization_tips(snapshot.tips)),
+            'diagnostics': (diagnostics_tab, self.render_diagnostics)
+        }
+        self.tab_renderers = {
+            page: self.instrumentation.timed(f"render.{name}", renderer)
+            for name, (page, renderer) in renderers.items()
+            if page is not None
+        }
+        tabs.currentChanged.connect(lambda index: self.render_pending())
+        
     def setup_top_section(self):
         """Setup the top section with process selector and refresh button"""
         top_layout = QHBoxLayout()
@@ -87,19 +221,28 @@ class MainWindow(QMainWindow):
         top_layout.addWidget(refresh_button)
         top_layout.addStretch()
         
-        self.refresh_process_list()
-        
         return top_layout
         
     def refresh_process_list(self):
-        """Refresh the list of running processes"""
-        current_pid = self.process_selector.currentData()
+        """Rescan running processes in the background; the list updates when done"""
+        if self.sampler is None or (self.games_thread and self.games_thread.is_alive()):
+            return
+        self.games_thread = threading.Thread(
+            target=lambda: self.snapshot_bridge.games_ready.emit(self.sampler.get_running_games()),
+            name="GameScan", daemon=True
+        )
+        self.games_thread.start()
         
-        games = self.process_monitor.get_running_games()
+    def populate_process_list(self, games):
+        current_pid = self.process_selector.currentData() or self.preferred_pid
         
         self.process_selector.clear()
         for game in games:
             self.process_selector.addItem(game['name'], game['pid'])
+            if game.get('title') and game['title'] != game['name']:
+                self.process_selector.setItemData(
+                    self.process_selector.count() - 1, game['title'], Qt.ItemDataRole.ToolTipRole
+                )
             
         if current_pid:
             index = self.process_selector.findData(current_pid)
@@ -108,8 +251,21 @@ class MainWindow(QMainWindow):
         
     def on_process_changed(self, index):
         """Handle process selection change"""
-        if hasattr(self, 'frame_analyzer'):
-            self.frame_analyzer.frame_times.clear()
+        if getattr(self, 'sampler', None) is not None:
+            self.sampler.set_target(self.process_selector.currentData(),
+                                    self.process_selector.currentText())
+        
+    def closeEvent(self, event):
+        # Never waits for the startup thread: whatever it has not handed over
+        # yet it stops itself once it sees the flag
+        with self.startup_lock:
+            self.closing.set()
+            sampler, exporter = self.sampler, self.exporter
+        if sampler is not None:
+            sampler.stop()
+        if exporter:
+            exporter.stop()
+        super().closeEvent(event)
         
     def setup_overview_tab(self):
         widget = QWidget()
@@ -131,6 +287,10 @@ class MainWindow(QMainWindow):
         
         for label in self.metrics_labels.values():
             label.setStyleSheet("QLabel { color: white; font-size: 14px; }")
+        self.metrics_labels['input_lag'].setToolTip(
+            "Time from an input to the next presented frame. Live input is timestamped by the "
+            "Windows tick count, so each value is only accurate to about 10-16 ms."
+        )
             
         row = 0
         col = 0
@@ -141,10 +301,11 @@ class MainWindow(QMainWindow):
                 col = 0
                 row += 1
                 
-        self.graphs = PerformanceGraphs()
+        # Swapped for the graphs once the window has painted
+        self.graphs_placeholder = QWidget()
         
         layout.addLayout(metrics_layout)
-        layout.addWidget(self.graphs)
+        layout.addWidget(self.graphs_placeholder, 1)
         return widget
         
     def setup_performance_tab(self):
@@ -200,12 +361,12 @@ class MainWindow(QMainWindow):
                 'value': QLabel("--"),
                 'unit': "ms"
             },
-            'stutters': {
+            'stutters_detected': {
                 'label': QLabel("Stutters Detected"),
                 'value': QLabel("--"),
                 'unit': ""
             },
-            'frame_variance': {
+            'frame_time_variance': {
                 'label': QLabel("Frame Time Variance"),
                 'value': QLabel("--"),
                 'unit': "ms²"
@@ -266,7 +427,7 @@ class MainWindow(QMainWindow):
         
         tips_text = QLabel(
             "• Lower frame time is better (16.7ms = 60 FPS)\n"
-            "• 1% and 0.1% lows indicate stutter severity\n"
+            "• 1% and 0.1% lows are the frame times of the slowest 1% and 0.1% of frames\n"
             "• High frame variance can indicate inconsistent performance\n"
             "• Monitor these values while gaming to identify issues"
         )
@@ -287,6 +448,49 @@ class MainWindow(QMainWindow):
         
         return widget
         
+    def setup_watched_tab(self):
+        widget = QWidget()
+        layout = QVBoxLayout(widget)
+        
+        buttons_layout = QHBoxLayout()
+        watch_button = QPushButton("Watch Selected Process")
+        watch_button.clicked.connect(self.watch_selected_process)
+        unwatch_button = QPushButton("Stop Watching")
+        unwatch_button.clicked.connect(self.unwatch_selected_rows)
+        buttons_layout.addWidget(watch_button)
+        buttons_layout.addWidget(unwatch_button)
+        buttons_layout.addStretch()
+        
+        self.watched_table = QTableWidget(0, 5)
+        self.watched_table.setHorizontalHeaderLabels(["Process", "PID", "CPU %", "Memory %", "FPS"])
+        self.watched_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.watched_table.verticalHeader().setVisible(False)
+        self.watched_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.watched_table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.watched_table.setStyleSheet("""
+            QTableWidget {
+                background-color: #2d2d2d;
+                color: #ffffff;
+                gridline-color: #333333;
+                font-size: 14px;
+            }
+        """)
+        
+        layout.addLayout(buttons_layout)
+        layout.addWidget(self.watched_table)
+        return widget
+        
+    def watch_selected_process(self):
+        pid = self.process_selector.currentData()
+        if pid and self.sampler is not None:
+            self.sampler.watch(pid, self.process_selector.currentText())
+            
+    def unwatch_selected_rows(self):
+        for index in self.watched_table.selectionModel().selectedRows():
+            item = self.watched_table.item(index.row(), 1)
+            if item and self.sampler is not None:
+                self.sampler.unwatch(int(item.text()))
+        
     def setup_network_tab(self):
         widget = QWidget()
         layout = QVBoxLayout(widget)
@@ -553,45 +757,142 @@ class MainWindow(QMainWindow):
         layout.addWidget(panel)
         return widget
         
-    def update_all_metrics(self):
-        if not self.process_selector.currentData():
+    def setup_diagnostics_tab(self):
+        widget = QWidget()
+        layout = QVBoxLayout(widget)
+        
+        self.diagnostics_label = QLabel("Monitor: waiting for the first sample")
+        self.diagnostics_label.setStyleSheet("""
+            QLabel {
+                color: white;
+                font-size: 14px;
+                padding: 5px;
+            }
+        """)
+        
+        self.timings_table = QTableWidget(0, 6)
+        self.timings_table.setHorizontalHeaderLabels(["Hook", "Calls", "p50 ms", "p95 ms", "p99 ms", "Max ms"])
+        self.timings_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.timings_table.verticalHeader().setVisible(False)
+        self.timings_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.timings_table.setStyleSheet("""
+            QTableWidget {
+                background-color: #2d2d2d;
+                color: #ffffff;
+                gridline-color: #333333;
+                font-size: 14px;
+            }
+        """)
+        
+        layout.addWidget(self.diagnostics_label)
+        layout.addWidget(self.timings_table)
+        return widget
+        
+    def update_all_metrics(self, snapshot):
+        """Accept a sampler snapshot; drawing happens in render_pending"""
+        if snapshot.sequence <= self.last_received_sequence:
             return
-            
-        pid = self.process_selector.currentData()
-        process_name = self.process_selector.currentText()
+        self.last_received_sequence = snapshot.sequence
         
-        process_metrics = self.process_monitor.get_process_metrics(pid)
-        system_metrics = self.performance_metrics.get_system_metrics()
+        if snapshot.pid != self.process_selector.currentData():
+            return
         
-        if process_metrics and system_metrics:
-            self.graphs.update_graphs(process_metrics, system_metrics)
-            
-            self.update_basic_metrics(process_metrics, system_metrics)
-            
-            if process_metrics['fps'] > 0:
-                frame_time = 1000.0 / process_metrics['fps']  # Convert to milliseconds
-                frame_analysis = self.frame_analyzer.analyze_frame_times(frame_time)
-                self.update_frame_metrics(frame_analysis)
+        if self.first_sample_at is None:
+            self.first_sample_at = time.perf_counter()
+        
+        # Graph history is kept gap-free even while nothing is drawn
+        if self.graphs is not None:
+            self.graphs.record(snapshot.process, snapshot.system)
+        self.pending_snapshot = snapshot
+        
+    def is_on_screen(self):
+        return self.isVisible() and not self.isMinimized()
+        
+    def render_pending(self):
+        """Draw the newest snapshot on the current tab, if anyone can see it"""
+        snapshot = self.pending_snapshot
+        if snapshot is None or not self.is_on_screen():
+            return
+        page = self.tabs.currentWidget()
+        if self.rendered_sequences.get(page) == snapshot.sequence:
+            return
+        self.rendered_sequences[page] = snapshot.sequence
+        
+        renderer = self.tab_renderers.get(page)
+        if renderer:
+            renderer(snapshot)
+        
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.render_pending()
+        
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QEvent.Type.WindowStateChange:
+            self.render_pending()
+        
+    def set_label_style(self, label, style):
+        if self.label_styles.get(label) != style:
+            label.setStyleSheet(style)
+            self.label_styles[label] = style
+        
+    def render_overview(self, snapshot):
+        process_metrics = snapshot.process
+        if self.graphs is not None:
+            self.graphs.redraw()
+        self.update_basic_metrics(process_metrics, snapshot.system, snapshot.bottleneck)
+        
+        if snapshot.frame:
+            self.metrics_labels['frame_pacing'].setText(f"Frame Pacing: {snapshot.frame['frame_pacing']}")
+        
+        latency = snapshot.input_latency.get(snapshot.pid)
+        if latency and latency['samples']:
+            self.metrics_labels['input_lag'].setText(
+                f"Input Lag: {latency['p50_ms']:.0f} / {latency['p95_ms']:.0f} / {latency['p99_ms']:.0f} ms "
+                f"(p50/p95/p99)"
+            )
             
-            network_metrics = self.network_monitor.get_process_network_metrics(pid)
-            if network_metrics:
-                self.update_network_metrics(network_metrics)
+    def render_performance(self, snapshot):
+        if snapshot.frame:
+            self.update_frame_metrics(snapshot.frame)
             
-            tips = self.game_optimizer.get_optimization_tips(process_name, process_metrics)
-            self.update_optimization_tips(tips)
+    def render_network(self, snapshot):
+        if snapshot.network:
+            self.update_network_metrics(snapshot.network)
             
-            if hasattr(process_metrics, 'hwnd'):
-                input_lag = self.input_monitor.measure_input_lag(process_metrics['hwnd'])
-                if input_lag:
-                    self.metrics_labels['input_lag'].setText(f"Input Lag: {input_lag:.1f}ms")
+    def render_diagnostics(self, snapshot):
+        usage = snapshot.diagnostics
+        if usage:
+            rss = f"{usage['rss'] / (1 << 20):.0f} MB" if usage.get('rss') is not None else "n/a"
+            self.diagnostics_label.setText(
+                f"Monitor: {usage['cpu_percent']:.1f}% CPU, {rss} RSS, {usage['threads']} threads"
+            )
+        
+        # Histograms of both the sampler's collectors and this window's redraws
+        timings = self.instrumentation.summary()
+        self.timings_table.setRowCount(len(timings))
+        for row, (name, stats) in enumerate(timings.items()):
+            values = [name, str(stats['count'])] + [
+                f"{stats[key] / 1000:.2f}" if stats[key] is not None else "-"
+                for key in ('p50_us', 'p95_us', 'p99_us', 'max_us')
+            ]
+            for column, value in enumerate(values):
+                item = self.timings_table.item(row, column)
+                if item is None:
+                    self.timings_table.setItem(row, column, QTableWidgetItem(value))
+                elif item.text() != value:
+                    item.setText(value)
             
-    def update_basic_metrics(self, process_metrics, system_metrics):
+    def update_basic_metrics(self, process_metrics, system_metrics, bottleneck):
         """Update the basic metrics display"""
         try:
             self.metrics_labels['fps'].setText(f"FPS: {process_metrics['fps']}")
             
             cpu_info = system_metrics['cpu']
-            self.metrics_labels['cpu'].setText(f"CPU Usage: {process_metrics['cpu_percent']:.1f}%")
+            self.metrics_labels['cpu'].setText(
+                f"CPU Usage: {process_metrics['cpu_percent']:.1f}% "
+                f"({process_metrics.get('cpu_percent_cores', 0) / 100:.1f} cores)"
+            )
             self.metrics_labels['cpu_temp'].setText(f"CPU Temp: {cpu_info['temperature']:.1f}°C")
             
             gpu_info = system_metrics.get('gpu', {})
@@ -608,23 +909,14 @@ class MainWindow(QMainWindow):
             else:
                 self.metrics_labels['frame_time'].setText("Frame Time: --")
             
-            bottleneck = self.bottleneck_analyzer.analyze(process_metrics, system_metrics)
-            if bottleneck.exists:
+            if bottleneck and bottleneck.exists:
                 self.metrics_labels['bottleneck'].setText(
                     f"Bottleneck: {bottleneck.component} ({bottleneck.severity*100:.0f}%)"
                 )
-                self.metrics_labels['bottleneck'].setStyleSheet(
-                    "QLabel { color: #ff4444; font-size: 14px; font-weight: bold; }"
-                )
+                self.set_label_style(self.metrics_labels['bottleneck'], BOTTLENECK_STYLES[True])
             else:
                 self.metrics_labels['bottleneck'].setText("Bottleneck: None")
-                self.metrics_labels['bottleneck'].setStyleSheet(
-                    "QLabel { color: #44ff44; font-size: 14px; }"
-                )
-            
-            if hasattr(process_metrics, 'frame_time'):
-                frame_analysis = self.frame_analyzer.analyze_frame_times(process_metrics['frame_time'])
-                self.metrics_labels['frame_pacing'].setText(f"Frame Pacing: {frame_analysis['frame_pacing']}")
+                self.set_label_style(self.metrics_labels['bottleneck'], BOTTLENECK_STYLES[False])
             
         except Exception as e:
             logger.error(f"Error updating basic metrics: {e}")
@@ -636,43 +928,39 @@ class MainWindow(QMainWindow):
                 if key in frame_analysis:
                     value = frame_analysis[key]
                     
-                    if key == 'stutters':
+                    if key == 'stutters_detected':
                         formatted_value = str(int(value))
                         # Color code based on stutter count
                         if value == 0:
-                            color = "#44ff44"
+                            state = 'good'
                         elif value < 5:
-                            color = "#ffff44"
+                            state = 'warning'
                         else:
-                            color = "#ff4444"
+                            state = 'bad'
                     else:
                         formatted_value = f"{value:.2f}{metric_data['unit']}"
                         if key in ['avg_frame_time', '1%_low', '0.1%_low']:
                             if value < 16.7:  
-                                color = "#44ff44"
+                                state = 'good'
                             elif value < 33.3:
-                                color = "#ffff44" 
+                                state = 'warning'
                             else:
-                                color = "#ff4444"
+                                state = 'bad'
                         else:
-                            color = "#ffffff" 
+                            state = 'neutral'
                     
                     metric_data['value'].setText(formatted_value)
-                    metric_data['value'].setStyleSheet(f"""
-                        QLabel {{
-                            color: {color};
-                            font-size: 16px;
-                            font-weight: bold;
-                        }}
-                    """)
+                    self.set_label_style(metric_data['value'], VALUE_STYLES[state])
                     
         except Exception as e:
             logger.error(f"Error updating frame metrics: {e}")
         
     def update_network_metrics(self, network_metrics):
         if network_metrics:
-            self.network_metrics['bytes_sent']['value'].setText(f"{network_metrics['bytes_sent']/1024:.1f} KB/s")
-            self.network_metrics['bytes_recv']['value'].setText(f"{network_metrics['bytes_recv']/1024:.1f} KB/s")
+            self.network_metrics['bytes_sent']['value'].setText(
+                f"{network_metrics.get('bytes_sent_per_sec', 0)/1024:.1f} KB/s")
+            self.network_metrics['bytes_recv']['value'].setText(
+                f"{network_metrics.get('bytes_recv_per_sec', 0)/1024:.1f} KB/s")
             self.network_metrics['connections']['value'].setText(str(network_metrics['active_connections']))
             
             servers = network_metrics.get('servers', [])
@@ -682,6 +970,23 @@ class MainWindow(QMainWindow):
             else:
                 self.servers_list.setText("No active connections")
         
+    def update_watched_processes(self, targets):
+        self.watched_table.setRowCount(len(targets))
+        for row, (pid, metrics) in enumerate(sorted(targets.items())):
+            values = [
+                metrics.get('name', ''),
+                str(pid),
+                f"{metrics['cpu_percent']:.1f}",
+                f"{metrics['memory_percent']:.1f}",
+                str(metrics['fps'])
+            ]
+            for column, value in enumerate(values):
+                item = self.watched_table.item(row, column)
+                if item is None:
+                    self.watched_table.setItem(row, column, QTableWidgetItem(value))
+                elif item.text() != value:
+                    item.setText(value)
+        
     def update_optimization_tips(self, tips):
         for label in self.optimization_labels:
             label.setText("")
@@ -0,0 +1,150 @@
+"""Collector daemon without any Qt import.
+
+Runs the MetricsSampler and streams every snapshot as JSON lines or as the
+binary session format used by ``--record``.
+"""
+import json
+import logging
+import signal
+import sys
+import threading
+from typing import Dict, List, Optional
+
+import psutil
+
+from .sampler import MetricsSampler, MetricsSnapshot
+from .config import Config
+from .frame_source import create_frame_source
+from .platform_backend import create_backend
+from .instrumentation import create_instrumentation
+from .exporter import attach_exporter
+from .input_monitor import create_latency_pipeline
+
+logger = logging.getLogger(__name__)
+
+
+def snapshot_to_dict(snapshot: MetricsSnapshot) -> Dict:
+    """Plain JSON-serializable view of a snapshot"""
+    bottleneck = snapshot.bottleneck
+    return {
+        'timestamp': snapshot.timestamp,
+        'sequence': snapshot.sequence,
+        'pid': snapshot.pid,
+        'process_name': snapshot.process_name,
+        'process': snapshot.process,
+        'system': snapshot.system,
+        'network': snapshot.network,
+        'frame': snapshot.frame,
+        'targets': {str(pid): metrics for pid, metrics in snapshot.targets.items()},
+        'diagnostics': snapshot.diagnostics,
+        'input_latency': {str(pid): latency for pid, latency in snapshot.input_latency.items()},
+        'bottleneck': {
+            'exists': bottleneck.exists,
+            'component': bottleneck.component,
+            'severity': bottleneck.severity,
+            'description': bottleneck.description
+        } if bottleneck else None
+    }
+
+
+def _json_default(value):
+    # numpy scalars and arrays that slip into the metric dicts
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    return str(value)
+
+
+class JsonLinesWriter:
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, snapshot: MetricsSnapshot):
+        self.stream.write(json.dumps(snapshot_to_dict(snapshot), default=_json_default))
+        self.stream.write("\n")
+        self.stream.flush()
+
+    def close(self):
+        if self.stream is not sys.stdout:
+            self.stream.close()
+
+
+def resolve_target(target: str) -> Optional[int]:
+    """Accept a PID or a process name (first match wins)"""
+    if target.isdigit():
+        return int(target)
+    wanted = target.lower()
+    for process in psutil.process_iter(['pid', 'name']):
+        name = process.info['name'] or ''
+        if name.lower() == wanted:
+            return process.info['pid']
+    return None
+
+
+def run_headless(target: str, interval: Optional[float] = None, output: Optional[str] = None,
+                 output_format: str = 'jsonl', exporter_port: Optional[int] = None,
+                 watch: Optional[List[str]] = None) -> int:
+    pid = resolve_target(target)
+    if pid is None:
+        print(f"Process not found: {target}", file=sys.stderr)
+        return 1
+    try:
+        process_name = psutil.Process(pid).name()
+    except psutil.Error as e:
+        print(f"Cannot monitor PID {pid}: {e}", file=sys.stderr)
+        return 1
+
+    config = Config()
+    if interval is None:
+        interval = config.settings.get('refresh_rate', 250) / 1000.0
+    sampler = MetricsSampler(
+        interval=interval,
+        frame_source=create_frame_source(config.settings.get('frame_source')),
+        collector_intervals=config.settings.get('collector_intervals'),
+        backend=create_backend(config.settings.get('platform_backend')),
+        instrumentation=create_instrumentation(config.settings.get('instrumentation')),
+        latency_pipeline=create_latency_pipeline(config.settings.get('input_latency'),
+                                                 config.settings.get('frame_source'))
+    )
+    sampler.set_target(pid, process_name)
+    for extra in watch or []:
+        extra_pid = resolve_target(extra)
+        if extra_pid is None:
+            print(f"Process not found, not watching: {extra}", file=sys.stderr)
+            continue
+        try:
+            sampler.watch(extra_pid, psutil.Process(extra_pid).name())
+        except psutil.Error as e:
+            print(f"Cannot watch PID {extra_pid}: {e}", file=sys.stderr)
+
+    if output_format == 'binary':
+        from .recorder import SessionRecorder
+        if not output:
+            print("Binary output needs --output FILE", file=sys.stderr)
+            return 1
+        sink = SessionRecorder(output)
+        sampler.add_listener(sink.record)
+    else:
+        sink = JsonLinesWriter(open(output, 'a') if output else sys.stdout)
+        sampler.add_listener(sink.write)
+
+    exporter_settings = dict(config.settings.get('exporter', {}))
+    if exporter_port is not None:
+        exporter_settings.update(enabled=True, port=exporter_port)
+    exporter = attach_exporter(sampler, exporter_settings)
+
+    stopped = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stopped.set())
+
+    sampler.start()
+    try:
+        while not stopped.wait(1.0):
+            if not psutil.pid_exists(pid):
+                logger.warning(f"PID {pid} exited, stopping")
+                break
+    finally:
+        sampler.stop()
+        sink.close()
+        if exporter:
+            exporter.stop()
+    return 0
@@ -0,0 +1,73 @@
+import math
+
+import numpy as np
+
+
+class MinMaxHistory:
+    """Multi-channel circular history with min/max decimation for drawing.
+
+    Raw samples go into one preallocated ``(channels, capacity)`` ring. Next to
+    it, per-bucket minima and maxima are maintained as samples arrive, with the
+    bucket size picked so the whole history spans about ``resolution`` buckets.
+    Rendering therefore costs O(resolution) no matter how long the history is.
+    """
+
+    def __init__(self, channels, capacity, resolution=1000):
+        self.channels = channels
+        self.capacity = max(1, int(capacity))
+        self.data = np.zeros((channels, self.capacity))
+        self.total = 0
+        self.set_resolution(resolution)
+
+    def set_resolution(self, resolution):
+        """Rebuild the buckets for a new target point count (e.g. plot width in pixels)"""
+        resolution = max(1, int(resolution))
+        self.bucket_size = max(1, math.ceil(self.capacity / resolution))
+        self.bucket_count = math.ceil(self.capacity / self.bucket_size) + 1
+        self.bucket_min = np.zeros((self.channels, self.bucket_count))
+        self.bucket_max = np.zeros((self.channels, self.bucket_count))
+
+        if self.bucket_size > 1 and self.total:
+            indices = np.arange(max(0, self.total - self.capacity), self.total)
+            values = self.data[:, indices % self.capacity]
+            buckets = (indices // self.bucket_size) % self.bucket_count
+            self.bucket_min[:] = np.inf
+            self.bucket_max[:] = -np.inf
+            for channel in range(self.channels):
+                np.minimum.at(self.bucket_min[channel], buckets, values[channel])
+                np.maximum.at(self.bucket_max[channel], buckets, values[channel])
+
+    def push(self, values):
+        index = self.total
+        self.data[:, index % self.capacity] = values
+        if self.bucket_size > 1:
+            bucket = (index // self.bucket_size) % self.bucket_count
+            if index % self.bucket_size == 0:
+                self.bucket_min[:, bucket] = values
+                self.bucket_max[:, bucket] = values
+            else:
+                np.minimum(self.bucket_min[:, bucket], values, out=self.bucket_min[:, bucket])
+                np.maximum(self.bucket_max[:, bucket], values, out=self.bucket_max[:, bucket])
+        self.total += 1
+
+    def render(self):
+        """Return (sample_indices, values) ready to plot, oldest first.
+
+        With decimation each bucket contributes its minimum and its maximum, so
+        short spikes survive however many samples share a pixel.
+        """
+        if self.total == 0:
+            return np.zeros(0), np.zeros((self.channels, 0))
+
+        first = max(0, self.total - self.capacity)
+        if self.bucket_size == 1:
+            indices = np.arange(first, self.total)
+            return indices, self.data[:, indices % self.capacity]
+
+        buckets = np.arange(first // self.bucket_size, (self.total - 1) // self.bucket_size + 1)
+        slots = buckets % self.bucket_count
+        values = np.empty((self.channels, 2 * buckets.size))
+        values[:, 0::2] = self.bucket_min[:, slots]
+        values[:, 1::2] = self.bucket_max[:, slots]
+        indices = np.repeat(buckets * self.bucket_size + (self.bucket_size - 1) / 2.0, 2)
+        return indices, values
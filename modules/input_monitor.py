@@ -1,25 +1,397 @@
-import win32gui
-import win32api
+"""Input-to-present latency: how long after an input the game presents a frame.
+
+Sources hand over timestamped input and present events; each input is
+matched to the first present of the same process after it, and the
+latencies feed a sliding histogram per target.
+"""
+import logging
 import time
-from typing import Dict, Optional
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .frame_analyzer import BUCKET_VALUES, HIST_BUCKETS, histogram_buckets
+from .frame_source import CsvLogTail, PresentMonSource, parse_columns
+
+logger = logging.getLogger(__name__)
+
+_NO_EVENTS = np.zeros((0, 2))
+UNKNOWN_PID = -1
+
+
+class LatencyEventSource:
+    """Supplies timestamped input and/or present events.
+
+    Both methods return the events since the previous call as a float array
+    of shape (n, 2): time in seconds and pid (-1 when unknown), oldest
+    first. Every source feeding one pipeline must use the same clock, and
+    neither method may block. A source may supply only one kind.
+    """
+    name = "none"
+
+    def read_inputs(self) -> np.ndarray:
+        return _NO_EVENTS
+
+    def read_presents(self) -> np.ndarray:
+        return _NO_EVENTS
+
+    def close(self):
+        pass
+
+
+class ReplayEventSource(LatencyEventSource):
+    """Events from a file of ``time,pid,kind`` lines (kind ``input`` or ``present``).
+
+    With ``speed`` 0 the whole file is handed over by the first reads;
+    otherwise events are released as their recorded time comes round,
+    scaled by ``speed``, counting from the first read.
+    """
+    name = "replay"
+    KINDS = {'input': 0, 'present': 1}
+
+    def __init__(self, path: str, speed: float = 0.0):
+        self.path = path
+        self.speed = speed
+        rows = []
+        with open(path, 'rb') as f:
+            for line in f:
+                fields = line.decode('utf-8', 'replace').strip().split(',')
+                try:
+                    rows.append((float(fields[0]), float(fields[1]), self.KINDS[fields[2].strip()]))
+                except (ValueError, IndexError, KeyError):
+                    continue  # header or malformed line
+        events = np.array(rows, dtype=np.float64).reshape(-1, 3)
+        events = events[np.argsort(events[:, 0], kind='stable')]
+        self._streams = [events[events[:, 2] == kind, :2] for kind in (0, 1)]
+        self._positions = [0, 0]
+        self._origin = float(events[0, 0]) if len(events) else 0.0
+        self._started = None
+
+    def _read(self, kind: int) -> np.ndarray:
+        events = self._streams[kind]
+        start = self._positions[kind]
+        if self.speed > 0:
+            if self._started is None:
+                self._started = time.monotonic()
+            horizon = self._origin + (time.monotonic() - self._started) * self.speed
+            end = int(np.searchsorted(events[:, 0], horizon, side='right'))
+        else:
+            end = len(events)
+        self._positions[kind] = max(start, end)
+        return events[start:end]
+
+    def read_inputs(self) -> np.ndarray:
+        return self._read(0)
+
+    def read_presents(self) -> np.ndarray:
+        return self._read(1)
+
+
+class PresentMonPresentSource(LatencyEventSource, CsvLogTail):
+    """Present times from a PresentMon CSV capture as it grows.
+
+    Only QPC timestamps (PresentMon's ``--qpc_time``) share a clock with
+    live input; on Windows they convert exactly to ``time.perf_counter``
+    seconds. Relative times (``TimeInSeconds``) are only comparable with
+    inputs recorded in the same capture, so with ``require_qpc`` a capture
+    without a QPC column yields no presents and logs an error instead.
+    """
+    name = "presentmon"
+    # Column name and its unit: 'qpc' ticks, 'ms' or 's'
+    TIME_COLUMNS = (('CPUStartQPC', 'qpc'), ('TimeInQPC', 'qpc'), ('CPUStartTime', 'ms'),
+                    ('TimeInSeconds', 's'))
+
+    def __init__(self, path: str, require_qpc: bool = False, **kwargs):
+        CsvLogTail.__init__(self, path, **kwargs)
+        self.require_qpc = require_qpc
+        self._columns = None
+        self._scale = 1.0
+
+    def on_open(self):
+        self._columns = None
+
+    def _resolve_header(self, block: bytes) -> bytes:
+        newline = block.find(b"\n")
+        self.header = [h.strip() for h in block[:newline].decode('utf-8', 'replace').split(',')]
+        pid = next((self.header.index(c) for c in PresentMonSource.PID_COLUMNS if c in self.header), None)
+        for column, unit in self.TIME_COLUMNS:
+            if column in self.header and pid is not None:
+                if self.require_qpc and unit != 'qpc':
+                    logger.error(f"{self.current_file} has no QPC time column; capture with PresentMon "
+                                 f"--qpc_time to measure input latency against live input")
+                    break
+                self._columns = [self.header.index(column), pid]
+                self._scale = 1.0 / _qpc_frequency() if unit == 'qpc' else {'ms': 1e-3, 's': 1.0}[unit]
+                break
+        else:
+            logger.warning(f"No present time or process column in {self.current_file}")
+        return block[newline + 1:]
+
+    def read_presents(self) -> np.ndarray:
+        block = self.read_lines()
+        if block and self.header is None:
+            block = self._resolve_header(block)
+        if not block or self._columns is None:
+            return _NO_EVENTS
+        events = parse_columns(block, self._columns)
+        events[:, 0] *= self._scale
+        return events
+
+    def close(self):
+        CsvLogTail.close(self)
+
+
+def _qpc_frequency() -> float:
+    import win32api
+    return float(win32api.QueryPerformanceFrequency())
+
+
+class Win32InputSource(LatencyEventSource):
+    """The latest keyboard or mouse input, polled, attributed to the foreground process.
+
+    ``GetLastInputInfo`` only keeps the most recent input, so inputs closer
+    together than the polling interval collapse into the last one. Its
+    millisecond tick time is converted to ``time.perf_counter`` seconds, but
+    the tick count only advances with the system timer (10-16 ms), so each
+    latency is uncertain by about that much. Percentiles over many inputs
+    are still meaningful; single values are not.
+    """
+    name = "win32"
 
-class InputMonitor:
     def __init__(self):
-        self.last_input_time = time.time()
-        self.input_delays = []
-        
-    def measure_input_lag(self, hwnd: int) -> Optional[float]:
-        try:
-            current_time = time.time()
-            msg_time = win32gui.GetMessageTime()
-            
-            if msg_time:
-                delay_ms = (current_time - (msg_time / 1000.0)) * 1000
-                self.input_delays.append(delay_ms)
-                
-                if len(self.input_delays) > 100:
-                    self.input_delays.pop(0)
-                    
-                return sum(self.input_delays) / len(self.input_delays)
-        except:
-            return None 
\ No newline at end of file
+        self._last_tick = None
+
+    def read_inputs(self) -> np.ndarray:
+        import win32api
+        import win32gui
+        import win32process
+        tick = win32api.GetLastInputInfo()
+        if tick == self._last_tick:
+            return _NO_EVENTS
+        first = self._last_tick is None
+        self._last_tick = tick
+        if first:
+            # Whatever happened before monitoring started
+            return _NO_EVENTS
+        age = ((win32api.GetTickCount() - tick) & 0xFFFFFFFF) / 1000.0
+        _, pid = win32process.GetWindowThreadProcessId(win32gui.GetForegroundWindow())
+        return np.array([[time.perf_counter() - age, pid]])
+
+
+class EventRing:
+    """Fixed-capacity ring of ascending timestamps; the oldest are overwritten when full"""
+
+    def __init__(self, capacity: int):
+        self._values = np.zeros(capacity)
+        self._head = 0
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def capacity(self) -> int:
+        return self._values.size
+
+    def push_many(self, values: np.ndarray):
+        capacity = self._values.size
+        values = values[-capacity:]
+        positions = (self._head + np.arange(values.size)) % capacity
+        self._values[positions] = values
+        self._head = (self._head + values.size) % capacity
+        self._count = min(capacity, self._count + values.size)
+
+    def values(self) -> np.ndarray:
+        """Oldest first"""
+        start = (self._head - self._count) % self._values.size
+        if start + self._count <= self._values.size:
+            return self._values[start:start + self._count]
+        return np.concatenate((self._values[start:], self._values[:self._head]))
+
+    def drop_oldest(self, count: int):
+        self._count -= min(count, self._count)
+
+    def drop_before(self, threshold: float) -> int:
+        dropped = int(np.searchsorted(self.values(), threshold))
+        self.drop_oldest(dropped)
+        return dropped
+
+
+class LatencyWindow:
+    """p50/p95/p99 of the last ``size`` latencies from a log-bucketed histogram.
+
+    Uses the frame-time histogram buckets (1% wide, 0.05 ms to 5 s), so an
+    update costs a bincount and percentiles a cumulative sum, whatever the
+    window size.
+    """
+
+    def __init__(self, size: int = 500):
+        self._buckets = np.zeros(size, dtype=np.int64)
+        self._histogram = np.zeros(HIST_BUCKETS, dtype=np.int64)
+        self._head = 0
+        self.count = 0
+        self.total = 0
+        self.last = None
+
+    def push_many(self, latencies_ms: np.ndarray):
+        if not latencies_ms.size:
+            return
+        size = self._buckets.size
+        self.total += latencies_ms.size
+        self.last = float(latencies_ms[-1])
+        latencies_ms = latencies_ms[-size:]
+        positions = (self._head + np.arange(latencies_ms.size)) % size
+        evicted = max(0, self.count + latencies_ms.size - size)
+        if evicted:
+            oldest = (self._head - self.count + np.arange(evicted)) % size
+            self._histogram -= np.bincount(self._buckets[oldest], minlength=HIST_BUCKETS)
+        buckets = histogram_buckets(latencies_ms)
+        self._buckets[positions] = buckets
+        self._histogram += np.bincount(buckets, minlength=HIST_BUCKETS)
+        self._head = (self._head + latencies_ms.size) % size
+        self.count = min(size, self.count + latencies_ms.size)
+
+    def percentiles(self, fractions) -> List[Optional[float]]:
+        if not self.count:
+            return [None] * len(fractions)
+        cumulative = np.cumsum(self._histogram)
+        ranks = np.maximum(1, np.ceil(np.asarray(fractions) * self.count))
+        return [float(value) for value in BUCKET_VALUES[np.searchsorted(cumulative, ranks)]]
+
+
+class TargetLatency:
+    """Pending inputs and recent presents of one process, matched as they arrive.
+
+    Each source delivers in time order, so once a present at time T is
+    known every input before T has its next present in the ring. The clock
+    is the newest present: inputs more than ``max_latency`` seconds behind
+    it had no present in time (the game was paused or in the background)
+    and are dropped, as are matches slower than that, and presents that
+    old can no longer be the next one for any input still kept. A present source that lags behind the input
+    source therefore never expires inputs early.
+    """
+
+    def __init__(self, window: int = 500, max_latency: float = 1.0, capacity: int = 4096):
+        self.max_latency = max_latency
+        self.inputs = EventRing(capacity)
+        self.presents = EventRing(capacity)
+        self.latencies = LatencyWindow(window)
+        self.clock = float('-inf')
+        self.dropped = 0
+
+    def add(self, inputs: np.ndarray, presents: np.ndarray):
+        """Queue ``inputs`` and match them against ``presents`` (both event times)"""
+        if inputs.size:
+            # Late input may arrive out of order with what is pending; keep the ring sorted
+            pending = np.sort(np.concatenate((self.inputs.values(), inputs)))
+            self.inputs.drop_oldest(len(self.inputs))
+            self.inputs.push_many(pending)
+        # A backlog larger than the ring is matched a ring's worth at a time
+        # so no present is overwritten before the inputs it follows are seen
+        chunk = self.presents.capacity
+        for start in range(0, presents.size, chunk):
+            block = presents[start:start + chunk]
+            self.presents.push_many(block)
+            self.clock = max(self.clock, float(block[-1]))
+            self.match()
+        if not presents.size:
+            self.match()
+
+    def match(self):
+        pending = self.inputs.values()
+        presents = self.presents.values()
+        if pending.size and presents.size:
+            following = np.searchsorted(presents, pending, side='right')
+            # Both are sorted, so the matched inputs are a prefix of the pending ones
+            matched = int(np.count_nonzero(following < presents.size))
+            if matched:
+                latencies = presents[following[:matched]] - pending[:matched]
+                in_time = latencies <= self.max_latency
+                self.dropped += matched - int(np.count_nonzero(in_time))
+                self.latencies.push_many(latencies[in_time] * 1000.0)
+                self.inputs.drop_oldest(matched)
+        horizon = self.clock - self.max_latency
+        self.dropped += self.inputs.drop_before(horizon)
+        self.presents.drop_before(horizon)
+
+    def stats(self) -> Dict:
+        p50, p95, p99 = self.latencies.percentiles((0.50, 0.95, 0.99))
+        return {
+            'p50_ms': p50,
+            'p95_ms': p95,
+            'p99_ms': p99,
+            'last_ms': self.latencies.last,
+            'samples': self.latencies.count,
+            'matched': self.latencies.total,
+            'dropped': self.dropped,
+            'pending': len(self.inputs)
+        }
+
+
+class InputLatencyPipeline:
+    """Input-to-present latency per target from a pair of event sources.
+
+    ``input_source`` and ``present_source`` may be the same object (a
+    replay file carries both). Called from the sampler thread.
+    """
+
+    def __init__(self, input_source: LatencyEventSource, present_source: LatencyEventSource,
+                 window: int = 500, max_latency: float = 1.0):
+        self.input_source = input_source
+        self.present_source = present_source
+        self.window = window
+        self.max_latency = max_latency
+        self.targets: Dict[int, TargetLatency] = {}
+
+    def update(self, pids: List[int]) -> Dict[int, Dict]:
+        """Read both sources and return the latency of every pid in ``pids``.
+
+        Events of other processes are discarded; events without a pid are
+        credited to ``pids[0]``, the main target.
+        """
+        inputs = self.input_source.read_inputs()
+        presents = self.present_source.read_presents()
+        for pid in set(self.targets) - set(pids):
+            del self.targets[pid]
+        results = {}
+        for index, pid in enumerate(pids):
+            target = self.targets.get(pid)
+            if target is None:
+                target = self.targets[pid] = TargetLatency(self.window, self.max_latency)
+            owners = (pid, UNKNOWN_PID) if index == 0 else (pid,)
+            target.add(inputs[np.isin(inputs[:, 1], owners), 0],
+                       presents[np.isin(presents[:, 1], owners), 0])
+            results[pid] = target.stats()
+        return results
+
+    def close(self):
+        self.input_source.close()
+        if self.present_source is not self.input_source:
+            self.present_source.close()
+
+
+def create_latency_pipeline(settings: Optional[Dict],
+                            frame_source: Optional[Dict] = None) -> Optional[InputLatencyPipeline]:
+    """Build the pipeline described by the ``input_latency`` config entry.
+
+    ``live`` pairs the foreground input with the presents of the PresentMon
+    capture configured as ``frame_source``; ``replay`` reads both from a
+    ``time,pid,kind`` event file.
+    """
+    kind = (settings or {}).get('type', 'none')
+    if kind == 'none':
+        return None
+    if kind == 'replay':
+        if not settings.get('path'):
+            logger.warning("Input latency replay needs an event file path")
+            return None
+        source = ReplayEventSource(settings['path'], speed=settings.get('speed', 1.0))
+        return InputLatencyPipeline(source, source)
+    if kind == 'live':
+        if not frame_source or frame_source.get('type') != 'presentmon' or not frame_source.get('path'):
+            logger.warning("Live input latency needs a PresentMon frame_source")
+            return None
+        return InputLatencyPipeline(Win32InputSource(),
+                                    PresentMonPresentSource(frame_source['path'], require_qpc=True))
+    logger.warning(f"Unknown input latency type: {kind}")
+    return None
@@ -0,0 +1,153 @@
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (microseconds) of the latency buckets, 1-2-5 steps from 10 us
+# to 10 s; anything slower lands in a final overflow bucket
+LATENCY_BUCKETS_US = tuple(
+    step * 10 ** exponent for exponent in range(1, 7) for step in (1, 2, 5)
+) + (10_000_000,)
+
+
+class LatencyHistogram:
+    """Latency counts in fixed buckets.
+
+    Recording is one bisect and one increment, with no allocation, so it can
+    sit on every collector call. Percentiles are reported as the upper bound
+    of the bucket they fall in.
+    """
+    __slots__ = ('bounds', 'counts', 'count', 'total', 'max')
+
+    def __init__(self, bounds=LATENCY_BUCKETS_US):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float):
+        micros = seconds * 1e6
+        self.counts[bisect_left(self.bounds, micros)] += 1
+        self.count += 1
+        self.total += micros
+        if micros > self.max:
+            self.max = micros
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return min(self.bounds[index], self.max) if index < len(self.bounds) else self.max
+        return self.max
+
+    def summary(self) -> Dict:
+        return {
+            'count': self.count,
+            'mean_us': self.total / self.count if self.count else None,
+            'p50_us': self.percentile(0.50),
+            'p95_us': self.percentile(0.95),
+            'p99_us': self.percentile(0.99),
+            'max_us': self.max if self.count else None
+        }
+
+    def reset(self):
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+
+class Instrumentation:
+    """Named latency histograms for the monitor's own collectors and redraws.
+
+    Each histogram should be written from one thread only (the sampler's
+    collectors, the GUI's renderers); ``summary`` may be read from any.
+    When disabled, ``timed`` hands back the function unchanged and
+    ``record`` does nothing, so the hooks cost nothing at all.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.histograms: Dict[str, LatencyHistogram] = {}
+
+    def histogram(self, name: str) -> LatencyHistogram:
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = LatencyHistogram()
+        return histogram
+
+    def record(self, name: str, seconds: float):
+        if self.enabled:
+            self.histogram(name).record(seconds)
+
+    def timed(self, name: str, func: Callable) -> Callable:
+        """``func`` wrapped so every call is recorded under ``name``"""
+        if not self.enabled:
+            return func
+        histogram = self.histogram(name)
+        clock = time.perf_counter
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            started = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram.record(clock() - started)
+        return wrapper
+
+    def summary(self) -> Dict[str, Dict]:
+        return {name: histogram.summary() for name, histogram in sorted(self.histograms.items())}
+
+    def reset(self):
+        for histogram in self.histograms.values():
+            histogram.reset()
+
+
+def create_instrumentation(settings: Optional[Dict]) -> Instrumentation:
+    """Build from the ``instrumentation`` config entry; enabled unless switched off"""
+    return Instrumentation(enabled=(settings or {}).get('enabled', True))
+
+
+class SelfUsage:
+    """CPU and memory of the monitor process itself.
+
+    CPU comes from ``os.times()`` deltas (100 per busy core); RSS and the OS
+    thread count from the platform backend's stat read of our own pid.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend
+        self.pid = os.getpid()
+        self._last = None
+
+    def read(self) -> Dict:
+        times = os.times()
+        now = time.monotonic()
+        busy = times.user + times.system
+        previous = self._last
+        self._last = (now, busy)
+        cpu_percent = 0.0
+        if previous is not None and now > previous[0]:
+            cpu_percent = max(0.0, (busy - previous[1]) / (now - previous[0]) * 100)
+
+        rss = threads = None
+        if self.backend is not None:
+            stat = self.backend.read_processes([self.pid]).get(self.pid)
+            if stat is not None:
+                rss, threads = stat.rss, stat.threads
+        return {
+            'cpu_percent': cpu_percent,
+            'rss': rss,
+            'threads': threads if threads is not None else threading.active_count()
+        }
@@ -0,0 +1,370 @@
+import glob
+import logging
+import os
+import select
+import shutil
+import socket
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .platform_backend import Connection, DiskCounters, PlatformBackend, ProcessStat
+
+logger = logging.getLogger(__name__)
+
+CLOCK_TICKS = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+GPU_VENDORS = {'0x10de': 'NVIDIA', '0x1002': 'AMD', '0x8086': 'Intel'}
+
+# /proc/<pid>/stat fields after "pid (comm)", so index = field number - 3
+_STAT_UTIME, _STAT_STIME, _STAT_THREADS, _STAT_START, _STAT_RSS = 11, 12, 17, 19, 21
+# /proc/diskstats sizes are always in 512-byte sectors, whatever the device's own
+SECTOR_SIZE = 512
+# Block devices that are not disks a game streams from
+VIRTUAL_DISK_PREFIXES = ('loop', 'ram', 'zram')
+
+# /proc/net tables: (file, socket type, address family)
+NET_TABLES = (('tcp', 'tcp', socket.AF_INET), ('tcp6', 'tcp', socket.AF_INET6),
+              ('udp', 'udp', socket.AF_INET), ('udp6', 'udp', socket.AF_INET6))
+TCP_STATES = {
+    b'01': 'ESTABLISHED', b'02': 'SYN_SENT', b'03': 'SYN_RECV', b'04': 'FIN_WAIT1',
+    b'05': 'FIN_WAIT2', b'06': 'TIME_WAIT', b'07': 'CLOSE', b'08': 'CLOSE_WAIT',
+    b'09': 'LAST_ACK', b'0A': 'LISTEN', b'0B': 'CLOSING'
+}
+
+
+def _pread_all(fd: int, size: int = 4096) -> bytes:
+    """Whole contents of a /proc or sysfs file; they regenerate on every read from offset 0"""
+    while True:
+        data = os.pread(fd, size, 0)
+        if len(data) < size:
+            return data
+        size *= 4
+
+
+def _parse_address(text: bytes, family: int) -> Tuple[str, int]:
+    # "0100007F:0035": the address in host byte order, 32 bits at a time
+    host, port = text.split(b':')
+    raw = bytes.fromhex(host.decode('ascii'))
+    raw = b''.join(raw[i:i + 4][::-1] for i in range(0, len(raw), 4))
+    return socket.inet_ntop(family, raw), int(port, 16)
+
+
+def _parse_stat(data: bytes):
+    # comm may contain spaces and parentheses; it ends at the last ')'
+    return data[data.rindex(b')') + 2:].split()
+
+
+class LinuxBackend(PlatformBackend):
+    """Reads /proc and sysfs directly instead of going through psutil.
+
+    Every file is opened once and re-read with ``pread`` on the same
+    descriptor, and each is parsed in a single pass, so a tick costs one
+    syscall per file rather than the open/read/close sequence (and the
+    several files) psutil goes through per attribute. A descriptor on
+    ``/proc/<pid>/stat`` keeps pointing at the process it was opened for and
+    fails with ESRCH once it exits, so a reused pid is never mistaken for it.
+    """
+    name = "linux"
+    # Descriptors kept open for process and thread stat files
+    max_open_files = 512
+
+    def __init__(self, proc: str = "/proc", sys_root: str = "/sys"):
+        super().__init__()
+        self.proc = proc
+        self.sys_root = sys_root
+        self._stat_fds: 'OrderedDict[int, int]' = OrderedDict()
+        self._thread_fds: Dict[int, Dict[int, int]] = {}
+        self._system_fds: Dict[str, int] = {}
+        self._last_cpu = None
+        self._boot_time = None
+        self._total_memory = None
+        self._mounts_poll = None
+        self._is_disk: Dict[str, bool] = {}
+        self._socket_owners: Dict[int, Optional[int]] = {}
+        self._owner_pids: Set[int] = set()
+
+    @staticmethod
+    def _close(fd: int):
+        try:
+            os.close(fd)
+        except OSError:
+            pass
+
+    def close(self):
+        super().close()
+        for fd in self._stat_fds.values():
+            self._close(fd)
+        for fds in self._thread_fds.values():
+            for fd in fds.values():
+                self._close(fd)
+        for fd in self._system_fds.values():
+            self._close(fd)
+        self._stat_fds.clear()
+        self._thread_fds.clear()
+        self._system_fds.clear()
+        self._mounts_poll = None
+
+    def _read_system(self, name: str) -> bytes:
+        fd = self._system_fds.get(name)
+        if fd is None:
+            fd = self._system_fds[name] = os.open(os.path.join(self.proc, name), os.O_RDONLY)
+        return _pread_all(fd, 16384)
+
+    @property
+    def boot_time(self) -> float:
+        if self._boot_time is None:
+            for line in self._read_system('stat').splitlines():
+                if line.startswith(b'btime'):
+                    self._boot_time = float(line.split()[1])
+                    break
+            else:
+                self._boot_time = 0.0
+        return self._boot_time
+
+    def _read_stat(self, fds, key: int, path: str):
+        """Parsed stat fields through a cached descriptor, or None once the task is gone"""
+        fd = fds.get(key)
+        try:
+            if fd is None:
+                fd = fds[key] = os.open(path, os.O_RDONLY)
+            fields = _parse_stat(_pread_all(fd, 1024))
+        except (OSError, ValueError):
+            if fd is not None:
+                self._close(fds.pop(key))
+            return None
+        if fields[0] in (b'Z', b'X'):
+            self._close(fds.pop(key))
+            return None
+        return fields
+
+    def read_processes(self, pids: Iterable[int]) -> Dict[int, ProcessStat]:
+        boot_time = self.boot_time
+        stats = {}
+        for pid in pids:
+            fields = self._read_stat(self._stat_fds, pid, f"{self.proc}/{pid}/stat")
+            if fields is None:
+                continue
+            self._stat_fds.move_to_end(pid)
+            stats[pid] = ProcessStat(
+                pid,
+                boot_time + int(fields[_STAT_START]) / CLOCK_TICKS,
+                (int(fields[_STAT_UTIME]) + int(fields[_STAT_STIME])) / CLOCK_TICKS,
+                int(fields[_STAT_RSS]) * PAGE_SIZE,
+                int(fields[_STAT_THREADS])
+            )
+        # Pids nobody has asked about for a while only hold descriptors
+        while len(self._stat_fds) > self.max_open_files:
+            _, fd = self._stat_fds.popitem(last=False)
+            self._close(fd)
+        return stats
+
+    def create_times(self, pids: Iterable[int]) -> Dict[int, float]:
+        # Covers every process, so nothing is added to the descriptor cache
+        boot_time = self.boot_time
+        times = {}
+        for pid in pids:
+            try:
+                fd = os.open(f"{self.proc}/{pid}/stat", os.O_RDONLY)
+            except OSError:
+                continue
+            try:
+                fields = _parse_stat(_pread_all(fd, 1024))
+                times[pid] = boot_time + int(fields[_STAT_START]) / CLOCK_TICKS
+            except (OSError, ValueError, IndexError):
+                continue
+            finally:
+                os.close(fd)
+        return times
+
+    def read_threads(self, pid: int) -> Dict[int, float]:
+        try:
+            tids = [int(tid) for tid in os.listdir(f"{self.proc}/{pid}/task")]
+        except OSError:
+            self.forget(pid)
+            return {}
+        fds = self._thread_fds.setdefault(pid, {})
+        for tid in set(fds) - set(tids):
+            self._close(fds.pop(tid))
+
+        times = {}
+        for tid in tids:
+            fields = self._read_stat(fds, tid, f"{self.proc}/{pid}/task/{tid}/stat")
+            if fields is not None:
+                times[tid] = (int(fields[_STAT_UTIME]) + int(fields[_STAT_STIME])) / CLOCK_TICKS
+        return times
+
+    def forget(self, pid: int):
+        super().forget(pid)
+        fd = self._stat_fds.pop(pid, None)
+        if fd is not None:
+            self._close(fd)
+        for fd in self._thread_fds.pop(pid, {}).values():
+            self._close(fd)
+
+    def cpu_percent(self) -> float:
+        # First line: cpu user nice system idle iowait irq softirq steal guest guest_nice
+        line = self._read_system('stat').split(b'\n', 1)[0]
+        values = [int(value) for value in line.split()[1:9]]
+        total = sum(values)
+        idle = values[3] + values[4]
+        previous = self._last_cpu
+        self._last_cpu = (total, idle)
+        if previous is None or total <= previous[0]:
+            return 0.0
+        elapsed = total - previous[0]
+        return round(max(0.0, min(100.0, (elapsed - (idle - previous[1])) / elapsed * 100)), 1)
+
+    def _meminfo(self) -> Dict[bytes, int]:
+        values = {}
+        for line in self._read_system('meminfo').splitlines():
+            key, _, rest = line.partition(b':')
+            fields = rest.split()
+            if fields:
+                values[key] = int(fields[0]) * 1024
+        return values
+
+    def memory(self) -> Dict:
+        info = self._meminfo()
+        total = info[b'MemTotal']
+        # Kernels before 3.14 have no MemAvailable
+        available = info.get(b'MemAvailable', info.get(b'MemFree', 0) + info.get(b'Buffers', 0) +
+                             info.get(b'Cached', 0) + info.get(b'SReclaimable', 0))
+        return {
+            'total': total,
+            'available': available,
+            'percent': round((total - available) / total * 100, 1) if total else 0.0,
+            'used': total - available
+        }
+
+    def total_memory(self) -> int:
+        if self._total_memory is None:
+            self._total_memory = self._meminfo()[b'MemTotal']
+        return self._total_memory
+
+    def mounts_changed(self) -> Optional[bool]:
+        # The kernel flags an open mounts file with POLLPRI once the mount
+        # table changes, and polling it again clears the flag
+        if self._mounts_poll is None:
+            fd = self._system_fds['self/mounts'] = os.open(os.path.join(self.proc, 'self', 'mounts'),
+                                                           os.O_RDONLY)
+            self._mounts_poll = select.poll()
+            self._mounts_poll.register(fd, select.POLLPRI | select.POLLERR)
+            return False
+        return bool(self._mounts_poll.poll(0))
+
+    def _whole_disk(self, name: str) -> bool:
+        # Partitions have no /sys/block entry of their own
+        known = self._is_disk.get(name)
+        if known is None:
+            known = self._is_disk[name] = (not name.startswith(VIRTUAL_DISK_PREFIXES) and
+                                           os.path.exists(os.path.join(self.sys_root, 'block', name)))
+        return known
+
+    def disk_io_counters(self) -> Dict[str, DiskCounters]:
+        # major minor name, then reads, merged, sectors, ms, writes, merged,
+        # sectors, ms, in flight, ms busy, weighted ms
+        counters = {}
+        for line in self._read_system('diskstats').splitlines():
+            fields = line.split()
+            if len(fields) < 14:
+                continue
+            name = fields[2].decode('utf-8', 'replace')
+            if self._whole_disk(name):
+                counters[name] = DiskCounters(
+                    int(fields[3]), int(fields[7]),
+                    int(fields[5]) * SECTOR_SIZE, int(fields[9]) * SECTOR_SIZE,
+                    int(fields[6]), int(fields[10]), int(fields[12])
+                )
+        return counters
+
+    def _scan_socket_owners(self, pids: Set[int]) -> Dict[int, int]:
+        owners = {}
+        for pid in pids:
+            fd_dir = f"{self.proc}/{pid}/fd"
+            try:
+                fds = os.listdir(fd_dir)
+            except OSError:
+                continue
+            for fd in fds:
+                try:
+                    target = os.readlink(f"{fd_dir}/{fd}")
+                except OSError:
+                    continue
+                if target.startswith('socket:['):
+                    owners[int(target[8:-1])] = pid
+        return owners
+
+    def net_connections(self, pids: Optional[Iterable[int]] = None) -> List[Connection]:
+        """Parses /proc/net/{tcp,udp}[6] and resolves owners only for ``pids``.
+
+        Finding a socket's process means reading every fd link of every
+        process; here only the requested processes are scanned, and only
+        when a socket shows up that has not been attributed yet.
+        """
+        rows = []
+        for name, kind, family in NET_TABLES:
+            try:
+                data = self._read_system(f'net/{name}')
+            except OSError:
+                continue
+            for line in data.splitlines()[1:]:
+                fields = line.split()
+                if len(fields) < 10:
+                    continue
+                rows.append((kind, family, fields[1], fields[2], fields[3], int(fields[9])))
+
+        wanted = set(pids or ())
+        if wanted != self._owner_pids:
+            self._socket_owners.clear()
+            self._owner_pids = wanted
+        owners = self._socket_owners
+        inodes = {row[5] for row in rows}
+        if wanted and not inodes.issubset(owners):
+            found = self._scan_socket_owners(wanted)
+            owners.clear()
+            owners.update((inode, found.get(inode)) for inode in inodes)
+
+        connections = []
+        for kind, family, local, remote, state, inode in rows:
+            raddr = _parse_address(remote, family)
+            connections.append(Connection(
+                owners.get(inode), kind, _parse_address(local, family),
+                raddr if raddr[1] else None,
+                TCP_STATES.get(state, state.decode('ascii')) if kind == 'tcp' else 'NONE'
+            ))
+        return connections
+
+    def nvidia_smi_path(self) -> Optional[str]:
+        return shutil.which('nvidia-smi')
+
+    def gpu_info(self) -> Optional[Dict]:
+        for device in sorted(glob.glob(os.path.join(self.sys_root, 'class', 'drm', 'card[0-9]*', 'device'))):
+            try:
+                with open(os.path.join(device, 'vendor')) as f:
+                    vendor = f.read().strip()
+                with open(os.path.join(device, 'device')) as f:
+                    device_id = f.read().strip()
+            except OSError:
+                continue
+            name = f"{GPU_VENDORS.get(vendor, vendor)} {device_id}"
+            try:
+                with open(os.path.join(device, 'product_name')) as f:
+                    name = f.read().strip() or name
+            except OSError:
+                pass
+            try:
+                with open(os.path.join(device, 'mem_info_vram_total')) as f:
+                    memory = int(f.read())
+            except (OSError, ValueError):
+                memory = None
+            try:
+                driver = os.path.basename(os.readlink(os.path.join(device, 'driver')))
+            except OSError:
+                driver = None
+            return {'name': name, 'memory': memory, 'driver_version': driver}
+        return None
+
+    def sensor_sources(self) -> List:
+        from .sensors import HwmonSource, PsutilSensorsSource
+        return [HwmonSource(os.path.join(self.sys_root, 'class', 'hwmon')), PsutilSensorsSource()]
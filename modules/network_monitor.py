@@ -1,46 +1,78 @@
+import time
 import psutil
-import socket
-from typing import Dict, Optional
+from typing import Dict, Iterable, Optional
+from .connection_table import ConnectionSnapshot, ConnectionTable
+from .dns_resolver import ReverseDNSCache
+
+# Counted over the interval since the previous read; a sample repeated on a
+# tick the collector did not run must not count them again
+DELTA_KEYS = ('bytes_sent', 'bytes_recv')
+# Connections opened or closed since the previous read, reported once
+EVENT_KEYS = ('opened', 'closed')
+
+
+def without_deltas(metrics: Dict) -> Dict:
+    """Copy of ``metrics`` for a tick that did not measure it: rates kept, deltas and events cleared"""
+    if not metrics:
+        return metrics
+    return {**metrics, **{key: 0 for key in DELTA_KEYS}, **{key: [] for key in EVENT_KEYS}}
 
 class NetworkMonitor:
-    def __init__(self):
-        self.last_bytes = None
-        self.connections = {}
-        
-    def get_process_network_metrics(self, pid: int) -> Dict:
+    def __init__(self, resolver: Optional[ReverseDNSCache] = None,
+                 connection_table: Optional[ConnectionTable] = None):
+        self.last_bytes = {}
+        self.resolver = resolver or ReverseDNSCache()
+        self.connection_table = connection_table or ConnectionTable()
+
+    def close(self):
+        self.resolver.shutdown()
+
+    def _server(self, connection) -> Dict:
+        ip, port = connection.raddr
+        return {'ip': ip, 'port': port, 'hostname': self.resolver.display_name(ip)}
+
+    def get_process_network_metrics(self, pid: int, snapshot: Optional[ConnectionSnapshot] = None) -> Dict:
+        """Traffic and connections of ``pid``; reads ``snapshot`` instead of the OS table when given"""
         try:
-            process = psutil.Process(pid)
-            connections = process.connections()
-            
-            net_io = process.io_counters()
+            if snapshot is None:
+                snapshot = self.connection_table.refresh([pid])
+            connections = snapshot.for_pid(pid)
+
+            net_io = psutil.Process(pid).io_counters()
+            now = time.monotonic()
             current_bytes = (net_io.read_bytes, net_io.write_bytes)
-            
-            if self.last_bytes:
-                bytes_sent = current_bytes[1] - self.last_bytes[1]
-                bytes_recv = current_bytes[0] - self.last_bytes[0]
-            else:
-                bytes_sent = bytes_recv = 0
-                
-            self.last_bytes = current_bytes
-            
-            servers = []
-            for conn in connections:
-                if conn.raddr:
-                    try:
-                        hostname = socket.gethostbyaddr(conn.raddr.ip)[0]
-                        servers.append({
-                            'ip': conn.raddr.ip,
-                            'port': conn.raddr.port,
-                            'hostname': hostname
-                        })
-                    except:
-                        continue
-            
+            last = self.last_bytes.get(pid)
+
+            bytes_sent = bytes_recv = 0
+            sent_rate = recv_rate = 0.0
+            if last:
+                last_time, last_bytes = last
+                bytes_sent = current_bytes[1] - last_bytes[1]
+                bytes_recv = current_bytes[0] - last_bytes[0]
+                if now > last_time:
+                    sent_rate = bytes_sent / (now - last_time)
+                    recv_rate = bytes_recv / (now - last_time)
+
+            self.last_bytes[pid] = (now, current_bytes)
+
             return {
                 'bytes_sent': bytes_sent,
                 'bytes_recv': bytes_recv,
+                'bytes_sent_per_sec': sent_rate,
+                'bytes_recv_per_sec': recv_rate,
                 'active_connections': len(connections),
-                'servers': servers
+                'servers': [self._server(conn) for conn in connections if conn.raddr],
+                # Changes since the previous tick, so consumers need not diff the list
+                'opened': [self._server(conn) for conn in snapshot.opened if conn.pid == pid],
+                'closed': [self._server(conn) for conn in snapshot.closed if conn.pid == pid]
             }
         except:
-            return {} 
\ No newline at end of file
+            return {}
+
+    def get_network_metrics(self, pids: Iterable[int]) -> Dict[int, Dict]:
+        """Metrics for every pid from a single read of the connection table"""
+        pids = list(pids)
+        snapshot = self.connection_table.refresh(pids)
+        for pid in set(self.last_bytes) - set(pids):
+            del self.last_bytes[pid]
+        return {pid: self.get_process_network_metrics(pid, snapshot) for pid in pids}
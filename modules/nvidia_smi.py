@@ -0,0 +1,157 @@
+import logging
+import os
+import subprocess
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Union
+
+logger = logging.getLogger(__name__)
+
+# ``name`` goes last so that a comma inside a board name cannot shift the
+# numeric columns.
+QUERY_FIELDS = ("index", "utilization.gpu", "temperature.gpu",
+                "memory.used", "memory.total", "name")
+
+
+def _parse_float(value: str) -> float:
+    try:
+        return float(value)
+    except ValueError:
+        # "[N/A]", "[Not Supported]" and friends
+        return 0.0
+
+
+def parse_gpu_line(line: str) -> Optional[Dict]:
+    """Parse one ``--format=csv,noheader,nounits`` line into a metrics dict"""
+    parts = [part.strip() for part in line.split(',', len(QUERY_FIELDS) - 1)]
+    if len(parts) != len(QUERY_FIELDS):
+        return None
+    try:
+        index = int(parts[0])
+    except ValueError:
+        return None
+
+    util, temp, mem_used, mem_total = (_parse_float(p) for p in parts[1:5])
+    return {
+        'index': index,
+        'name': parts[5],
+        'utilization': util,
+        'temperature': temp,
+        'memory_used': mem_used,
+        'memory_total': mem_total,
+        'memory_percent': (mem_used / mem_total) * 100 if mem_total > 0 else 0
+    }
+
+
+class NvidiaSmiReader:
+    """Long-lived ``nvidia-smi -lms`` child whose CSV stream is parsed in the background.
+
+    ``executable`` is normally the path to nvidia-smi, but any command that
+    prints the same CSV lines works (a list is used as the command prefix),
+    which is how the reader is exercised without an NVIDIA driver.
+    """
+
+    def __init__(self, executable: Union[str, Sequence[str]], interval_ms: int = 500,
+                 initial_backoff: float = 1.0, max_backoff: float = 30.0):
+        self.command = [executable] if isinstance(executable, str) else list(executable)
+        self.interval_ms = interval_ms
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+
+        self._gpus: Dict[int, Dict] = {}
+        self._last_update = 0.0
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._process = None
+        self._thread = None
+        self.restarts = 0
+
+    def build_command(self) -> List[str]:
+        return self.command + [
+            f"--query-gpu={','.join(QUERY_FIELDS)}",
+            "--format=csv,noheader,nounits",
+            "-lms", str(self.interval_ms)
+        ]
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="NvidiaSmiReader", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0):
+        self._stop_event.set()
+        process = self._process
+        if process and process.poll() is None:
+            process.terminate()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def latest(self, max_age: Optional[float] = None) -> List[Dict]:
+        """Most recent metrics for every GPU, ordered by index.
+
+        Returns an empty list when nothing has been read yet or, if
+        ``max_age`` is given, when the newest line is older than that.
+        """
+        with self._lock:
+            if not self._gpus:
+                return []
+            if max_age is not None and time.monotonic() - self._last_update > max_age:
+                return []
+            return [dict(self._gpus[index]) for index in sorted(self._gpus)]
+
+    def _spawn(self):
+        kwargs = {}
+        if os.name == 'nt':
+            kwargs['creationflags'] = subprocess.CREATE_NO_WINDOW
+        return subprocess.Popen(self.build_command(), stdout=subprocess.PIPE,
+                                stderr=subprocess.DEVNULL, stdin=subprocess.DEVNULL,
+                                text=True, bufsize=1, **kwargs)
+
+    def _run(self):
+        backoff = self.initial_backoff
+        while not self._stop_event.is_set():
+            started = time.monotonic()
+            try:
+                self._process = self._spawn()
+                for line in self._process.stdout:
+                    if self._stop_event.is_set():
+                        break
+                    gpu = parse_gpu_line(line)
+                    if gpu is None:
+                        continue
+                    with self._lock:
+                        self._gpus[gpu['index']] = gpu
+                        self._last_update = time.monotonic()
+            except Exception as e:
+                logger.error(f"nvidia-smi reader error: {e}")
+            finally:
+                self._reap()
+
+            if self._stop_event.is_set():
+                break
+
+            # A child that ran for a while was healthy; start backing off again
+            # from scratch. One that dies right away backs off exponentially.
+            if time.monotonic() - started > self.max_backoff:
+                backoff = self.initial_backoff
+            logger.warning(f"nvidia-smi exited, restarting in {backoff:.1f}s")
+            self.restarts += 1
+            self._stop_event.wait(backoff)
+            backoff = min(backoff * 2, self.max_backoff)
+
+    def _reap(self):
+        process = self._process
+        if process is None:
+            return
+        if process.poll() is None:
+            process.terminate()
+        try:
+            process.wait(timeout=1.0)
+        except subprocess.TimeoutExpired:
+            process.kill()
+        if process.stdout:
+            process.stdout.close()
+        self._process = None
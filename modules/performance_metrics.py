@@ -1,163 +1,111 @@
-import psutil
-import wmi
-import pythoncom
 import logging
-import subprocess
 import os
-import re
+from .nvidia_smi import NvidiaSmiReader
+from .platform_backend import create_backend
+from .sensors import SensorRegistry
+from .storage_monitor import StorageMonitor
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.WARNING)
 
 class PerformanceMetrics:
-    def __init__(self):
-        pythoncom.CoInitialize()
-        self.wmi = wmi.WMI()
-        self.nvidia_smi_path = os.path.join(os.environ.get('SystemRoot', 'C:\\Windows'), 
-                                          'System32', 'nvidia-smi.exe')
-        self.has_nvidia = os.path.exists(self.nvidia_smi_path)
+    def __init__(self, backend=None):
+        # Built on the sampler thread, so COM setup and WMI never touch the GUI thread
+        self.backend = backend or create_backend()
+        self.backend.init_thread()
+        self.nvidia_smi_path = self.backend.nvidia_smi_path()
+        self.has_nvidia = bool(self.nvidia_smi_path) and os.path.exists(self.nvidia_smi_path)
+        # Probed on the first temperature read, which the scheduler defers past the first sample
+        self.sensors = SensorRegistry(self.backend.sensor_sources())
+        self.storage = StorageMonitor(self.backend)
+        self.gpu_reader = None
+        self.gpu_info = None
         if self.has_nvidia:
+            self.gpu_reader = NvidiaSmiReader(self.nvidia_smi_path, interval_ms=500)
+            self.gpu_reader.start()
             logger.info("NVIDIA GPU monitoring initialized successfully")
         else:
             logger.warning("NVIDIA SMI not found at expected path")
     
+    def close(self):
+        if self.gpu_reader:
+            self.gpu_reader.stop()
+        self.sensors.close()
+    
     def get_system_metrics(self):
+        """All system collectors at once; the sampler schedules them individually"""
         try:
-            cpu_percent = psutil.cpu_percent(interval=0)
-            memory = psutil.virtual_memory()
-            gpu_info = self._get_gpu_metrics()
-            cpu_temp = self._get_cpu_temperature()
-            
-            metrics = {
-                'cpu': {
-                    'utilization': cpu_percent,
-                    'temperature': cpu_temp if cpu_temp is not None else 0
-                },
-                'memory': {
-                    'total': memory.total,
-                    'available': memory.available,
-                    'percent': memory.percent,
-                    'used': memory.used
-                },
-                'gpu': gpu_info,
-                'storage': self._get_storage_metrics()
-            }
-            
-            logger.debug(f"System metrics: {metrics}")
-            return metrics
-            
+            return self.build_system_metrics(
+                cpu=self.get_cpu_utilization(),
+                memory=self.get_memory_metrics(),
+                gpu=self.get_gpu_metrics(),
+                temperature=self.get_cpu_temperature(),
+                storage=self.get_storage_metrics()
+            )
         except Exception as e:
             logger.error(f"Error getting system metrics: {e}")
             return None
 
-    def _get_cpu_temperature(self):
-        try:
-            try:
-                w = wmi.WMI(namespace="root/OpenHardwareMonitor")
-                temps = w.Sensor(SensorType='Temperature')
-                for temp in temps:
-                    if 'cpu' in temp.Name.lower() or 'package' in temp.Name.lower():
-                        return temp.Value
-            except Exception as e:
-                logger.debug(f"OpenHardwareMonitor method failed: {e}")
-
-            try:
-                w = wmi.WMI(namespace="root/WMI")
-                temps = w.MSAcpi_ThermalZoneTemperature()
-                if temps:
-                    return (temps[0].CurrentTemperature / 10.0) - 273.15
-            except Exception as e:
-                logger.debug(f"MSI Afterburner method failed: {e}")
-
-            try:
-                w = wmi.WMI(namespace="root/CIMV2")
-                temps = w.Win32_PerfFormattedData_Counters_ThermalZoneInformation()
-                if temps:
-                    return float(temps[0].Temperature)
-            except Exception as e:
-                logger.debug(f"Win32_PerfFormattedData method failed: {e}")
+    @staticmethod
+    def build_system_metrics(cpu, memory, gpu, temperature, storage):
+        """Assemble collector results in the shape the analyzers and GUI read"""
+        metrics = {
+            'cpu': {
+                'utilization': cpu if cpu is not None else 0,
+                'temperature': temperature if temperature is not None else 0
+            },
+            'memory': memory or {},
+            'gpu': gpu or {'utilization': 0, 'temperature': 0},
+            'storage': storage or {}
+        }
+        logger.debug(f"System metrics: {metrics}")
+        return metrics
 
-            try:
-                if hasattr(psutil, 'sensors_temperatures'):
-                    temps = psutil.sensors_temperatures()
-                    if temps:
-                        for source in ['coretemp', 'k10temp', 'zenpower', 'acpitz']:
-                            if source in temps:
-                                return temps[source][0].current
-            except Exception as e:
-                logger.debug(f"psutil sensors method failed: {e}")
+    def get_cpu_utilization(self):
+        return self.backend.cpu_percent()
 
-            try:
-                w = wmi.WMI(namespace="root/speedfan")
-                temps = w.Sensor(SensorType='Temperature')
-                if temps:
-                    return temps[0].Value
-            except Exception as e:
-                logger.debug(f"Speedfan method failed: {e}")
-
-            logger.warning("No CPU temperature sources available")
-            return None
+    def get_memory_metrics(self):
+        return self.backend.memory()
 
+    def get_cpu_temperature(self):
+        try:
+            return self.sensors.read_temperature()
         except Exception as e:
             logger.error(f"Error getting CPU temperature: {e}")
             return None
 
-    def _get_gpu_metrics(self):
-        if self.has_nvidia:
-            try:
-                cmd = [self.nvidia_smi_path, 
-                      "--query-gpu=utilization.gpu,temperature.gpu,memory.used,memory.total", 
-                      "--format=csv,noheader,nounits"]
-                
-                output = subprocess.check_output(cmd).decode('utf-8').strip()
-                util, temp, mem_used, mem_total = map(float, output.split(','))
-                
-                mem_percent = (mem_used / mem_total) * 100 if mem_total > 0 else 0
-                
-                metrics = {
-                    'utilization': util,
-                    'temperature': temp,
-                    'memory_used': mem_used,
-                    'memory_total': mem_total,
-                    'memory_percent': mem_percent
-                }
+    def get_gpu_metrics(self):
+        if self.gpu_reader:
+            # Values older than a few loop periods mean nvidia-smi is down and
+            # being restarted; fall back to the adapter info until it comes back.
+            gpus = self.gpu_reader.latest(max_age=5.0)
+            if gpus:
+                metrics = dict(gpus[0])
+                metrics['gpus'] = gpus
                 logger.debug(f"NVIDIA GPU metrics: {metrics}")
                 return metrics
-            except Exception as e:
-                logger.error(f"Error getting NVIDIA GPU metrics: {e}")
-                return self._get_wmi_gpu_metrics()
-        return self._get_wmi_gpu_metrics()
+        if self.gpu_info is None:
+            # Adapter info comes online with the gpu_info collector
+            return {'utilization': 0, 'temperature': 0}
+        return dict(self.gpu_info)
 
-    def _get_wmi_gpu_metrics(self):
+    def refresh_gpu_info(self):
+        """Re-query the adapter (WMI on Windows); slow, and it rarely changes"""
+        self.gpu_info = self._get_adapter_metrics()
+        return self.gpu_info
+
+    def _get_adapter_metrics(self):
         try:
-            gpu = self.wmi.Win32_VideoController()[0]
-            metrics = {
-                'name': gpu.Name,
-                'memory': gpu.AdapterRAM if hasattr(gpu, 'AdapterRAM') else None,
-                'driver_version': gpu.DriverVersion,
-                'utilization': 0,
-                'temperature': 0
-            }
-            logger.debug(f"WMI GPU metrics: {metrics}")
+            metrics = {**(self.backend.gpu_info() or {}), 'utilization': 0, 'temperature': 0}
+            logger.debug(f"GPU adapter metrics: {metrics}")
             return metrics
         except Exception as e:
-            logger.error(f"WMI GPU error: {e}")
+            logger.error(f"GPU adapter error: {e}")
             return {
                 'utilization': 0,
                 'temperature': 0
             }
             
-    def _get_storage_metrics(self):
-        disks = {}
-        for partition in psutil.disk_partitions():
-            try:
-                usage = psutil.disk_usage(partition.mountpoint)
-                disks[partition.device] = {
-                    'total': usage.total,
-                    'used': usage.used,
-                    'free': usage.free,
-                    'percent': usage.percent
-                }
-            except:
-                continue
-        return disks
\ No newline at end of file
+    def get_storage_metrics(self):
+        """Per-disk throughput, IOPS and latency, plus capacity per mount"""
+        return self.storage.read()
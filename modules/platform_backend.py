@@ -0,0 +1,219 @@
+import logging
+import os
+import socket
+import sys
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import psutil
+
+logger = logging.getLogger(__name__)
+
+
+class ProcessStat(NamedTuple):
+    """One process as read in a single pass.
+
+    ``create_time`` is seconds since the epoch, ``cpu_time`` user + system
+    seconds and ``rss`` bytes (None when the OS would not say).
+    """
+    pid: int
+    create_time: float
+    cpu_time: float
+    rss: Optional[int]
+    threads: int
+
+
+class DiskCounters(NamedTuple):
+    """Cumulative I/O of one disk since boot.
+
+    Times are milliseconds spent on requests; ``busy_time`` (time with any
+    request in flight) is None where the OS does not report it.
+    """
+    read_count: int
+    write_count: int
+    read_bytes: int
+    write_bytes: int
+    read_time: int
+    write_time: int
+    busy_time: Optional[int]
+
+
+class Connection(NamedTuple):
+    """One TCP or UDP socket; addresses are (ip, port), ``raddr`` None when not connected"""
+    pid: Optional[int]
+    type: str
+    laddr: Tuple[str, int]
+    raddr: Optional[Tuple[str, int]]
+    status: str
+
+
+_SOCKET_TYPES = {socket.SOCK_STREAM: 'tcp', socket.SOCK_DGRAM: 'udp'}
+
+
+def _connection(pid: Optional[int], conn) -> Connection:
+    return Connection(pid, _SOCKET_TYPES.get(conn.type, 'tcp'), tuple(conn.laddr) if conn.laddr else ('', 0),
+                      tuple(conn.raddr) if conn.raddr else None, conn.status)
+
+
+class PlatformBackend:
+    """OS-specific reads behind ``ProcessMonitor`` and ``PerformanceMetrics``.
+
+    This base class does everything through psutil and works anywhere psutil
+    does; subclasses replace the hot paths and add what only their OS has
+    (window handles, WMI). Methods are called from the sampler thread.
+    """
+    name = "psutil"
+
+    def __init__(self):
+        self._processes: Dict[int, psutil.Process] = {}
+
+    def init_thread(self):
+        """Per-thread setup, run on the sampler thread before any other call"""
+
+    def close(self):
+        self._processes.clear()
+
+    def find_windows(self, pids: Iterable[int]) -> Dict[int, int]:
+        """Map pids to a visible top-level window handle, where the OS has them"""
+        return {}
+
+    def _process(self, pid: int) -> psutil.Process:
+        process = self._processes.get(pid)
+        if process is None or not process.is_running():
+            process = psutil.Process(pid)
+            self._processes[pid] = process
+        return process
+
+    def read_processes(self, pids: Iterable[int]) -> Dict[int, ProcessStat]:
+        """Stats for every pid that could be read; gone or inaccessible pids are left out"""
+        stats = {}
+        for pid in pids:
+            try:
+                process = self._process(pid)
+                with process.oneshot():
+                    times = process.cpu_times()
+                    try:
+                        rss = process.memory_info().rss
+                    except psutil.AccessDenied:
+                        rss = None
+                    stats[pid] = ProcessStat(pid, process.create_time(), times.user + times.system,
+                                             rss, process.num_threads())
+            except psutil.NoSuchProcess:
+                self._processes.pop(pid, None)
+            except psutil.Error:
+                continue
+        return stats
+
+    def create_times(self, pids: Iterable[int]) -> Dict[int, float]:
+        """Start time of every pid that still exists, read fresh on each call"""
+        times = {}
+        for pid in pids:
+            try:
+                times[pid] = psutil.Process(pid).create_time()
+            except psutil.Error:
+                continue
+        return times
+
+    def read_threads(self, pid: int) -> Dict[int, float]:
+        """CPU seconds per thread id of ``pid``; empty if it cannot be read"""
+        try:
+            return {thread.id: thread.user_time + thread.system_time
+                    for thread in self._process(pid).threads()}
+        except psutil.NoSuchProcess:
+            self._processes.pop(pid, None)
+            return {}
+        except psutil.Error:
+            return {}
+
+    def forget(self, pid: int):
+        self._processes.pop(pid, None)
+
+    def cpu_percent(self) -> float:
+        """System-wide CPU utilization since the previous call"""
+        return psutil.cpu_percent(interval=0)
+
+    def memory(self) -> Dict:
+        memory = psutil.virtual_memory()
+        return {
+            'total': memory.total,
+            'available': memory.available,
+            'percent': memory.percent,
+            'used': memory.used
+        }
+
+    def total_memory(self) -> int:
+        return psutil.virtual_memory().total
+
+    def disk_partitions(self) -> List[Tuple[str, str]]:
+        """(device, mountpoint) of every mounted local filesystem"""
+        return [(partition.device, partition.mountpoint) for partition in psutil.disk_partitions()]
+
+    def mounts_changed(self) -> Optional[bool]:
+        """Whether filesystems were mounted or unmounted since the previous call.
+
+        None when the OS offers no cheap way to tell; callers then re-read
+        the partitions on a timer.
+        """
+        return None
+
+    def disk_io_counters(self) -> Dict[str, DiskCounters]:
+        counters = psutil.disk_io_counters(perdisk=True, nowrap=True) or {}
+        return {
+            name: DiskCounters(c.read_count, c.write_count, c.read_bytes, c.write_bytes,
+                               c.read_time, c.write_time, getattr(c, 'busy_time', None))
+            for name, c in counters.items()
+        }
+
+    def net_connections(self, pids: Optional[Iterable[int]] = None) -> List[Connection]:
+        """Every inet socket on the system in one read of the OS table.
+
+        Sockets of the processes in ``pids`` always carry their pid; a
+        backend may leave the pid of anybody else's as None.
+        """
+        try:
+            return [_connection(c.pid, c) for c in psutil.net_connections(kind='inet')]
+        except psutil.AccessDenied:
+            pass
+        # macOS only lists other users' sockets to root; ask each process instead
+        connections = []
+        for pid in pids or ():
+            try:
+                process = self._process(pid)
+                read = getattr(process, 'net_connections', None) or process.connections
+                connections.extend(_connection(pid, c) for c in read(kind='inet'))
+            except psutil.Error:
+                continue
+        return connections
+
+    def nvidia_smi_path(self) -> Optional[str]:
+        return None
+
+    def gpu_info(self) -> Optional[Dict]:
+        """Static adapter details (name, memory, driver); slow on some platforms"""
+        return None
+
+    def sensor_sources(self) -> List:
+        from .sensors import PsutilSensorsSource
+        return [PsutilSensorsSource()]
+
+
+def detect_backend() -> str:
+    if sys.platform == 'win32':
+        return 'windows'
+    if sys.platform.startswith('linux') and os.path.isdir('/proc/self') and hasattr(os, 'pread'):
+        return 'linux'
+    return 'psutil'
+
+
+def create_backend(name: Optional[str] = None) -> PlatformBackend:
+    """Build the backend named by the ``platform_backend`` config entry"""
+    if not name or name == 'auto':
+        name = detect_backend()
+    if name == 'windows':
+        from .windows_backend import WindowsBackend
+        return WindowsBackend()
+    if name == 'linux':
+        from .linux_backend import LinuxBackend
+        return LinuxBackend()
+    if name != 'psutil':
+        logger.warning(f"Unknown platform backend: {name}, using psutil")
+    return PlatformBackend()
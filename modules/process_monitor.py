@@ -1,23 +1,23 @@
-import psutil
-import wmi
 import logging
 import os
 import time
 from collections import deque
-import win32gui
-import win32process
-import win32con
-import pygame
-import threading
+from .process_table import ProcessTable
+from .cpu_accounting import ThreadCpuTracker, TreeCpuTracker
+from .platform_backend import create_backend
+from .game_library import GameClassifier, GameLibraryIndex
 
 logging.basicConfig(level=logging.WARNING)
 logger = logging.getLogger(__name__)
 
 class ProcessMonitor:
-    def __init__(self):
-        self.wmi = wmi.WMI()
+    def __init__(self, backend=None):
         self.fps_data = {}
-        pygame.init()
+        self._sampled = set()
+        # Window lookup and per-process reads are OS specific
+        self.backend = backend or create_backend()
+        self.cpu_tracker = TreeCpuTracker()
+        self.thread_tracker = ThreadCpuTracker()
         
         self.excluded_processes = {
             'svchost.exe', 'csrss.exe', 'winlogon.exe', 'services.exe',
@@ -33,7 +33,13 @@ class ProcessMonitor:
             'python.exe', 'pythonw.exe', 'wsl.exe', 'bash.exe',
             'nvidia-smi.exe', 'discord.exe', 'slack.exe', 'spotify.exe',
             'mspaint.exe', 'calc.exe', 'wordpad.exe', 'winrar.exe',
-            '7zFM.exe', 'vlc.exe', 'zoom.exe', 'skype.exe'
+            '7zFM.exe', 'vlc.exe', 'zoom.exe', 'skype.exe',
+            # Helpers shipped inside game install folders
+            'UnityCrashHandler64.exe', 'UnityCrashHandler32.exe', 'CrashReportClient.exe',
+            'EasyAntiCheat.exe', 'EasyAntiCheat_EOS.exe', 'EasyAntiCheat_Setup.exe',
+            'EasyAntiCheat_EOS_Setup.exe', 'BEService.exe', 'BEService_x64.exe',
+            'vcredist_x64.exe', 'vcredist_x86.exe', 'vc_redist.x64.exe', 'vc_redist.x86.exe',
+            'DXSETUP.exe', 'UE4PrereqSetup_x64.exe', 'UEPrereqSetup_x64.exe'
         }
         
         self.game_processes = {
@@ -54,76 +60,41 @@ class ProcessMonitor:
             'ShadowPlay.exe', 'MSIAfterburner.exe'
         }
         
-        self.running = True
-        self.fps_thread = threading.Thread(target=self._fps_monitor_thread, daemon=True)
-        self.fps_thread.start()
+        self.game_paths = [
+            'steam', 'games', 'epic games',
+            'riot games', 'origin games',
+            'program files\\steam',
+            'program files (x86)\\steam'
+        ]
         
-        for proc in psutil.process_iter(['pid', 'name']):
-            try:
-                proc.cpu_percent()
-            except:
-                continue
+        self.classifier = GameClassifier(
+            self.game_processes, self.excluded_processes, self.game_paths,
+            library=GameLibraryIndex()
+        )
+        
+        # Shared with other consumers; classification runs once per new process
+        self.process_table = ProcessTable(classifier=self._is_game, backend=self.backend)
+
+    def _is_game(self, entry):
+        """GameInfo for game processes, None otherwise"""
+        return self.classifier.classify(entry.name, entry.exe)
 
     def get_running_games(self):
-        games = []
-        for process in psutil.process_iter(['pid', 'name', 'exe']):
-            try:
-                info = {
-                    'pid': process.info['pid'],
-                    'name': process.info['name'],
-                    'path': process.info['exe']
-                }
-                
-                if info['path'] and info['path'].endswith('.exe'):
-                    name = info['name'].lower()
-                    path = info['path'].lower()
-                    
-                    if info['name'] in self.game_processes:
-                        games.append(info)
-                        continue
-                        
-                    if info['name'] in self.excluded_processes:
-                        continue
-                        
-                    game_paths = [
-                        'steam', 'games', 'epic games',
-                        'riot games', 'origin games',
-                        'program files\\steam',
-                        'program files (x86)\\steam'
-                    ]
-                    
-                    if any(game_path in path for game_path in game_paths):
-                        games.append(info)
-                        
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                continue
-                
+        # The game list is slow-cadence, so every known pid is checked for reuse here
+        self.process_table.refresh(full=True)
+        
+        games = [
+            {
+                'pid': entry.pid, 'name': entry.name, 'path': entry.exe,
+                'title': entry.classification.title, 'app_id': entry.classification.app_id
+            }
+            for entry in self.process_table.entries()
+            if entry.classification
+        ]
         return sorted(games, key=lambda x: x['name'].lower())
 
-    def _fps_monitor_thread(self):
-        clock = pygame.time.Clock()
-        while self.running:
-            for pid in list(self.fps_data.keys()):
-                try:
-                    data = self.fps_data[pid]
-                    current_time = time.time()
-                    data['frame_count'] += 1
-                    elapsed_time = current_time - data['last_time']
-                    
-                    if elapsed_time >= 1.0:
-                        data['fps'] = int(data['frame_count'] / elapsed_time)
-                        data['frame_count'] = 0
-                        data['last_time'] = current_time
-                        
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    self.fps_data.pop(pid, None)
-                    
-            clock.tick(240)
-
-    def _calculate_fps(self, process):
+    def _calculate_fps(self, pid, hwnd=None):
         try:
-            pid = process.pid
-            
             if pid not in self.fps_data:
                 self.fps_data[pid] = {
                     'last_time': time.time(),
@@ -135,36 +106,11 @@ class ProcessMonitor:
                     'max_frame_times': 60
                 }
             
-            def callback(hwnd, extra):
-                try:
-                    if win32gui.IsWindowVisible(hwnd):
-                        _, p = win32process.GetWindowThreadProcessId(hwnd)
-                        if p == extra['pid']:
-                            style = win32gui.GetWindowLong(hwnd, win32con.GWL_STYLE)
-                            if style & win32con.WS_VISIBLE:
-                                rect = win32gui.GetClientRect(hwnd)
-                                if rect[2] > 0 and rect[3] > 0:
-                                    extra['hwnd'] = hwnd
-                                    return False
-                    return True
-                except Exception:
-                    return True
-            
-            context = {
-                'pid': pid,
-                'hwnd': None
-            }
-            
-            try:
-                win32gui.EnumWindows(callback, context)
-            except Exception as e:
-                logger.debug(f"EnumWindows warning (non-critical): {e}")
-            
             current_time = time.time()
             data = self.fps_data[pid]
             
-            if context['hwnd'] or data['hwnd']:
-                data['hwnd'] = context['hwnd'] or data['hwnd']
+            if hwnd or data['hwnd']:
+                data['hwnd'] = hwnd or data['hwnd']
                 
                 frame_time = current_time - data['last_frame_time']
                 if frame_time > 0:
@@ -191,34 +137,68 @@ class ProcessMonitor:
             logger.error(f"Error calculating FPS: {e}", exc_info=True)
             return 0
 
+    def forget(self, pid):
+        """Drop all cached state for a process"""
+        self._sampled.discard(pid)
+        self.fps_data.pop(pid, None)
+        self.cpu_tracker.forget(pid)
+        self.thread_tracker.forget(pid)
+        self.backend.forget(pid)
+
+    def get_many_process_metrics(self, pids):
+        """Sample several processes in one pass; state of unlisted pids is evicted"""
+        pids = list(dict.fromkeys(pids))
+        # Keeps parent links current so children come from the table's cached Process objects;
+        # only the sampled trees are checked for pid reuse on every tick
+        self.process_table.refresh(verify=self._trees(pids))
+        windows = self.backend.find_windows(pids)
+        total_memory = self.backend.total_memory()
+        
+        results = {pid: self._sample_process(pid, windows.get(pid), total_memory) for pid in pids}
+        
+        for pid in self._sampled | set(self.fps_data):
+            if pid not in results:
+                self.forget(pid)
+        return results
+
+    def _trees(self, pids):
+        """The pids and their known descendants"""
+        tree = set(pids)
+        for pid in pids:
+            tree.update(entry.pid for entry in self.process_table.children_of(pid))
+        return tree
+
     def get_process_metrics(self, pid):
+        self.process_table.refresh(verify=self._trees([pid]))
+        windows = self.backend.find_windows([pid])
+        return self._sample_process(pid, windows.get(pid), self.backend.total_memory())
+
+    def _sample_process(self, pid, hwnd, total_memory):
         try:
-            process = psutil.Process(pid)
-            
-            try:
-                cpu_percent = process.cpu_percent(interval=0.1)
-            except:
-                cpu_percent = process.cpu_percent()
+            # The whole tree in one backend pass
+            tree = [pid] + [entry.pid for entry in self.process_table.children_of(pid)]
+            stats = self.backend.read_processes(tree)
+            root = stats.get(pid)
+            if root is None:
+                logger.warning(f"Process {pid} exited or cannot be read")
+                self.forget(pid)
+                return None
+            if pid not in self._sampled:
+                self.cpu_tracker.forget(pid)
+                self.thread_tracker.forget(pid)
+                self._sampled.add(pid)
             
-            try:
-                memory_percent = process.memory_percent()
-            except:
-                memory_percent = 0
+            cpu_percent, cpu_percent_cores = self.cpu_tracker.update(pid, stats.values())
+            busiest_thread = self.thread_tracker.update(pid, self.backend.read_threads(pid))
+            memory_percent = root.rss / total_memory * 100 if root.rss is not None else 0
             
-            fps = self._calculate_fps(process)
-            
-            try:
-                children = process.children(recursive=True)
-                for child in children:
-                    try:
-                        cpu_percent += child.cpu_percent(interval=0.1)
-                    except:
-                        continue
-            except:
-                pass
+            fps = self._calculate_fps(pid, hwnd)
             
             metrics = {
-                'cpu_percent': max(0, min(100, cpu_percent)),
+                'cpu_percent': cpu_percent,
+                'cpu_percent_cores': cpu_percent_cores,
+                'busiest_thread_percent': busiest_thread,
+                'threads': root.threads,
                 'memory_percent': max(0, min(100, memory_percent)),
                 'fps': fps
             }
@@ -226,15 +206,6 @@ class ProcessMonitor:
             logger.debug(f"Process metrics for PID {pid}: {metrics}")
             return metrics
             
-        except (psutil.NoSuchProcess, psutil.AccessDenied) as e:
-            logger.warning(f"Could not get process metrics for PID {pid}: {e}")
-            return None
         except Exception as e:
             logger.error(f"Unexpected error getting process metrics for PID {pid}: {e}")
             return None
-
-    def __del__(self):
-        self.running = False
-        if hasattr(self, 'fps_thread'):
-            self.fps_thread.join(timeout=1.0)
-        pygame.quit()
\ No newline at end of file
@@ -0,0 +1,146 @@
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import psutil
+
+from .platform_backend import PlatformBackend
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ProcessEntry:
+    pid: int
+    create_time: float
+    name: str
+    exe: Optional[str]
+    ppid: Optional[int]
+    process: psutil.Process
+    # Whatever the table's classifier returned for this process
+    classification: object = None
+
+    @property
+    def key(self) -> Tuple[int, float]:
+        return (self.pid, self.create_time)
+
+
+class ProcessTable:
+    """Process list that is kept up to date by diffing against the previous scan.
+
+    A scan asks the OS for the current pid set and reads the create time of
+    new pids only. Name, exe, parent and the classifier result are looked up
+    once for each new process and kept until it exits, so the per-scan cost
+    follows churn and not the process count.
+
+    Entries are keyed by (pid, create_time). A pid that was reused between
+    two scans looks unchanged in the pid set, so known pids are re-checked
+    only where it matters: those passed in ``verify`` on every scan, and all
+    of them on a ``full`` scan. A changed create time is reported as the old
+    entry removed and a new one added.
+    """
+
+    def __init__(self, classifier: Optional[Callable[[ProcessEntry], object]] = None,
+                 backend: Optional[PlatformBackend] = None):
+        self.classifier = classifier
+        self.backend = backend or PlatformBackend()
+        self._entries: Dict[Tuple[int, float], ProcessEntry] = {}
+        self._by_pid: Dict[int, ProcessEntry] = {}
+        self._lock = threading.RLock()
+
+    def refresh(self, verify: Iterable[int] = (),
+                full: bool = False) -> Tuple[List[ProcessEntry], List[ProcessEntry]]:
+        """Rescan and return (added, removed) entries.
+
+        Known pids in ``verify``, or every known pid when ``full``, get their
+        create time compared to catch pid reuse.
+        """
+        pids = set(psutil.pids())
+        with self._lock:
+            known = self._by_pid.keys() & pids
+            check = pids if full else (pids - known) | (known & set(verify))
+        create_times = self.backend.create_times(check)
+
+        added, removed = [], []
+        with self._lock:
+            for pid, entry in list(self._by_pid.items()):
+                if pid not in pids or (pid in check and create_times.get(pid) != entry.create_time):
+                    self._remove(entry)
+                    removed.append(entry)
+            new_keys = [(pid, create_time) for pid, create_time in create_times.items()
+                        if pid not in self._by_pid]
+
+        # Lookups for new processes run unlocked so readers are not held up
+        # behind a large first scan
+        for pid, create_time in new_keys:
+            entry = self._create_entry(pid, create_time)
+            if entry is not None:
+                added.append(entry)
+        with self._lock:
+            for entry in added:
+                self._entries[entry.key] = entry
+                self._by_pid[entry.pid] = entry
+        return added, removed
+
+    def _remove(self, entry: ProcessEntry):
+        self._entries.pop(entry.key, None)
+        if self._by_pid.get(entry.pid) is entry:
+            del self._by_pid[entry.pid]
+
+    def _create_entry(self, pid: int, create_time: float) -> Optional[ProcessEntry]:
+        try:
+            process = psutil.Process(pid)
+            with process.oneshot():
+                name = process.name()
+                try:
+                    ppid = process.ppid()
+                except psutil.AccessDenied:
+                    ppid = None
+            try:
+                exe = process.exe() or None
+            except (psutil.AccessDenied, psutil.ZombieProcess, OSError):
+                exe = None
+        except psutil.Error:
+            return None
+
+        entry = ProcessEntry(pid, create_time, name, exe, ppid, process)
+        if self.classifier:
+            try:
+                entry.classification = self.classifier(entry)
+            except Exception as e:
+                logger.debug(f"Classifier failed for {name} ({pid}): {e}")
+        return entry
+
+    def get(self, pid: int) -> Optional[ProcessEntry]:
+        with self._lock:
+            return self._by_pid.get(pid)
+
+    def entries(self) -> List[ProcessEntry]:
+        with self._lock:
+            return list(self._entries.values())
+
+    def children_of(self, pid: int) -> List[ProcessEntry]:
+        """All descendants of ``pid`` known to the table, from parent links seen at creation"""
+        with self._lock:
+            by_parent: Dict[int, List[ProcessEntry]] = {}
+            for entry in self._entries.values():
+                if entry.ppid is not None and entry.ppid != entry.pid:
+                    by_parent.setdefault(entry.ppid, []).append(entry)
+            root = self._by_pid.get(pid)
+            descendants = []
+            seen = {pid}
+            stack = [pid]
+            while stack:
+                for child in by_parent.get(stack.pop(), ()):
+                    # A child cannot predate its parent; older ones hold a reused ppid
+                    if child.pid in seen or (root is not None and child.create_time < root.create_time):
+                        continue
+                    seen.add(child.pid)
+                    descendants.append(child)
+                    stack.append(child.pid)
+            return descendants
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
@@ -0,0 +1,446 @@
+import json
+import logging
+import mmap
+import struct
+import threading
+import time
+import zlib
+import numpy as np
+from typing import Callable, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Session file layout:
+#   file header   MAGIC, u32 length, JSON metadata (table schemas)
+#   chunks        CHUNK_HEADER followed by a zlib payload
+# Table chunks hold ``rows`` records stored column by column; each column is
+# byte-shuffled (all first bytes, then all second bytes, ...) before
+# compression, which lets zlib find the slowly changing high bytes.
+# Event chunks hold a small JSON document (e.g. a target change).
+MAGIC = b"PMSESS01"
+CHUNK_HEADER = struct.Struct("<4sBIII")  # tag, table id, rows, raw size, compressed size
+CHUNK_TAG = b"CHNK"
+EVENT_TABLE_ID = 255
+
+TICK_DTYPE = np.dtype([
+    ('timestamp', '<f8'),
+    ('pid', '<i4'),
+    ('cpu_percent', '<f4'),
+    ('busiest_thread_percent', '<f4'),
+    ('memory_percent', '<f4'),
+    ('fps', '<f4'),
+    ('system_cpu', '<f4'),
+    ('cpu_temperature', '<f4'),
+    ('memory_used_percent', '<f4'),
+    ('gpu_utilization', '<f4'),
+    ('gpu_temperature', '<f4'),
+    ('gpu_memory_percent', '<f4'),
+    ('bytes_sent', '<i8'),
+    ('bytes_recv', '<i8'),
+    ('bytes_sent_per_sec', '<f4'),
+    ('bytes_recv_per_sec', '<f4'),
+    ('connections', '<i4'),
+    ('avg_frame_time', '<f4'),
+    ('low_1', '<f4'),
+    ('low_01', '<f4'),
+    ('frame_time_variance', '<f4'),
+    ('stutters', '<i4'),
+    ('bottleneck', 'u1'),
+    ('bottleneck_severity', '<f4'),
+])
+
+# One row per presented frame; ``tick`` is the row in the ticks table that
+# delivered it.
+FRAME_DTYPE = np.dtype([
+    ('tick', '<u4'),
+    ('frame_time', '<f4'),
+])
+
+TABLES = {0: ('ticks', TICK_DTYPE), 1: ('frames', FRAME_DTYPE)}
+TABLE_IDS = {name: table_id for table_id, (name, _) in TABLES.items()}
+
+BOTTLENECK_CODES = {None: 0, 'CPU': 1, 'GPU': 2, 'RAM': 3}
+BOTTLENECK_NAMES = {code: name for name, code in BOTTLENECK_CODES.items()}
+
+
+def _encode_columns(rows: np.ndarray) -> bytes:
+    parts = []
+    for name in rows.dtype.names:
+        column = np.ascontiguousarray(rows[name])
+        itemsize = column.dtype.itemsize
+        parts.append(column.view(np.uint8).reshape(-1, itemsize).T.tobytes())
+    return b"".join(parts)
+
+
+def _decode_columns(payload: bytes, dtype: np.dtype, rows: int) -> Dict[str, np.ndarray]:
+    columns = {}
+    offset = 0
+    for name in dtype.names:
+        field = dtype.fields[name][0]
+        size = rows * field.itemsize
+        planes = np.frombuffer(payload, dtype=np.uint8, count=size, offset=offset)
+        columns[name] = planes.reshape(field.itemsize, rows).T.copy().view(field).ravel()
+        offset += size
+    return columns
+
+
+def tick_row(snapshot) -> tuple:
+    """Flatten a MetricsSnapshot into a TICK_DTYPE record"""
+    process = snapshot.process or {}
+    system = snapshot.system or {}
+    cpu = system.get('cpu', {})
+    memory = system.get('memory', {})
+    gpu = system.get('gpu', {})
+    network = snapshot.network or {}
+    frame = snapshot.frame or {}
+    bottleneck = snapshot.bottleneck
+    component = bottleneck.component if bottleneck and bottleneck.exists else None
+    return (
+        snapshot.timestamp,
+        snapshot.pid or 0,
+        process.get('cpu_percent', 0),
+        process.get('busiest_thread_percent', 0),
+        process.get('memory_percent', 0),
+        process.get('fps', 0),
+        cpu.get('utilization', 0),
+        cpu.get('temperature', 0),
+        memory.get('percent', 0),
+        gpu.get('utilization', 0),
+        gpu.get('temperature', 0),
+        gpu.get('memory_percent', 0),
+        network.get('bytes_sent', 0),
+        network.get('bytes_recv', 0),
+        network.get('bytes_sent_per_sec', 0),
+        network.get('bytes_recv_per_sec', 0),
+        network.get('active_connections', 0),
+        frame.get('avg_frame_time', 0),
+        frame.get('1%_low', 0),
+        frame.get('0.1%_low', 0),
+        frame.get('frame_time_variance', 0),
+        frame.get('stutters_detected', 0),
+        BOTTLENECK_CODES.get(component, 0),
+        bottleneck.severity if bottleneck else 0
+    )
+
+
+class SessionWriter:
+    """Append-only writer for the columnar session format"""
+
+    def __init__(self, path: str, metadata: Optional[Dict] = None,
+                 chunk_rows: int = 4096, flush_interval: float = 30.0):
+        self.path = path
+        self.chunk_rows = chunk_rows
+        self.flush_interval = flush_interval
+        self._buffers = {table_id: np.zeros(chunk_rows, dtype=dtype)
+                         for table_id, (_, dtype) in TABLES.items()}
+        self._fill = {table_id: 0 for table_id in TABLES}
+        self.rows_written = {table_id: 0 for table_id in TABLES}
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+        header = {
+            'version': 1,
+            'created': time.time(),
+            'tables': {name: dtype.descr for name, dtype in TABLES.values()}
+        }
+        header.update(metadata or {})
+        encoded = json.dumps(header).encode('utf-8')
+        self._file = open(path, 'wb')
+        self._file.write(MAGIC + struct.pack("<I", len(encoded)) + encoded)
+
+    def append(self, table: str, rows):
+        """Append one record (a tuple) or an array of records to a table"""
+        table_id = TABLE_IDS[table]
+        rows = np.asarray(rows, dtype=TABLES[table_id][1]).reshape(-1)
+        with self._lock:
+            start = 0
+            while start < rows.size:
+                fill = self._fill[table_id]
+                take = min(self.chunk_rows - fill, rows.size - start)
+                self._buffers[table_id][fill:fill + take] = rows[start:start + take]
+                self._fill[table_id] += take
+                start += take
+                if self._fill[table_id] == self.chunk_rows:
+                    self._flush_table(table_id)
+            if time.monotonic() - self._last_flush >= self.flush_interval:
+                self._flush_all()
+
+    def append_event(self, event: Dict):
+        payload = json.dumps(event).encode('utf-8')
+        with self._lock:
+            self._write_chunk(EVENT_TABLE_ID, 1, payload)
+
+    def _write_chunk(self, table_id: int, rows: int, raw: bytes):
+        compressed = zlib.compress(raw, 6)
+        self._file.write(CHUNK_HEADER.pack(CHUNK_TAG, table_id, rows, len(raw), len(compressed)))
+        self._file.write(compressed)
+
+    def _flush_table(self, table_id: int):
+        fill = self._fill[table_id]
+        if fill == 0:
+            return
+        self._write_chunk(table_id, fill, _encode_columns(self._buffers[table_id][:fill]))
+        self.rows_written[table_id] += fill
+        self._fill[table_id] = 0
+
+    def _flush_all(self):
+        for table_id in TABLES:
+            self._flush_table(table_id)
+        self._file.flush()
+        self._last_flush = time.monotonic()
+
+    def row_count(self, table: str) -> int:
+        table_id = TABLE_IDS[table]
+        return self.rows_written[table_id] + self._fill[table_id]
+
+    def close(self):
+        with self._lock:
+            if self._file.closed:
+                return
+            self._flush_all()
+            self._file.close()
+
+
+class SessionReader:
+    """Memory-mapped reader; only chunk headers are touched when opening"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a session recording")
+        (header_size,) = struct.unpack_from("<I", self._map, len(MAGIC))
+        start = len(MAGIC) + 4
+        self.metadata = json.loads(self._map[start:start + header_size].decode('utf-8'))
+        # Columns are decoded with the layout the file was written with
+        stored = self.metadata.get('tables', {})
+        self._dtypes = {table_id: np.dtype([tuple(field) for field in stored[name]]) if name in stored else dtype
+                        for table_id, (name, dtype) in TABLES.items()}
+        self._chunks = {table_id: [] for table_id in TABLES}
+        self._events = []
+        self._index(start + header_size)
+        self._cache = {}
+
+    def _index(self, offset: int):
+        end = len(self._map)
+        while offset + CHUNK_HEADER.size <= end:
+            tag, table_id, rows, raw_size, size = CHUNK_HEADER.unpack_from(self._map, offset)
+            payload = offset + CHUNK_HEADER.size
+            if tag != CHUNK_TAG or payload + size > end:
+                # Truncated tail of a session that was still being written
+                break
+            if table_id == EVENT_TABLE_ID:
+                self._events.append((payload, size))
+            elif table_id in self._chunks:
+                self._chunks[table_id].append((payload, size, rows))
+            offset = payload + size
+
+    def __len__(self):
+        return self.row_count('ticks')
+
+    def row_count(self, table: str) -> int:
+        return sum(rows for _, _, rows in self._chunks[TABLE_IDS[table]])
+
+    def events(self) -> List[Dict]:
+        return [json.loads(zlib.decompress(self._map[offset:offset + size]))
+                for offset, size in self._events]
+
+    def table(self, table: str) -> Dict[str, np.ndarray]:
+        """All columns of a table, decompressed once and cached.
+
+        Columns the file predates read as zeros.
+        """
+        if table in self._cache:
+            return self._cache[table]
+        table_id = TABLE_IDS[table]
+        stored = self._dtypes[table_id]
+        pieces = [_decode_columns(zlib.decompress(self._map[offset:offset + size]), stored, rows)
+                  for offset, size, rows in self._chunks[table_id]]
+        rows = sum(rows for _, _, rows in self._chunks[table_id])
+        dtype = TABLES[table_id][1]
+        columns = {}
+        for name in dtype.names:
+            if name in stored.names and pieces:
+                columns[name] = np.concatenate([p[name] for p in pieces])
+            else:
+                columns[name] = np.zeros(rows if pieces else 0, dtype=dtype.fields[name][0])
+        self._cache[table] = columns
+        return columns
+
+    def column(self, table: str, name: str) -> np.ndarray:
+        return self.table(table)[name]
+
+    def close(self):
+        self._cache.clear()
+        self._map.close()
+        self._file.close()
+
+
+class SessionRecorder:
+    """Sampler listener that writes every snapshot into a session file"""
+
+    def __init__(self, path: str, **kwargs):
+        self.writer = SessionWriter(path, **kwargs)
+        self._target = None
+
+    def record(self, snapshot):
+        if snapshot.pid != self._target:
+            self._target = snapshot.pid
+            self.writer.append_event({'type': 'target', 'timestamp': snapshot.timestamp,
+                                      'pid': snapshot.pid, 'name': snapshot.process_name})
+        tick = self.writer.row_count('ticks')
+        self.writer.append('ticks', tick_row(snapshot))
+        frame_times = snapshot.frame_times
+        if frame_times is not None and len(frame_times):
+            frames = np.empty(len(frame_times), dtype=FRAME_DTYPE)
+            frames['tick'] = tick
+            frames['frame_time'] = frame_times
+            self.writer.append('frames', frames)
+
+    def close(self):
+        self.writer.close()
+
+
+class SessionPlayer:
+    """Plays a recording back through the analyzers, standing in for MetricsSampler.
+
+    ``speed`` scales the recorded pacing (2.0 plays twice as fast); 0 replays
+    as fast as the listeners can take it.
+    """
+
+    def __init__(self, path: str, speed: float = 1.0):
+        # Deferred so that reading sessions does not pull in the collectors
+        from .sampler import MetricsSnapshot
+        from .frame_analyzer import FrameAnalyzer
+        from .bottleneck_analyzer import BottleneckAnalyzer, window_for_interval
+        from .game_optimizer import GameOptimizer
+        self._snapshot_class = MetricsSnapshot
+
+        self.reader = SessionReader(path)
+        self.speed = speed
+        self.frame_analyzer = FrameAnalyzer()
+        self.game_optimizer = GameOptimizer()
+        self.latest = None
+        self.finished = threading.Event()
+
+        ticks = self.reader.table('ticks')
+        timestamps = ticks['timestamp']
+        self.interval = float(np.median(np.diff(timestamps))) if timestamps.size > 1 else 0.5
+        self.bottleneck_analyzer = BottleneckAnalyzer(window=window_for_interval(self.interval))
+        self.targets = {}
+        for event in self.reader.events():
+            if event.get('type') == 'target':
+                self.targets[event['pid']] = event.get('name', str(event['pid']))
+
+        self._listeners: List[Callable] = []
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def add_listener(self, callback: Callable):
+        self._listeners.append(callback)
+
+    def set_target(self, pid: Optional[int], process_name: str = ""):
+        """Targets are fixed by the recording"""
+
+    def watch(self, pid: int, process_name: str = ""):
+        pass
+
+    def unwatch(self, pid: int):
+        pass
+
+    def get_running_games(self) -> List[Dict]:
+        return [{'pid': pid, 'name': name, 'path': None} for pid, name in self.targets.items()]
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="SessionPlayer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def snapshots(self) -> Iterator:
+        """Rebuild a MetricsSnapshot for every recorded tick, in order"""
+        ticks = self.reader.table('ticks')
+        frames = self.reader.table('frames')
+        frame_bounds = np.searchsorted(frames['tick'], np.arange(len(ticks['timestamp']) + 1))
+        names = {pid: name for pid, name in self.targets.items()}
+        previous_pid = None
+
+        for i in range(len(ticks['timestamp'])):
+            row = {name: ticks[name][i].item() for name in TICK_DTYPE.names}
+            if row['pid'] != previous_pid:
+                self.frame_analyzer.reset()
+                self.bottleneck_analyzer.reset()
+                previous_pid = row['pid']
+
+            frame_times = frames['frame_time'][frame_bounds[i]:frame_bounds[i + 1]].astype(np.float64)
+            frame = self.frame_analyzer.analyze_many(frame_times) if frame_times.size else None
+
+            process = {
+                'cpu_percent': row['cpu_percent'],
+                'busiest_thread_percent': row['busiest_thread_percent'],
+                'memory_percent': row['memory_percent'],
+                'fps': int(round(row['fps']))
+            }
+            if frame_times.size:
+                process['frame_time'] = float(frame_times.mean())
+            system = {
+                'cpu': {'utilization': row['system_cpu'], 'temperature': row['cpu_temperature']},
+                'memory': {'percent': row['memory_used_percent']},
+                'gpu': {
+                    'utilization': row['gpu_utilization'],
+                    'temperature': row['gpu_temperature'],
+                    'memory_percent': row['gpu_memory_percent']
+                },
+                'storage': {}
+            }
+            network = {
+                'bytes_sent': row['bytes_sent'],
+                'bytes_recv': row['bytes_recv'],
+                'bytes_sent_per_sec': row['bytes_sent_per_sec'],
+                'bytes_recv_per_sec': row['bytes_recv_per_sec'],
+                'active_connections': row['connections'],
+                'servers': []
+            }
+            name = names.get(row['pid'], str(row['pid']))
+            yield self._snapshot_class(
+                sequence=i + 1,
+                timestamp=row['timestamp'],
+                pid=row['pid'],
+                process_name=name,
+                process=process,
+                system=system,
+                network=network,
+                frame=frame,
+                bottleneck=self.bottleneck_analyzer.analyze(process, system),
+                tips=self.game_optimizer.get_optimization_tips(name, process),
+                frame_times=frame_times
+            )
+
+    def _run(self):
+        started = time.monotonic()
+        first_timestamp = None
+        for snapshot in self.snapshots():
+            if self._stop_event.is_set():
+                return
+            if self.speed > 0:
+                if first_timestamp is None:
+                    first_timestamp = snapshot.timestamp
+                due = started + (snapshot.timestamp - first_timestamp) / self.speed
+                delay = due - time.monotonic()
+                if delay > 0 and self._stop_event.wait(delay):
+                    return
+            self.latest = snapshot
+            for callback in self._listeners:
+                try:
+                    callback(snapshot)
+                except Exception as e:
+                    logger.error(f"Snapshot listener failed: {e}")
+        self.finished.set()
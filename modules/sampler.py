@@ -0,0 +1,299 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+import psutil
+
+from .process_monitor import ProcessMonitor
+from .performance_metrics import PerformanceMetrics
+from .network_monitor import NetworkMonitor, without_deltas
+from .connection_table import ConnectionTable
+from .frame_analyzer import FrameAnalyzer
+from .bottleneck_analyzer import BottleneckAnalyzer, BottleneckResult, window_for_interval
+from .game_optimizer import GameOptimizer
+from .frame_source import FrameSource
+from .scheduler import CollectorScheduler, DEFAULT_COLLECTOR_INTERVALS
+from .platform_backend import PlatformBackend, create_backend
+from .instrumentation import Instrumentation, SelfUsage
+from .input_monitor import InputLatencyPipeline
+
+logger = logging.getLogger(__name__)
+
+# First runs probe sensors or open WMI; they must not hold up the first sample
+DEFERRED_COLLECTORS = ('temperature', 'storage', 'gpu_info')
+
+
+@dataclass(frozen=True)
+class MetricsSnapshot:
+    """Everything collected in one sampler tick.
+
+    A snapshot is built once by the sampler thread and never mutated after it
+    is published, so readers on other threads can hold on to it freely.
+    """
+    sequence: int
+    timestamp: float
+    pid: int
+    process_name: str
+    process: Dict
+    system: Dict
+    network: Dict = field(default_factory=dict)
+    frame: Optional[Dict] = None
+    bottleneck: Optional[BottleneckResult] = None
+    tips: List[str] = field(default_factory=list)
+    frame_times: Optional[np.ndarray] = None
+    targets: Dict[int, Dict] = field(default_factory=dict)
+    diagnostics: Optional[Dict] = None
+    input_latency: Dict[int, Dict] = field(default_factory=dict)
+
+
+class MetricsSampler:
+    """Background sampling engine that owns the collectors.
+
+    Collection runs on a dedicated thread that ticks every ``interval``
+    seconds. Each collector runs on its own cadence (``collector_intervals``,
+    in ms) and contributes its latest result to every tick. Each tick is
+    published as an immutable ``MetricsSnapshot`` by swapping ``latest`` and
+    calling the registered listeners from the sampler thread. OS-specific
+    reads go through ``backend`` (see ``platform_backend``). With an enabled
+    ``instrumentation``, every collector run and tick is timed and a
+    ``diagnostics`` collector reports the monitor's own CPU, RSS and timings.
+    A ``latency_pipeline`` adds input-to-present latency for every target.
+    """
+
+    def __init__(self, interval: float = 0.5, process_monitor: Optional[ProcessMonitor] = None,
+                 frame_source: Optional[FrameSource] = None,
+                 collector_intervals: Optional[Dict[str, float]] = None,
+                 backend: Optional[PlatformBackend] = None,
+                 instrumentation: Optional[Instrumentation] = None,
+                 latency_pipeline: Optional[InputLatencyPipeline] = None):
+        self.interval = interval
+        self.collector_intervals = {**DEFAULT_COLLECTOR_INTERVALS, **(collector_intervals or {})}
+        self.scheduler = None
+        self._tick_pids: List[int] = []
+        if backend is None:
+            backend = process_monitor.backend if process_monitor else create_backend()
+        self.backend = backend
+        self.process_monitor = process_monitor or ProcessMonitor(backend)
+        self.instrumentation = instrumentation if instrumentation and instrumentation.enabled else None
+        self.self_usage = SelfUsage(backend)
+        self.frame_source = frame_source
+        self.latency_pipeline = latency_pipeline
+        self.performance_metrics = None
+        self.network_monitor = None
+        self.connection_table = None
+        self.frame_analyzer = FrameAnalyzer()
+        self.bottleneck_analyzer = BottleneckAnalyzer(window=window_for_interval(interval))
+        self.game_optimizer = GameOptimizer()
+
+        self.latest: Optional[MetricsSnapshot] = None
+        self._listeners: List[Callable[[MetricsSnapshot], None]] = []
+        self._target_lock = threading.Lock()
+        self._target = (None, "")
+        self._watched: Dict[int, str] = {}
+        self._sampled_pid = None
+        self._sequence = 0
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def add_listener(self, callback: Callable[[MetricsSnapshot], None]):
+        """Register a callback invoked from the sampler thread for every snapshot"""
+        self._listeners.append(callback)
+
+    def set_target(self, pid: Optional[int], process_name: str = ""):
+        with self._target_lock:
+            self._target = (pid, process_name)
+
+    def watch(self, pid: int, process_name: str = ""):
+        """Sample ``pid`` alongside the main target every tick"""
+        with self._target_lock:
+            self._watched[pid] = process_name
+
+    def unwatch(self, pid: int):
+        with self._target_lock:
+            self._watched.pop(pid, None)
+
+    def get_running_games(self) -> List[Dict]:
+        return self.process_monitor.get_running_games()
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="MetricsSampler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+        if self.performance_metrics:
+            self.performance_metrics.close()
+            self.performance_metrics = None
+        if self.network_monitor:
+            self.network_monitor.close()
+            self.network_monitor = None
+        if self.frame_source:
+            self.frame_source.close()
+        if self.latency_pipeline:
+            self.latency_pipeline.close()
+        self.backend.close()
+
+    def _init_collectors(self):
+        # WMI/COM objects are bound to the thread that created them, so the
+        # system collectors have to be built on the sampler thread itself.
+        self.performance_metrics = PerformanceMetrics(self.backend)
+        self.connection_table = ConnectionTable(self.backend)
+        self.network_monitor = NetworkMonitor(connection_table=self.connection_table)
+        self.scheduler = self._build_scheduler()
+
+    def _build_scheduler(self) -> CollectorScheduler:
+        metrics = self.performance_metrics
+        collectors = {
+            'process': lambda: self.process_monitor.get_many_process_metrics(self._tick_pids),
+            'cpu': metrics.get_cpu_utilization,
+            'memory': metrics.get_memory_metrics,
+            'gpu': metrics.get_gpu_metrics,
+            'network': lambda: self.network_monitor.get_network_metrics(self._tick_pids),
+            'temperature': metrics.get_cpu_temperature,
+            'storage': metrics.get_storage_metrics,
+            'gpu_info': metrics.refresh_gpu_info
+        }
+        if self.instrumentation:
+            collectors['diagnostics'] = self._read_diagnostics
+        if self.latency_pipeline:
+            collectors['input_latency'] = lambda: self.latency_pipeline.update(self._tick_pids)
+        scheduler = CollectorScheduler(instrumentation=self.instrumentation)
+        for name, func in collectors.items():
+            scheduler.add(name, func, self.collector_intervals[name] / 1000.0,
+                          deferred=name in DEFERRED_COLLECTORS)
+        return scheduler
+
+    def _read_diagnostics(self) -> Dict:
+        return {**self.self_usage.read(), 'timings': self.instrumentation.summary()}
+
+    def _run(self):
+        try:
+            self._init_collectors()
+        except Exception as e:
+            logger.error(f"Failed to initialize collectors: {e}", exc_info=True)
+            return
+
+        tick_histogram = self.instrumentation.histogram('sampler.tick') if self.instrumentation else None
+        next_tick = time.monotonic()
+        while not self._stop_event.is_set():
+            try:
+                started = time.perf_counter()
+                snapshot = self.sample()
+                if tick_histogram is not None:
+                    tick_histogram.record(time.perf_counter() - started)
+                if snapshot is not None:
+                    self._publish(snapshot)
+            except Exception as e:
+                logger.error(f"Error in sampler tick: {e}", exc_info=True)
+
+            next_tick += self.interval
+            delay = next_tick - time.monotonic()
+            if delay < 0:
+                # Fell behind; resynchronize instead of bursting to catch up
+                next_tick = time.monotonic()
+                delay = 0
+            self._stop_event.wait(delay)
+
+    def sample(self) -> Optional[MetricsSnapshot]:
+        """Collect one tick for the current target"""
+        with self._target_lock:
+            pid, process_name = self._target
+            watched = dict(self._watched)
+        if not pid:
+            return None
+
+        target_pids = [pid] + [p for p in watched if p != pid]
+        if pid != self._sampled_pid or target_pids != self._tick_pids:
+            self.scheduler.invalidate('process', 'network')
+        if pid != self._sampled_pid:
+            self.frame_analyzer.reset()
+            self.bottleneck_analyzer.reset()
+            self._sampled_pid = pid
+        self._tick_pids = target_pids
+
+        results = self.scheduler.run()
+        sampled = results['process'] or {}
+        network = results['network'] or {}
+        if not self.scheduler.ran('network'):
+            network = {target_pid: without_deltas(metrics) for target_pid, metrics in network.items()}
+        targets = {}
+        for target_pid, metrics in sampled.items():
+            if metrics is None:
+                if target_pid != pid and not psutil.pid_exists(target_pid):
+                    self.unwatch(target_pid)
+                continue
+            name = process_name if target_pid == pid else watched.get(target_pid, "")
+            targets[target_pid] = {'name': name, **metrics,
+                                   'connections': network.get(target_pid, {}).get('active_connections', 0)}
+
+        if not sampled.get(pid):
+            return None
+        # Cached results are shared between ticks; this tick's frame data must not leak into them
+        process_metrics = dict(sampled[pid])
+        system_metrics = self.performance_metrics.build_system_metrics(
+            cpu=results['cpu'],
+            memory=results['memory'],
+            gpu=results['gpu'],
+            temperature=results['temperature'],
+            storage=results['storage']
+        )
+
+        frame_analysis, frame_times = self._analyze_frames(pid, process_metrics)
+
+        network_metrics = network.get(pid)
+        bottleneck = self.bottleneck_analyzer.analyze(process_metrics, system_metrics)
+        tips = self.game_optimizer.get_optimization_tips(process_name, process_metrics)
+
+        self._sequence += 1
+        return MetricsSnapshot(
+            sequence=self._sequence,
+            timestamp=time.time(),
+            pid=pid,
+            process_name=process_name,
+            process=process_metrics,
+            system=system_metrics,
+            network=network_metrics or {},
+            frame=frame_analysis,
+            bottleneck=bottleneck,
+            tips=tips,
+            frame_times=frame_times,
+            targets=targets,
+            diagnostics=results.get('diagnostics'),
+            input_latency=results.get('input_latency') or {}
+        )
+
+    def _analyze_frames(self, pid: int, process_metrics: Dict) -> Tuple[Optional[Dict], Optional[np.ndarray]]:
+        """Frame statistics plus the raw frame times (ms) consumed this tick"""
+        if self.frame_source is None:
+            # Without a frame-timing source only the window-based estimate exists
+            if process_metrics['fps'] > 0:
+                frame_times = np.array([1000.0 / process_metrics['fps']])
+                return self.frame_analyzer.analyze_many(frame_times), frame_times
+            return None, None
+
+        intervals = self.frame_source.read_frames(pid)
+        total_ms = float(intervals.sum())
+        if intervals.size == 0 or total_ms <= 0:
+            process_metrics['fps'] = 0
+            return (self.frame_analyzer.stats() if self.frame_analyzer.frame_count else None), None
+        frame_analysis = self.frame_analyzer.analyze_many(intervals)
+        # FPS over the frames presented during this tick
+        process_metrics['fps'] = int(round(1000.0 * intervals.size / total_ms))
+        process_metrics['frame_time'] = total_ms / intervals.size
+        return frame_analysis, intervals
+
+    def _publish(self, snapshot: MetricsSnapshot):
+        self.latest = snapshot
+        for callback in self._listeners:
+            try:
+                callback(snapshot)
+            except Exception as e:
+                logger.error(f"Snapshot listener failed: {e}")
@@ -0,0 +1,130 @@
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Milliseconds between runs of each sampler collector; overridable through
+# the ``collector_intervals`` config entry
+DEFAULT_COLLECTOR_INTERVALS = {
+    'process': 250,
+    'cpu': 500,
+    'memory': 500,
+    'gpu': 500,
+    'network': 1000,
+    'temperature': 2000,
+    'storage': 500,
+    'gpu_info': 60000,
+    'diagnostics': 1000,
+    'input_latency': 250
+}
+
+
+class Collector:
+    def __init__(self, name: str, func: Callable[[], Any], interval: float, cost: float = 0.0,
+                 deferred: bool = False):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.deferred = deferred
+        # Seconds per run; the declared value is refined from measured runs
+        self.cost = cost
+        self.value = None
+        self.has_value = False
+        # Scheduler tick that produced ``value``
+        self.tick = 0
+        self.next_due = 0.0
+        self.runs = 0
+        self.histogram = None
+
+
+class CollectorScheduler:
+    """Runs each collector at its own cadence and merges the latest results.
+
+    ``run`` is called once per sampler tick. Collectors that are due run
+    cheapest first; the others contribute the value from their last run.
+    ``ran`` tells the two apart, for results such as deltas that must be
+    counted on one tick only.
+    With a ``budget`` (seconds per tick), a due collector that would overrun
+    it is pushed to a later tick, unless it has never run or is already a
+    full interval late.
+
+    ``deferred`` collectors have a slow first run (probing hardware, opening
+    WMI). They stay out of the first tick so a sample is published right
+    away, then come online one per tick.
+
+    Every run's latency is also recorded in ``instrumentation`` (under
+    ``collector.<name>``) when one is given.
+    """
+
+    def __init__(self, budget: Optional[float] = None, instrumentation=None):
+        self.budget = budget
+        self.instrumentation = instrumentation if instrumentation and instrumentation.enabled else None
+        self.collectors: Dict[str, Collector] = {}
+        self.ticks = 0
+
+    def add(self, name: str, func: Callable[[], Any], interval: float, cost: float = 0.0,
+            deferred: bool = False) -> Collector:
+        collector = Collector(name, func, interval, cost, deferred)
+        if self.instrumentation:
+            collector.histogram = self.instrumentation.histogram(f"collector.{name}")
+        self.collectors[name] = collector
+        return collector
+
+    def set_interval(self, name: str, interval: float):
+        self.collectors[name].interval = interval
+
+    def invalidate(self, *names: str):
+        """Make collectors due on the next tick, e.g. after the target changed"""
+        for name in names:
+            collector = self.collectors.get(name)
+            if collector:
+                collector.next_due = 0.0
+
+    def ran(self, name: str) -> bool:
+        """Whether ``name`` produced its value on the latest tick"""
+        collector = self.collectors.get(name)
+        return collector is not None and collector.tick == self.ticks
+
+    def run(self, now: Optional[float] = None) -> Dict[str, Any]:
+        now = time.monotonic() if now is None else now
+        due: List[Collector] = sorted(
+            (c for c in self.collectors.values() if c.next_due <= now),
+            key=lambda c: c.cost
+        )
+        spent = 0.0
+        started_deferred = self.ticks == 0
+        self.ticks += 1
+        for collector in due:
+            if collector.deferred and collector.runs == 0:
+                if started_deferred:
+                    continue
+                started_deferred = True
+            if (self.budget is not None and collector.has_value
+                    and spent + collector.cost > self.budget
+                    and now - collector.next_due < collector.interval):
+                continue
+            started = time.perf_counter()
+            try:
+                collector.value = collector.func()
+                collector.has_value = True
+                collector.tick = self.ticks
+            except Exception as e:
+                logger.error(f"Collector {collector.name} failed: {e}")
+            elapsed = time.perf_counter() - started
+            spent += elapsed
+            if collector.histogram is not None:
+                collector.histogram.record(elapsed)
+            if collector.runs == 0 and not collector.cost:
+                collector.cost = elapsed
+            else:
+                collector.cost = 0.8 * collector.cost + 0.2 * elapsed
+            collector.runs += 1
+
+            if collector.next_due:
+                # Keep the phase stable, but never schedule into the past
+                collector.next_due = max(collector.next_due + collector.interval,
+                                         now + collector.interval / 2)
+            else:
+                collector.next_due = now + collector.interval
+        return {name: c.value for name, c in self.collectors.items()}
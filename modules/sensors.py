@@ -0,0 +1,260 @@
+import glob
+import logging
+import os
+import time
+from typing import List, Optional
+
+import psutil
+
+logger = logging.getLogger(__name__)
+
+CPU_SENSOR_CHIPS = ('coretemp', 'k10temp', 'zenpower', 'acpitz')
+
+
+class SensorSource:
+    """One way of reading the CPU temperature.
+
+    ``probe`` sets up whatever the source needs (WMI connection, open file
+    handle) and reports whether it produced a reading; ``read`` then only
+    samples through what ``probe`` kept around.
+    """
+    name = "base"
+
+    def probe(self) -> bool:
+        raise NotImplementedError
+
+    def read(self) -> Optional[float]:
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class _WMISource(SensorSource):
+    namespace = None
+
+    def __init__(self):
+        self.connection = None
+
+    def _connect(self):
+        import wmi
+        self.connection = wmi.WMI(namespace=self.namespace)
+
+    def probe(self) -> bool:
+        try:
+            self._connect()
+            return self.read() is not None
+        except Exception as e:
+            logger.debug(f"{self.name} probe failed: {e}")
+            self.connection = None
+            return False
+
+    def close(self):
+        self.connection = None
+
+
+class OpenHardwareMonitorSource(_WMISource):
+    name = "OpenHardwareMonitor"
+    namespace = "root/OpenHardwareMonitor"
+
+    def __init__(self):
+        super().__init__()
+        self.identifier = None
+
+    def probe(self) -> bool:
+        try:
+            self._connect()
+            for sensor in self.connection.Sensor(SensorType='Temperature'):
+                name = sensor.Name.lower()
+                if 'cpu' in name or 'package' in name:
+                    self.identifier = sensor.Identifier
+                    return True
+        except Exception as e:
+            logger.debug(f"{self.name} probe failed: {e}")
+        self.connection = None
+        return False
+
+    def read(self) -> Optional[float]:
+        sensors = self.connection.Sensor(Identifier=self.identifier)
+        return float(sensors[0].Value) if sensors else None
+
+
+class AcpiThermalZoneSource(_WMISource):
+    name = "MSAcpi_ThermalZoneTemperature"
+    namespace = "root/WMI"
+
+    def read(self) -> Optional[float]:
+        temps = self.connection.MSAcpi_ThermalZoneTemperature()
+        if temps:
+            return (temps[0].CurrentTemperature / 10.0) - 273.15
+        return None
+
+
+class ThermalZoneCounterSource(_WMISource):
+    name = "Win32_PerfFormattedData_Counters_ThermalZoneInformation"
+    namespace = "root/CIMV2"
+
+    def read(self) -> Optional[float]:
+        temps = self.connection.Win32_PerfFormattedData_Counters_ThermalZoneInformation()
+        if temps:
+            return float(temps[0].Temperature)
+        return None
+
+
+class SpeedFanSource(_WMISource):
+    name = "SpeedFan"
+    namespace = "root/speedfan"
+
+    def read(self) -> Optional[float]:
+        temps = self.connection.Sensor(SensorType='Temperature')
+        if temps:
+            return float(temps[0].Value)
+        return None
+
+
+class HwmonSource(SensorSource):
+    """Reads a hwmon ``temp*_input`` file through a descriptor kept open with pread"""
+    name = "hwmon"
+
+    def __init__(self, root: str = "/sys/class/hwmon"):
+        self.root = root
+        self.fd = None
+        self.path = None
+
+    def _find_input(self) -> Optional[str]:
+        chips = {}
+        for name_file in glob.glob(os.path.join(self.root, 'hwmon*', 'name')):
+            try:
+                with open(name_file) as f:
+                    chips[f.read().strip()] = os.path.dirname(name_file)
+            except OSError:
+                continue
+        for chip in CPU_SENSOR_CHIPS:
+            if chip in chips:
+                inputs = sorted(glob.glob(os.path.join(chips[chip], 'temp*_input')))
+                if inputs:
+                    # temp1 is Package id 0 on coretemp and Tctl on k10temp
+                    return inputs[0]
+        return None
+
+    def probe(self) -> bool:
+        if not hasattr(os, 'pread'):
+            return False
+        self.close()
+        try:
+            self.path = self._find_input()
+            if self.path is None:
+                return False
+            self.fd = os.open(self.path, os.O_RDONLY)
+            return self.read() is not None
+        except OSError as e:
+            logger.debug(f"{self.name} probe failed: {e}")
+            self.close()
+            return False
+
+    def read(self) -> Optional[float]:
+        # sysfs attributes regenerate their contents on every read from offset 0
+        return int(os.pread(self.fd, 32, 0)) / 1000.0
+
+    def close(self):
+        if self.fd is not None:
+            try:
+                os.close(self.fd)
+            except OSError:
+                pass
+            self.fd = None
+
+
+class PsutilSensorsSource(SensorSource):
+    name = "psutil"
+
+    def probe(self) -> bool:
+        if not hasattr(psutil, 'sensors_temperatures'):
+            return False
+        try:
+            return self.read() is not None
+        except Exception as e:
+            logger.debug(f"{self.name} probe failed: {e}")
+            return False
+
+    def read(self) -> Optional[float]:
+        temps = psutil.sensors_temperatures()
+        for source in CPU_SENSOR_CHIPS:
+            if source in temps:
+                return temps[source][0].current
+        return None
+
+
+def default_sources() -> List[SensorSource]:
+    return [
+        OpenHardwareMonitorSource(),
+        AcpiThermalZoneSource(),
+        ThermalZoneCounterSource(),
+        HwmonSource(),
+        PsutilSensorsSource(),
+        SpeedFanSource()
+    ]
+
+
+class SensorRegistry:
+    """Probes the temperature sources once and keeps sampling the first that works.
+
+    The active source is only abandoned after ``max_failures`` consecutive
+    failed reads. When nothing works, probing is retried at most every
+    ``reprobe_interval`` seconds instead of on every call.
+    """
+
+    def __init__(self, sources: Optional[List[SensorSource]] = None,
+                 max_failures: int = 3, reprobe_interval: float = 30.0):
+        self.sources = sources if sources is not None else default_sources()
+        self.max_failures = max_failures
+        self.reprobe_interval = reprobe_interval
+        self.active: Optional[SensorSource] = None
+        self._failures = 0
+        self._last_probe = None
+
+    def probe(self) -> Optional[SensorSource]:
+        self._last_probe = time.monotonic()
+        if self.active:
+            self.active.close()
+        self.active = None
+        self._failures = 0
+        for source in self.sources:
+            if source.probe():
+                logger.info(f"CPU temperature source: {source.name}")
+                self.active = source
+                return source
+            source.close()
+        logger.warning("No CPU temperature sources available")
+        return None
+
+    def read_temperature(self) -> Optional[float]:
+        if self.active is None:
+            if (self._last_probe is not None and
+                    time.monotonic() - self._last_probe < self.reprobe_interval):
+                return None
+            if self.probe() is None:
+                return None
+
+        try:
+            value = self.active.read()
+        except Exception as e:
+            logger.debug(f"{self.active.name} read failed: {e}")
+            value = None
+
+        if value is None:
+            self._failures += 1
+            if self._failures >= self.max_failures:
+                logger.warning(f"{self.active.name} failed {self._failures} times, re-probing")
+                self.active.close()
+                self.active = None
+                self._last_probe = None
+            return None
+
+        self._failures = 0
+        return value
+
+    def close(self):
+        for source in self.sources:
+            source.close()
+        self.active = None
@@ -0,0 +1,286 @@
+"""Offline analysis of recorded sessions and PresentMon captures.
+
+Every run is analyzed in a worker process of its own: the file is
+memory-mapped, its columns parsed and the statistics computed with numpy,
+and only a small summary row travels back to the parent, so throughput
+grows with the number of cores. No Qt and no collectors are imported.
+"""
+import csv
+import logging
+import mmap
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from .frame_analyzer import PACING_GRADES, pacing_grade
+from .frame_source import PresentMonSource, parse_columns
+from .recorder import BOTTLENECK_CODES, MAGIC, SessionReader
+
+logger = logging.getLogger(__name__)
+
+# Same definitions as the live FrameAnalyzer: a stutter is a frame longer
+# than 1.5x the mean of the 300 frames before it, and pacing is graded per
+# 300-frame window
+STUTTER_WINDOW = 300
+STUTTER_THRESHOLD = 1.5
+PERCENTILES = (50, 90, 95, 99, 99.9)
+# CSV captures are parsed this many bytes of the mapping at a time
+CSV_BLOCK_SIZE = 8 * 1024 * 1024
+
+COMPONENT_NAMES = {code: name for name, code in BOTTLENECK_CODES.items() if name}
+
+SUMMARY_COLUMNS = (
+    'file', 'kind', 'pid', 'duration_s', 'frames', 'avg_fps',
+    'ft_avg_ms', 'ft_p50_ms', 'ft_p90_ms', 'ft_p95_ms', 'ft_p99_ms', 'ft_p99.9_ms',
+    'low_1pct_fps', 'low_01pct_fps', 'stutters', 'stutters_per_min',
+    'pacing', 'poor_pacing_pct', 'bottleneck', 'cpu_bound_pct', 'gpu_bound_pct',
+    'ram_bound_pct', 'bottleneck_timeline', 'error'
+)
+
+
+def count_stutters(frame_times: np.ndarray, window: int = STUTTER_WINDOW,
+                   threshold: float = STUTTER_THRESHOLD) -> int:
+    """Frames longer than ``threshold`` times the mean of the ``window`` frames before them"""
+    if frame_times.size < 2:
+        return 0
+    sums = np.concatenate(([0.0], np.cumsum(frame_times)))
+    index = np.arange(1, frame_times.size)
+    start = np.maximum(index - window, 0)
+    means = (sums[index] - sums[start]) / (index - start)
+    return int(np.count_nonzero(frame_times[1:] > means * threshold))
+
+
+def pacing_summary(frame_times: np.ndarray, window: int = STUTTER_WINDOW) -> Dict:
+    """Pacing grade of the median window and the share of windows graded "Poor"
+
+    The run is cut into consecutive ``window``-frame windows (a run shorter
+    than one is a single window) and each is graded from its variance as
+    the live view grades its own window.
+    """
+    windows = frame_times.size // window
+    if windows:
+        variances = frame_times[:windows * window].reshape(windows, window).var(axis=1)
+    else:
+        variances = np.array([frame_times.var()])
+    poor = np.count_nonzero(variances >= PACING_GRADES[-1][0])
+    return {
+        'pacing': pacing_grade(float(np.median(variances))),
+        'poor_pacing_pct': round(100.0 * poor / variances.size, 1)
+    }
+
+
+def frame_time_stats(frame_times: np.ndarray) -> Dict:
+    """Percentiles, lows, stutters and pacing of one run's frame times (ms)"""
+    frame_times = np.asarray(frame_times, dtype=np.float64)
+    frame_times = frame_times[frame_times > 0]
+    if not frame_times.size:
+        return {'frames': 0}
+    total_ms = float(frame_times.sum())
+    percentiles = np.percentile(frame_times, PERCENTILES)
+    stutters = count_stutters(frame_times)
+    stats = {
+        'frames': int(frame_times.size),
+        'duration_s': round(total_ms / 1000.0, 2),
+        'avg_fps': round(1000.0 * frame_times.size / total_ms, 1),
+        'ft_avg_ms': round(total_ms / frame_times.size, 3),
+        'low_1pct_fps': round(1000.0 / percentiles[3], 1),
+        'low_01pct_fps': round(1000.0 / percentiles[4], 1),
+        'stutters': stutters,
+        'stutters_per_min': round(stutters / (total_ms / 60000.0), 2)
+    }
+    for percentile, value in zip(PERCENTILES, percentiles):
+        stats[f'ft_p{percentile:g}_ms'] = round(float(value), 3)
+    stats.update(pacing_summary(frame_times))
+    return stats
+
+
+def bottleneck_timeline(timestamps: np.ndarray, verdict: np.ndarray) -> Dict:
+    """Share of the run per component and the stretches each one held the verdict"""
+    if not verdict.size:
+        return {}
+    shares = np.bincount(verdict, minlength=len(BOTTLENECK_CODES)) / verdict.size * 100
+    elapsed = timestamps - timestamps[0]
+    starts = np.flatnonzero(np.concatenate(([True], verdict[1:] != verdict[:-1])))
+    ends = np.append(starts[1:], verdict.size - 1)
+    segments = [f"{COMPONENT_NAMES[int(verdict[start])]} {elapsed[start]:.0f}-{elapsed[end]:.0f}s"
+                for start, end in zip(starts, ends) if verdict[start]]
+    bound = shares[1:]
+    summary = {
+        'bottleneck': COMPONENT_NAMES[int(bound.argmax()) + 1] if bound.max() > 0 else "None",
+        'bottleneck_timeline': "; ".join(segments)
+    }
+    for code, name in COMPONENT_NAMES.items():
+        summary[f'{name.lower()}_bound_pct'] = round(float(shares[code]), 1)
+    return summary
+
+
+def analyze_session_file(path: str) -> Dict:
+    from .bottleneck_analyzer import analyze_session, window_for_interval
+    reader = SessionReader(path)
+    try:
+        ticks = reader.table('ticks')
+        frames = reader.table('frames')
+        timestamps = ticks['timestamp']
+        row = {'kind': 'session'}
+        if timestamps.size:
+            pids, counts = np.unique(ticks['pid'], return_counts=True)
+            row['pid'] = int(pids[counts.argmax()])
+        row.update(frame_time_stats(frames['frame_time']))
+        if timestamps.size > 1:
+            row['duration_s'] = round(float(timestamps[-1] - timestamps[0]), 2)
+            interval = float(np.median(np.diff(timestamps)))
+            timeline = analyze_session(ticks, frames, window=window_for_interval(interval))
+            row.update(bottleneck_timeline(timestamps, timeline['verdict']))
+        return row
+    finally:
+        reader.close()
+
+
+def _presentmon_columns(header: bytes):
+    names = [name.strip() for name in header.decode('utf-8', 'replace').split(',')]
+    interval = next((names.index(c) for c in PresentMonSource.INTERVAL_COLUMNS if c in names), None)
+    pid = next((names.index(c) for c in PresentMonSource.PID_COLUMNS if c in names), None)
+    return interval, pid
+
+
+def read_presentmon(path: str, block_size: int = CSV_BLOCK_SIZE) -> np.ndarray:
+    """(interval ms, pid) rows of a PresentMon CSV, parsed block by block from a mapping"""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return np.zeros((0, 2))
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            newline = mapped.find(b"\n")
+            if newline < 0:
+                return np.zeros((0, 2))
+            interval, pid = _presentmon_columns(mapped[:newline])
+            if interval is None:
+                raise ValueError("no frame interval column")
+            columns = [interval] if pid is None else [interval, pid]
+
+            pieces = []
+            start, end = newline + 1, len(mapped)
+            while start < end:
+                stop = mapped.find(b"\n", min(start + block_size, end) - 1)
+                stop = end if stop < 0 else stop + 1
+                pieces.append(parse_columns(mapped[start:stop], columns))
+                start = stop
+    values = np.concatenate(pieces) if pieces else np.zeros((0, len(columns)))
+    if pid is None:
+        values = np.column_stack((values[:, 0], np.full(len(values), -1.0)))
+    return values
+
+
+def analyze_presentmon_file(path: str) -> Dict:
+    values = read_presentmon(path)
+    row = {'kind': 'presentmon'}
+    if len(values):
+        # A capture may cover several processes; the run is the one with the most frames
+        pids, counts = np.unique(values[:, 1], return_counts=True)
+        pid = pids[counts.argmax()]
+        values = values[values[:, 1] == pid]
+        if pid >= 0:
+            row['pid'] = int(pid)
+    row.update(frame_time_stats(values[:, 0]))
+    return row
+
+
+def is_session(path: str) -> bool:
+    with open(path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def analyze_file(path: str) -> Dict:
+    """Summary row of one run; failures are reported in the ``error`` column"""
+    try:
+        if is_session(path):
+            row = analyze_session_file(path)
+        else:
+            row = analyze_presentmon_file(path)
+    except Exception as e:
+        row = {'error': f"{type(e).__name__}: {e}"}
+    row['file'] = path
+    return row
+
+
+def find_runs(paths: Iterable[str]) -> List[str]:
+    """Session recordings and CSV captures under the given files and directories.
+
+    Files that cannot be read while looking for recordings are logged and
+    skipped; explicitly named files are always kept, and a failure to read
+    them is reported in their summary row.
+    """
+    def walk_error(error: OSError):
+        logger.warning(f"Skipping {error.filename}: {error.strerror}")
+
+    runs = []
+    for path in paths:
+        if os.path.isfile(path):
+            runs.append(path)
+            continue
+        for root, _, files in os.walk(path, onerror=walk_error):
+            for name in files:
+                full = os.path.join(root, name)
+                if not os.path.isfile(full):
+                    # Sockets, pipes and dangling links
+                    continue
+                if name.lower().endswith('.csv'):
+                    runs.append(full)
+                    continue
+                try:
+                    if is_session(full):
+                        runs.append(full)
+                except (OSError, UnicodeDecodeError) as e:
+                    logger.warning(f"Skipping {full}: {e}")
+    return sorted(runs)
+
+
+def analyze_runs(paths: List[str], jobs: Optional[int] = None) -> List[Dict]:
+    """Summary rows in the order of ``paths``, one run per worker process at a time"""
+    jobs = min(jobs or os.cpu_count() or 1, len(paths))
+    if jobs <= 1:
+        return [analyze_file(path) for path in paths]
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(analyze_file, paths))
+
+
+def write_summary(rows: List[Dict], stream):
+    writer = csv.DictWriter(stream, fieldnames=SUMMARY_COLUMNS, extrasaction='ignore')
+    writer.writeheader()
+    for row in rows:
+        writer.writerow(row)
+
+
+def format_summary(rows: List[Dict]) -> str:
+    """Fixed-width table of the headline columns for the terminal"""
+    def cell(row, key, width):
+        value = row.get(key)
+        return f"{'' if value is None else value:>{width}}"
+
+    lines = [f"{'run':<32}{'frames':>9}{'avg fps':>9}{'p99 ms':>9}{'1% low':>9}"
+             f"{'stutters':>10}{'pacing':>11}  bottleneck"]
+    for row in rows:
+        name = os.path.basename(row['file'])[-32:]
+        if row.get('error'):
+            lines.append(f"{name:<32}  error: {row['error']}")
+            continue
+        lines.append(f"{name:<32}{cell(row, 'frames', 9)}{cell(row, 'avg_fps', 9)}{cell(row, 'ft_p99_ms', 9)}"
+                     f"{cell(row, 'low_1pct_fps', 9)}{cell(row, 'stutters', 10)}{cell(row, 'pacing', 11)}"
+                     f"  {row.get('bottleneck') or '-'}")
+    return "\n".join(lines)
+
+
+def run_analysis(paths: List[str], jobs: Optional[int] = None, output: Optional[str] = None) -> int:
+    runs = find_runs(paths)
+    if not runs:
+        print(f"No sessions or CSV captures found in {', '.join(paths)}", file=sys.stderr)
+        return 1
+    rows = analyze_runs(runs, jobs)
+    print(format_summary(rows))
+    if output:
+        with open(output, 'w', newline='') as f:
+            write_summary(rows, f)
+        print(f"Summary of {len(rows)} runs written to {output}")
+    return 1 if all(row.get('error') for row in rows) else 0
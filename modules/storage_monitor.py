@@ -0,0 +1,120 @@
+import logging
+import time
+from typing import Dict, Optional
+
+import psutil
+
+from .platform_backend import DiskCounters, PlatformBackend
+
+logger = logging.getLogger(__name__)
+
+# Seconds between disk_usage refreshes; capacity moves slowly and a slow
+# (network or sleeping) mount can block the call
+USAGE_INTERVAL = 30.0
+# Seconds between partition rescans where the backend cannot report mount changes
+LAYOUT_INTERVAL = 30.0
+
+# Reported for a disk until two reads are available to difference
+IDLE_RATES = {
+    'read_bytes_per_sec': 0.0,
+    'write_bytes_per_sec': 0.0,
+    'read_iops': 0.0,
+    'write_iops': 0.0,
+    'read_latency_ms': 0.0,
+    'write_latency_ms': 0.0,
+    'busy_percent': None
+}
+
+
+def disk_rates(old: DiskCounters, new: DiskCounters, elapsed: float) -> Optional[Dict]:
+    """Throughput, IOPS and mean service time between two counter reads.
+
+    None if the counters went backwards (the disk was removed and came back).
+    """
+    reads = new.read_count - old.read_count
+    writes = new.write_count - old.write_count
+    read_bytes = new.read_bytes - old.read_bytes
+    write_bytes = new.write_bytes - old.write_bytes
+    read_time = new.read_time - old.read_time
+    write_time = new.write_time - old.write_time
+    if min(reads, writes, read_bytes, write_bytes, read_time, write_time) < 0:
+        return None
+    busy = None
+    if new.busy_time is not None and old.busy_time is not None:
+        busy = min(100.0, max(0.0, (new.busy_time - old.busy_time) / (elapsed * 10)))
+    return {
+        'read_bytes_per_sec': read_bytes / elapsed,
+        'write_bytes_per_sec': write_bytes / elapsed,
+        'read_iops': reads / elapsed,
+        'write_iops': writes / elapsed,
+        'read_latency_ms': read_time / reads if reads else 0.0,
+        'write_latency_ms': write_time / writes if writes else 0.0,
+        'busy_percent': busy
+    }
+
+
+class StorageMonitor:
+    """Per-disk I/O rates and per-mount capacity.
+
+    A read is normally a single per-disk counter query: the partition
+    layout is re-read only when the backend reports a mount change, and
+    ``disk_usage`` only every ``usage_interval`` seconds. Rates cover the
+    time since the previous read, so the collector interval is the
+    averaging window.
+    """
+
+    def __init__(self, backend: PlatformBackend, usage_interval: float = USAGE_INTERVAL,
+                 layout_interval: float = LAYOUT_INTERVAL):
+        self.backend = backend
+        self.usage_interval = usage_interval
+        self.layout_interval = layout_interval
+        self._partitions = None
+        self._layout_due = 0.0
+        self._usage: Dict[str, Dict] = {}
+        self._usage_due = 0.0
+        self._last = None
+
+    def _refresh_layout(self, now: float):
+        changed = self.backend.mounts_changed()
+        if changed is None:
+            changed = now >= self._layout_due
+        if self._partitions is not None and not changed:
+            return
+        self._partitions = self.backend.disk_partitions()
+        self._layout_due = now + self.layout_interval
+        # New mounts get their capacity right away
+        self._usage_due = 0.0
+        logger.debug(f"Partition layout: {self._partitions}")
+
+    def _refresh_usage(self, now: float):
+        usage = {}
+        for device, mountpoint in self._partitions:
+            try:
+                disk = psutil.disk_usage(mountpoint)
+            except (OSError, psutil.Error):
+                continue
+            usage[device] = {
+                'mountpoint': mountpoint,
+                'total': disk.total,
+                'used': disk.used,
+                'free': disk.free,
+                'percent': disk.percent
+            }
+        self._usage = usage
+        self._usage_due = now + self.usage_interval
+
+    def read(self) -> Dict:
+        now = time.monotonic()
+        self._refresh_layout(now)
+        if now >= self._usage_due:
+            self._refresh_usage(now)
+
+        counters = self.backend.disk_io_counters()
+        previous, self._last = self._last, (now, counters)
+        disks = {}
+        for name, current in counters.items():
+            rates = None
+            if previous is not None and now > previous[0] and name in previous[1]:
+                rates = disk_rates(previous[1][name], current, now - previous[0])
+            disks[name] = rates or dict(IDLE_RATES)
+        return {'disks': disks, 'partitions': self._usage}
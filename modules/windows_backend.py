@@ -0,0 +1,96 @@
+import logging
+import os
+from typing import Dict, Iterable, List, Optional
+
+from .platform_backend import PlatformBackend
+
+logger = logging.getLogger(__name__)
+
+
+class WindowsBackend(PlatformBackend):
+    """psutil plus the pywin32 window lookup and WMI adapter/sensor queries.
+
+    pywin32 and WMI are imported on first use, on the sampler thread, so
+    neither the GUI thread nor a non-Windows import of this module pays for
+    them. The WMI connection belongs to the thread that made it.
+    """
+    name = "windows"
+
+    def __init__(self):
+        super().__init__()
+        self._wmi = None
+        self._drives = None
+
+    def init_thread(self):
+        import pythoncom
+        pythoncom.CoInitialize()
+
+    @property
+    def wmi(self):
+        if self._wmi is None:
+            import wmi
+            self._wmi = wmi.WMI()
+        return self._wmi
+
+    def close(self):
+        super().close()
+        self._wmi = None
+
+    def find_windows(self, pids: Iterable[int]) -> Dict[int, int]:
+        """Map each pid to its first visible, non-empty window in one EnumWindows pass"""
+        import win32con
+        import win32gui
+        import win32process
+        wanted = set(pids)
+        found = {}
+
+        def callback(hwnd, extra):
+            try:
+                if win32gui.IsWindowVisible(hwnd):
+                    _, p = win32process.GetWindowThreadProcessId(hwnd)
+                    if p in wanted and p not in found:
+                        style = win32gui.GetWindowLong(hwnd, win32con.GWL_STYLE)
+                        if style & win32con.WS_VISIBLE:
+                            rect = win32gui.GetClientRect(hwnd)
+                            if rect[2] > 0 and rect[3] > 0:
+                                found[p] = hwnd
+                                return len(found) < len(wanted)
+                return True
+            except Exception:
+                return True
+
+        try:
+            win32gui.EnumWindows(callback, None)
+        except Exception as e:
+            logger.debug(f"EnumWindows warning (non-critical): {e}")
+        return found
+
+    def mounts_changed(self) -> Optional[bool]:
+        # Drive letters as a bitmask; one cheap call instead of enumerating volumes
+        import win32api
+        drives = win32api.GetLogicalDrives()
+        changed = self._drives is not None and drives != self._drives
+        self._drives = drives
+        return changed
+
+    def nvidia_smi_path(self) -> Optional[str]:
+        return os.path.join(os.environ.get('SystemRoot', 'C:\\Windows'), 'System32', 'nvidia-smi.exe')
+
+    def gpu_info(self) -> Optional[Dict]:
+        gpu = self.wmi.Win32_VideoController()[0]
+        return {
+            'name': gpu.Name,
+            'memory': gpu.AdapterRAM if hasattr(gpu, 'AdapterRAM') else None,
+            'driver_version': gpu.DriverVersion
+        }
+
+    def sensor_sources(self) -> List:
+        from .sensors import (AcpiThermalZoneSource, OpenHardwareMonitorSource, PsutilSensorsSource,
+                              SpeedFanSource, ThermalZoneCounterSource)
+        return [
+            OpenHardwareMonitorSource(),
+            AcpiThermalZoneSource(),
+            ThermalZoneCounterSource(),
+            PsutilSensorsSource(),
+            SpeedFanSource()
+        ]